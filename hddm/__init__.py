@@ -4,22 +4,64 @@ __docformat__ = "restructuredtext"
 
 __version__ = "0.9.0"
 
+import importlib
+
 from . import simulators
 from . import likelihoods
-from . import likelihoods_mlp
-from . import generate
-from . import utils
-from . import plotting
-from . import network_inspectors
 from . import models
 from . import model_config
 import cdfdif_wrapper
 
-from .models import *
-from kabuki import analyze
+from .models import (
+    AccumulatorModel,
+    HDDMBase,
+    HDDM,
+    HDDMTruncated,
+    HDDMStimCoding,
+    HDDMRegressor,
+    HDDMrlRegressor,
+    HDDMTransformed,
+    HDDMrl,
+    Hrl,
+)
 
 import wfpt
 
+# Submodules and classes that pull in heavy optional dependencies
+# (matplotlib/seaborn, scikit-learn, pytorch) are imported on first access.
+_lazy_submodules = [
+    "likelihoods_mlp",
+    "generate",
+    "database",
+    "cross_validation",
+    "profiling",
+    "tolerance",
+    "utils",
+    "plotting",
+    "network_inspectors",
+    "torch",
+]
+_lazy_attributes = {
+    "analyze": "kabuki",
+    "HDDMnn": "hddm.models",
+    "HDDMnnRegressor": "hddm.models",
+    "HDDMnnStimCoding": "hddm.models",
+}
+
+
+def __getattr__(name):
+    if name in _lazy_submodules:
+        return importlib.import_module("." + name, __name__)
+    if name in _lazy_attributes:
+        value = getattr(importlib.import_module(_lazy_attributes[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_lazy_submodules) | set(_lazy_attributes))
+
 try:
     import cdfdif_wrapper as cdfdif
 except ImportError:
@@ -0,0 +1,241 @@
+"""
+.. module:: HDDM
+   :platform: Agnostic
+   :synopsis: Parallel, resumable k-fold cross-validation of RL models.
+
+Every subject's trial sequence is cut into n_folds contiguous blocks. For
+each (subject, fold) the model is fit by maximum likelihood to the trials
+outside the block and scored on the trials inside it. The RL likelihood
+still runs over the complete sequence, so held-out trials keep updating the
+q-values exactly as in hddm.generate.cross_validation(); only their
+log-likelihood is left out of (respectively counted in) the sum, using the
+per-trial buffers of the compiled kernels.
+
+    >>> res = hddm.cross_validation.kfold(
+    ...     data, hddm.HDDMrl, dict(two_stage=True), n_folds=10,
+    ...     cache_dir='cv_cache')
+    >>> res.groupby('subj_idx').test_logp.sum()
+
+Each finished (subject, fold, model configuration) is written to cache_dir,
+so calling kfold() again after an interruption only fits the missing ones.
+"""
+
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from hddm.database import _atomic_write
+
+
+class _MaskedLike(object):
+    """Summed per-trial log-likelihood over the trials where mask is True."""
+
+    def __init__(self, like):
+        self.like = like
+
+    def __call__(self, x, mask=None, **params):
+        params.pop("trial_logp", None)
+        trial_logp = np.zeros(len(x))
+        logp = self.like(x, trial_logp=trial_logp, **params)
+        if not np.isfinite(logp):
+            return logp
+        return trial_logp[mask].sum()
+
+
+def make_folds(data, n_folds=10):
+    """Split the trials of every subject into n_folds contiguous blocks.
+
+    :Arguments:
+        data : pandas.DataFrame
+            Data in trial order, with a subj_idx column for several subjects.
+
+    :Optional:
+        n_folds : int <default=10>
+            Number of folds per subject.
+
+    :Returns:
+        pandas.Series with the fold of every row, aligned to data.
+    """
+    folds = pd.Series(0, index=data.index, dtype=int)
+    if "subj_idx" in data.columns:
+        groups = data.groupby("subj_idx", sort=False).indices.values()
+    else:
+        groups = [np.arange(len(data))]
+    for rows in groups:
+        for fold, block in enumerate(np.array_split(rows, n_folds)):
+            folds.iloc[block] = fold
+    return folds
+
+
+def config_key(model, model_kwargs, n_folds, n_runs):
+    """Identifier of a model configuration, used to key the cache."""
+    config = {
+        "model": "%s.%s" % (model.__module__, model.__name__),
+        "kwargs": repr(sorted(model_kwargs.items())),
+        "n_folds": n_folds,
+        "n_runs": n_runs,
+    }
+    return hashlib.sha1(json.dumps(config, sort_keys=True).encode()).hexdigest()
+
+
+def _cache_file(cache_dir, config, subj_idx, fold, data):
+    digest = hashlib.sha1(pd.util.hash_pandas_object(data).values.tobytes())
+    return os.path.join(
+        cache_dir,
+        config,
+        "subj%s_fold%d_%s.json" % (subj_idx, fold, digest.hexdigest()[:12]),
+    )
+
+
+def _fit_fold(task):
+    """Worker of kfold(): fit one subject on the training blocks and score
+    the held-out block."""
+    import cloudpickle
+    from hddm.models.base import _fit_ml
+
+    model, model_kwargs, data, test, n_runs, seed = cloudpickle.loads(task)
+    m = model(data, **model_kwargs)
+    problems = m._ml_problems()
+    if len(problems) != 1:
+        raise ValueError("kfold() fits one subject at a time.")
+    nodes, blocks, like = list(problems.values())[0]
+    like = _MaskedLike(like)
+
+    def with_mask(train):
+        return [
+            (x, dict(fixed, mask=x.index.isin(test) != train), free)
+            for x, fixed, free in blocks
+        ]
+
+    x0 = np.array([float(m.nodes_db.loc[n, "node"].value) for n in nodes])
+    values, train_logp = _fit_ml(
+        like, with_mask(True), x0, n_runs, np.random.RandomState(seed)
+    )
+
+    test_logp = 0
+    for x, fixed, free in with_mask(False):
+        params = dict(fixed)
+        for name, idx in free.items():
+            params[name] = values[idx]
+        test_logp += like(x, **params)
+
+    result = OrderedDict(
+        [
+            ("n_train", int(len(data) - len(test))),
+            ("n_test", int(len(test))),
+            ("train_logp", float(train_logp)),
+            ("test_logp", float(test_logp)),
+        ]
+    )
+    result.update((name, float(values[idx])) for name, idx in nodes.items())
+    return result
+
+
+def kfold(
+    data,
+    model,
+    model_kwargs=None,
+    n_folds=10,
+    n_runs=3,
+    n_jobs=None,
+    cache_dir=None,
+    seed=None,
+):
+    """Block-wise k-fold cross-validation of an RL model, fitting all
+    (subject, fold) pairs in a process pool.
+
+    :Arguments:
+        data : pandas.DataFrame
+            Data of one or several subjects (subj_idx column) in trial order.
+        model : class
+            Model class with per-trial likelihoods, e.g. hddm.HDDMrl or
+            hddm.Hrl.
+
+    :Optional:
+        model_kwargs : dict <default=None>
+            Keyword arguments the model is created with.
+        n_folds : int <default=10>
+            Number of contiguous blocks per subject.
+        n_runs : int <default=3>
+            Number of optimization runs per fit.
+        n_jobs : int <default=None>
+            Number of worker processes; None uses all CPUs, 1 runs in this
+            process.
+        cache_dir : str <default=None>
+            Directory in which every finished (subject, fold, model
+            configuration) is stored and looked up on the next call.
+        seed : int <default=None>
+            Seed of the optimization restarts.
+
+    :Returns:
+        pandas.DataFrame indexed by (subj_idx, fold) with the number of
+        training and test trials, the training and held-out log-likelihood
+        and the fitted parameter values.
+    """
+    import cloudpickle
+
+    model_kwargs = dict(model_kwargs or {})
+    folds = make_folds(data, n_folds)
+    config = config_key(model, model_kwargs, n_folds, n_runs)
+
+    if "subj_idx" in data.columns:
+        subjects = list(data.groupby("subj_idx", sort=False))
+    else:
+        subjects = [(0, data)]
+
+    tasks = OrderedDict()
+    for subj_idx, subj_data in subjects:
+        for fold in range(n_folds):
+            tasks[(subj_idx, fold)] = subj_data
+
+    seeds = np.random.SeedSequence(seed).spawn(len(tasks))
+    results = OrderedDict()
+    pending = OrderedDict()
+    for (key, subj_data), task_seed in zip(tasks.items(), seeds):
+        fname = None
+        if cache_dir is not None:
+            fname = _cache_file(cache_dir, config, key[0], key[1], subj_data)
+            if os.path.exists(fname):
+                with open(fname) as f:
+                    results[key] = json.load(f, object_pairs_hook=OrderedDict)
+                continue
+        test = subj_data.index[folds[subj_data.index].values == key[1]]
+        task = cloudpickle.dumps(
+            (
+                model,
+                model_kwargs,
+                subj_data,
+                test,
+                n_runs,
+                int(task_seed.generate_state(1)[0]),
+            )
+        )
+        pending[key] = (task, fname)
+
+    def store(key, result):
+        fname = pending[key][1]
+        if fname is not None:
+            os.makedirs(os.path.dirname(fname), exist_ok=True)
+            _atomic_write(fname, json.dumps(result))
+        results[key] = result
+
+    if n_jobs == 1:
+        for key, (task, _) in pending.items():
+            store(key, _fit_fold(task))
+    elif pending:
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            futures = {
+                pool.submit(_fit_fold, task): key
+                for key, (task, _) in pending.items()
+            }
+            # cache every fit as soon as it is done
+            for future in as_completed(futures):
+                store(futures[future], future.result())
+
+    index = pd.MultiIndex.from_tuples(list(tasks), names=["subj_idx", "fold"])
+    return pd.DataFrame([results[key] for key in tasks], index=index)
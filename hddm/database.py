@@ -0,0 +1,241 @@
+"""
+.. module:: HDDM
+   :platform: Agnostic
+   :synopsis: Disk-backed, chunked PyMC trace database.
+
+A PyMC database backend that stores every tallied node in its own memory
+mapped ``.npy`` file. Samples are written to disk as sampling proceeds and
+are committed every ``chunk_size`` iterations, together with the sampler
+state, so that
+
+* memory use stays flat during long runs (committed pages are clean and can
+  be evicted by the OS),
+* traces are read lazily, i.e. ``node.trace()[::10]`` only touches the pages
+  it needs,
+* a crashed run can be resumed from the last committed chunk by sampling
+  again into the same directory.
+
+Use it through the regular model interface:
+
+    >>> m = hddm.HDDM(data)
+    >>> m.sample(100000, burn=5000, db='memmap', dbname='traces.memmap')
+    >>> # after a crash, this continues the unfinished chain:
+    >>> m = hddm.HDDM(data)
+    >>> m.sample(50000, db='memmap', dbname='traces.memmap')
+
+or pass a Database instance (e.g. to change ``chunk_size``) as ``db``.
+"""
+
+import json
+import os
+import pickle
+import shutil
+
+import numpy as np
+import pymc as pm
+
+MANIFEST = "manifest.json"
+STATE = "state.pkl"
+
+
+def _atomic_write(fname, data, mode="w"):
+    tmp = fname + ".tmp"
+    with open(tmp, mode) as f:
+        f.write(data)
+    os.replace(tmp, fname)
+
+
+class Trace(pm.database.ram.Trace):
+    """Trace of a single node backed by one memory mapped .npy file per chain."""
+
+    def _initialize(self, chain, length):
+        if self._getfunc is None:
+            self._getfunc = self.db.model._funs_to_tally[self.name]
+
+        value = np.asarray(self._getfunc())
+        if value.dtype == object:
+            # Object traces can not be memory mapped, keep them in RAM
+            return pm.database.ram.Trace._initialize(self, chain, length)
+
+        self._trace[chain] = np.lib.format.open_memmap(
+            self.db._trace_file(chain, self.name),
+            mode="w+",
+            dtype=value.dtype,
+            shape=(length,) + value.shape,
+        )
+        self._index[chain] = 0
+
+    def _extend(self, chain, length):
+        """Make room for length more samples after the committed ones."""
+        if self._getfunc is None:
+            self._getfunc = self.db.model._funs_to_tally[self.name]
+
+        fname = self.db._trace_file(chain, self.name)
+        committed = self._index[chain]
+        trace = np.load(fname, mmap_mode="r+")
+        if trace.shape[0] < committed + length:
+            grown = np.lib.format.open_memmap(
+                fname + ".tmp",
+                mode="w+",
+                dtype=trace.dtype,
+                shape=(committed + length,) + trace.shape[1:],
+            )
+            grown[:committed] = trace[:committed]
+            grown.flush()
+            del trace
+            os.replace(fname + ".tmp", fname)
+            trace = np.load(fname, mmap_mode="r+")
+        self._trace[chain] = trace
+
+    def _flush(self, chain):
+        flush = getattr(self._trace[chain], "flush", None)
+        if flush is not None:
+            flush()
+
+    def _finalize(self, chain):
+        self._flush(chain)
+        self._trace[chain] = self._trace[chain][: self._index[chain]]
+
+
+class _Traces(dict):
+    """Traces of a Database by node name. PyMC's Sampler looks up the trace
+    of every tallied node before the database is initialized, so missing
+    traces are created on access."""
+
+    def __init__(self, db):
+        dict.__init__(self)
+        self.db = db
+
+    def __missing__(self, name):
+        trace = self[name] = self.db.__Trace__(name=name, db=self.db)
+        return trace
+
+
+class Database(pm.database.ram.Database):
+    """Chunked, memory mapped trace database.
+
+    :Arguments:
+        dbname : str
+            Directory the traces are written to.
+
+    :Optional:
+        dbmode : str <default='a'>
+            'a' opens an existing directory, resuming its last chain if it
+            was not finalized; 'w' discards any existing traces.
+        chunk_size : int <default=1000>
+            Number of tallied samples between commits to disk.
+    """
+
+    def __init__(self, dbname, dbmode="a", chunk_size=1000):
+        pm.database.ram.Database.__init__(self, dbname)
+        self.__name__ = "memmap"
+        self.__Trace__ = Trace
+        self._traces = _Traces(self)
+        self.dbname = dbname
+        self.chunk_size = chunk_size
+        self._chains = []
+        # samples committed before the current sample() call, the sampler
+        # counts (and truncates) from 0 on every call
+        self._offset = 0
+
+        if dbmode == "w" and os.path.isdir(dbname):
+            shutil.rmtree(dbname)
+        if not os.path.isdir(dbname):
+            os.makedirs(dbname)
+        if os.path.exists(os.path.join(dbname, MANIFEST)):
+            self._load()
+
+    def _trace_file(self, chain, name):
+        files = self._chains[chain]["files"]
+        if name not in files:
+            files[name] = "%05d.npy" % len(files)
+        return os.path.join(self.dbname, "chain%d" % chain, files[name])
+
+    def _load(self):
+        with open(os.path.join(self.dbname, MANIFEST)) as f:
+            self._chains = json.load(f)["chains"]
+
+        for chain, info in enumerate(self._chains):
+            for name, fname in info["files"].items():
+                if name not in self._traces:
+                    self._traces[name] = self.__Trace__(name=name, db=self)
+                trace = np.load(
+                    os.path.join(self.dbname, "chain%d" % chain, fname), mmap_mode="r"
+                )
+                self._traces[name]._trace[chain] = trace[: info["length"]]
+                self._traces[name]._index[chain] = info["length"]
+            self.trace_names.append(list(info["files"].keys()))
+        self.chains = len(self._chains)
+
+        state_file = os.path.join(self.dbname, STATE)
+        if os.path.exists(state_file):
+            with open(state_file, "rb") as f:
+                self._state_ = pickle.load(f)
+
+    def _initialize(self, funs_to_tally, length=None):
+        if self._chains and not self._chains[-1]["finalized"]:
+            # resume the unfinished chain from its last committed chunk
+            chain = self.chains - 1
+            self._offset = self._chains[chain]["length"]
+            for name, fun in funs_to_tally.items():
+                self._traces[name]._getfunc = fun
+                self._traces[name]._extend(chain, length)
+            return
+
+        for name, fun in funs_to_tally.items():
+            if name in self._traces:
+                self._traces[name]._getfunc = fun
+        self._offset = 0
+        self._chains.append({"length": 0, "finalized": False, "files": {}})
+        os.makedirs(os.path.join(self.dbname, "chain%d" % self.chains))
+        pm.database.ram.Database._initialize(self, funs_to_tally, length)
+        self.commit()
+
+    def tally(self, chain=-1):
+        pm.database.ram.Database.tally(self, chain)
+        chain = range(self.chains)[chain]
+        index = self._traces[self.trace_names[chain][0]]._index[chain]
+        if index - self._chains[chain]["length"] >= self.chunk_size:
+            self.commit(chain)
+
+    def truncate(self, index, chain=-1):
+        chain = range(self.chains)[chain]
+        for name in self.trace_names[chain]:
+            self._traces[name]._index[chain] = self._offset + index
+        self.commit(chain)
+
+    def commit(self, chain=-1):
+        """Flush all traces of chain to disk and record the sampler state."""
+        if self.chains == 0:
+            return
+        chain = range(self.chains)[chain]
+        names = self.trace_names[chain]
+        for name in names:
+            self._traces[name]._flush(chain)
+        self._chains[chain]["length"] = int(self._traces[names[0]]._index[chain])
+
+        model = getattr(self, "model", None)
+        if model is not None and hasattr(model, "get_state"):
+            self._state_ = model.get_state()
+        if hasattr(self, "_state_"):
+            _atomic_write(
+                os.path.join(self.dbname, STATE), pickle.dumps(self._state_), "wb"
+            )
+        _atomic_write(
+            os.path.join(self.dbname, MANIFEST),
+            json.dumps({"chunk_size": self.chunk_size, "chains": self._chains}),
+        )
+
+    def _finalize(self, chain=-1):
+        chain = range(self.chains)[chain]
+        for name in self.trace_names[chain]:
+            self._traces[name]._finalize(chain)
+        self._chains[chain]["finalized"] = True
+        self.commit(chain)
+
+
+def load(dbname):
+    """Open the traces written to dbname for (lazy) reading or resuming."""
+    if not os.path.exists(os.path.join(dbname, MANIFEST)):
+        raise IOError("%s does not contain a memmap trace database." % dbname)
+    return Database(dbname, dbmode="a")
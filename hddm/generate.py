@@ -193,7 +193,7 @@ def gen_rts(
         method : str
             Which method to use to simulate the RTs:
                 * 'cdf': fast, uses the inverse of cumulative density function to sample, dt can be 1e-2.
-                * 'drift': slow, simulates each complete drift process, dt should be 1e-4.
+                * 'drift': simulates each complete drift process (compiled random walk), dt should be 1e-4.
 
     """
     if "v_switch" in params and method != "drift":
@@ -260,12 +260,15 @@ def gen_rts(
         return data
 
 
-def _gen_rts_from_simulated_drift(params, samples=1000, dt=1e-4, intra_sv=1.0):
+def _gen_rts_from_simulated_drift(
+    params, samples=1000, dt=1e-4, intra_sv=1.0, return_paths=False
+):
     """Returns simulated RTs from simulating the whole drift-process.
 
     :Arguments:
         params : dict
-            Parameter names and values.
+            Parameter names and values. Values can be scalars or arrays of
+            length samples (one parameter set per sample).
 
     :Optional:
         samlpes : int
@@ -274,112 +277,59 @@ def _gen_rts_from_simulated_drift(params, samples=1000, dt=1e-4, intra_sv=1.0):
             How many steps/sec.
         intra_sv : float
             Intra-trial variability.
+        return_paths : bool <default=False>
+            Also return the simulated drift path of every sample.
+
+    :Returns:
+        (rts, drifts) where drifts is None unless return_paths is set.
 
     :SeeAlso:
         gen_rts
     """
 
-    from numpy.random import rand
-
     if samples is None:
         samples = 1
-    nn = 1000
-    a = params["a"]
-    v = params["v"]
 
-    if "v_switch" in params:
-        switch = True
-        t_switch = params["t_switch"] / dt
-        # Hack so that we will always step into a switch
-        nn = int(round(t_switch))
-    else:
-        switch = False
+    def _param(name, default=0.0):
+        value = params[name] if name in params else default
+        return np.broadcast_to(np.asarray(value, dtype=np.double), (samples,))
+
+    a = _param("a")
+    v = _param("v")
+    z = _param("z", 0.5)
+    sz = _param("sz")
+    st = _param("st")
+    sv = _param("sv")
 
     # create delay
-    if "st" in params:
-        start_delay = (
-                uniform.rvs(loc=params["t"], scale=params["st"], size=samples)
-                - params["st"] / 2.0
-        )
-    else:
-        start_delay = np.ones(samples) * params["t"]
+    start_delay = _param("t") + (rand(samples) - 0.5) * st
 
     # create starting_points
-    if "sz" in params:
-        starting_points = (
-                                  uniform.rvs(loc=params["z"], scale=params["sz"], size=samples)
-                                  - params["sz"] / 2.0
-                          ) * a
-    else:
-        starting_points = np.ones(samples) * params["z"] * a
-
-    rts = np.empty(samples)
-    step_size = np.sqrt(dt) * intra_sv
-    drifts = []
-
-    for i_sample in range(samples):
-        drift = np.array([])
-        crossed = False
-        iter = 0
-        y_0 = starting_points[i_sample]
-        # drifting...
-        if "sv" in params and params["sv"] != 0:
-            drift_rate = norm.rvs(v, params["sv"])
-        else:
-            drift_rate = v
+    starting_points = (z + (rand(samples) - 0.5) * sz) * a
 
-        if "v_switch" in params:
-            if "V_switch" in params and params["V_switch"] != 0:
-                drift_rate_switch = norm.rvs(params["v_switch"], params["V_switch"])
-            else:
-                drift_rate_switch = params["v_switch"]
-
-        prob_up = 0.5 * (1 + np.sqrt(dt) / intra_sv * drift_rate)
-
-        while not crossed:
-            # Generate nn steps
-            iter += 1
-            if iter == 2 and switch:
-                prob_up = 0.5 * (1 + np.sqrt(dt) / intra_sv * drift_rate_switch)
-            position = ((rand(nn) < prob_up) * 2 - 1) * step_size
-            position[0] += y_0
-            position = np.cumsum(position)
-            # Find boundary crossings
-            cross_idx = np.where((position < 0) | (position > a))[0]
-            drift = np.concatenate((drift, position))
-            if cross_idx.shape[0] > 0:
-                crossed = True
-            else:
-                # If not crossed, set last position as starting point
-                # for next nn steps to continue drift
-                y_0 = position[-1]
-
-        # find the boundary interception
-        y2 = position[cross_idx[0]]
-        if cross_idx[0] != 0:
-            y1 = position[cross_idx[0] - 1]
-        else:
-            y1 = y_0
-        m = (y2 - y1) / dt  # slope
-        # y = m*x + b
-        b = y2 - m * ((iter - 1) * nn + cross_idx[0]) * dt  # intercept
-        if y2 < 0:
-            rt = (0 - b) / m
-        else:
-            rt = (a - b) / m
-        rts[i_sample] = (rt + start_delay[i_sample]) * np.sign(y2)
-
-        delay = start_delay[i_sample] / dt
-        drifts.append(
-            np.concatenate(
-                (
-                    np.ones(int(delay)) * starting_points[i_sample],
-                    drift[: int(abs(rt) / dt)],
-                )
-            )
-        )
+    # drifting...
+    drift_rate = v + sv * np.random.randn(samples)
 
-    return rts, drifts
+    if "v_switch" in params:
+        drift_rate_switch = _param("v_switch") + _param(
+            "V_switch"
+        ) * np.random.randn(samples)
+        n_switch = int(round(params["t_switch"] / dt))
+    else:
+        drift_rate_switch = drift_rate
+        n_switch = -1
+
+    return hddm.wfpt.gen_rts_from_simulated_drift(
+        starting_points,
+        np.ascontiguousarray(a),
+        drift_rate,
+        drift_rate_switch,
+        start_delay,
+        n_switch=n_switch,
+        dt=dt,
+        intra_sv=intra_sv,
+        return_paths=return_paths,
+    )
 
 
 def pdf_with_params(rt, params):
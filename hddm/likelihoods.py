@@ -111,6 +111,8 @@ def generate_wfpt_stochastic_class(
             "simps_err": 1e-3,
             "w_outlier": 0.1,
         }
+    # read at every evaluation: updating the dict in place changes the
+    # tolerances of existing nodes (see hddm.tolerance)
     wp = wiener_params
 
     # create likelihood function
@@ -216,6 +218,8 @@ def generate_wfpt_stochastic_class(
         time=cdf_range[1], **dict(list(self.parents.items()) + list(wp.items()))
     )
     wfpt.cdf = cdf
+    wfpt.wfpt_like = staticmethod(wfpt_like)
+    wfpt.wiener_params = wp
     wfpt.random = random
 
     # add quantiles functions
@@ -1,3 +1,5 @@
+import importlib
+
 from .base import AccumulatorModel, HDDMBase
 from .hddm_info import HDDM
 from .hddm_truncated import HDDMTruncated
@@ -8,9 +10,21 @@ from .hddm_rl_regression import HDDMrlRegressor
 from .hddm_rl import HDDMrl
 from .rl import Hrl
 
-from .hddm_nn import HDDMnn
-from .hddm_nn_regression import HDDMnnRegressor
-from .hddm_nn_stimcoding import HDDMnnStimCoding
+# the LAN models import pytorch, load them on first access
+_lazy_models = {
+    "HDDMnn": ".hddm_nn",
+    "HDDMnnRegressor": ".hddm_nn_regression",
+    "HDDMnnStimCoding": ".hddm_nn_stimcoding",
+}
+
+
+def __getattr__(name):
+    if name in _lazy_models:
+        model = getattr(importlib.import_module(_lazy_models[name], __name__), name)
+        globals()[name] = model
+        return model
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
 
 __all__ = [
     "AccumulatorModel",
@@ -15,6 +15,8 @@ from hddm.model_config import model_config
 
 
 from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
 
 import numpy as np
 import pymc as pm
@@ -25,7 +27,7 @@ import kabuki
 import inspect
 
 from kabuki.hierarchical import Knode
-from scipy.optimize import fmin_powell, fmin
+from scipy.optimize import brentq, fmin_powell, fmin
 
 # AF-TODO: This should be changed to use
 try:
@@ -37,6 +39,271 @@ except ImportError:
     pass
 
 
+def _share_frame(data):
+    """Copy the numeric columns (and index) of a DataFrame into one shared
+    memory block so that worker processes can attach to it instead of
+    receiving a pickled copy.
+
+    :Returns:
+        (shm, spec) - the SharedMemory block (owned by the caller, who has
+        to close and unlink it) and a small picklable description of the
+        layout that _attach_frame() uses to rebuild the DataFrame.
+    """
+    numeric = [c for c in data.columns if data[c].dtype.kind in "biuf"]
+    arrays = [("column", c, np.ascontiguousarray(data[c].values)) for c in numeric]
+    if data.index.dtype.kind in "biuf":
+        arrays.append(("index", data.index.name, np.asarray(data.index.values)))
+        index = None
+    else:
+        index = data.index
+
+    shm = shared_memory.SharedMemory(
+        create=True, size=max(1, sum(x[2].nbytes for x in arrays))
+    )
+    layout = []
+    offset = 0
+    for kind, name, values in arrays:
+        np.ndarray(values.shape, values.dtype, shm.buf, offset)[:] = values
+        layout.append((kind, name, values.dtype.str, offset))
+        offset += values.nbytes
+
+    spec = {
+        "shm_name": shm.name,
+        "length": len(data),
+        "columns": list(data.columns),
+        "layout": layout,
+        "objects": {c: data[c] for c in data.columns if c not in numeric},
+        "index": index,
+    }
+    return shm, spec
+
+
+def _attach_frame(spec):
+    """Rebuild the DataFrame described by spec (see _share_frame())."""
+    shm = shared_memory.SharedMemory(name=spec["shm_name"])
+    try:
+        columns = dict(spec["objects"])
+        index = spec["index"]
+        for kind, name, dtype, offset in spec["layout"]:
+            values = np.ndarray(spec["length"], np.dtype(dtype), shm.buf, offset)
+            values = values.copy()
+            if kind == "index":
+                index = pd.Index(values, name=name)
+            else:
+                columns[name] = values
+        for name, values in columns.items():
+            if isinstance(values, pd.Series):
+                columns[name] = values.values
+        return pd.DataFrame(columns, index=index, columns=spec["columns"])
+    finally:
+        shm.close()
+
+
+def _sample_chain(model_bytes, data_spec, seed, iter, burn, thin, sample_kwargs):
+    """Worker of AccumulatorModel.sample_chains(): rebuild the model from its
+    pickled state and the shared data, then sample a single chain."""
+    import cloudpickle
+
+    cls, state = cloudpickle.loads(model_bytes)
+    state["data"] = _attach_frame(data_spec)
+
+    np.random.seed(seed)
+    model = cls.__new__(cls)
+    model.__setstate__(state)
+    model.sample(iter, burn=burn, thin=thin, **sample_kwargs)
+
+    return model.get_traces()
+
+
+def _fit_ml(like, blocks, x0, n_runs, rng):
+    """Maximize the summed likelihood of blocks over the free values with
+    fmin_powell, restarting n_runs - 1 times close to x0.
+
+    :Arguments:
+        like : function
+            Likelihood function of the observed nodes, like(x, **params).
+        blocks : list
+            (x, fixed, free) for every observed node: its data, the constant
+            parameters and a mapping from parameter name to the position in
+            the vector of free values.
+        x0 : numpy.ndarray
+            Start values.
+        n_runs : int
+            Number of optimization runs.
+        rng : numpy.random.RandomState
+            Random state for the restarts.
+
+    :Returns:
+        (values, logp) of the best run.
+    """
+
+    def objective(values):
+        logp = 0
+        for x, fixed, free in blocks:
+            params = dict(fixed)
+            for name, idx in free.items():
+                params[name] = values[idx]
+            logp += like(x, **params)
+        if not np.isfinite(logp):
+            return np.inf
+        return -logp
+
+    best = None
+    for i_run in range(n_runs):
+        values = x0.copy()
+        # initialize restarts to a random point close to the start values
+        values_iter = 0
+        while i_run > 0 and values_iter < 20:
+            values_iter += 1
+            values = x0 + rng.randn(len(x0)) * (2 ** -values_iter)
+            if np.isfinite(objective(values)):
+                break
+
+        res = fmin_powell(
+            objective, values, full_output=True, maxiter=100, maxfun=50000, disp=0
+        )
+        if best is None or res[1] < best[1]:
+            best = res
+
+    return np.atleast_1d(best[0]), -best[1]
+
+
+def _set_node_value(db, name, value):
+    """Set the node name of the nodes table db to value. A deterministic node
+    is set through its only (subject level) stochastic parent by root
+    finding, e.g. z_subj.0 = invlogit(z_subj_trans.0) through z_subj_trans.0.
+
+    :Returns:
+        True if the node was set, False if it is not determined by a single
+        scalar stochastic or value is out of its range.
+    """
+    node = db.loc[name, "node"]
+    if db.loc[name, "stochastic"]:
+        node.value = value
+        return True
+
+    parents = [p for p in node.extended_parents if p.__name__ in db.index]
+    if len(parents) > 1 and "subj" in db.columns:
+        parents = [p for p in parents if db.loc[p.__name__, "subj"] == True]
+    if len(parents) != 1 or np.ndim(parents[0].value) != 0:
+        return False
+    parent = parents[0]
+    start = float(parent.value)
+
+    def residual(x):
+        parent.value = x
+        return float(node.value) - value
+
+    # the transforms are monotonic, widen a bracket around the current value
+    lo, hi, step = start, start, 1.0
+    for _ in range(64):
+        if residual(lo) * residual(hi) <= 0:
+            break
+        lo, hi, step = lo - step, hi + step, 2 * step
+    else:
+        parent.value = start
+        return False
+    parent.value = brentq(residual, lo, hi, xtol=1e-12)
+    return True
+
+
+def _fit_subject_ml(problem, n_runs, seed):
+    """Worker of AccumulatorModel.optimize(per_subject=True): fit one subject
+    given the cloudpickled (like, blocks, x0) of _fit_ml()."""
+    import cloudpickle
+
+    like, blocks, x0 = cloudpickle.loads(problem)
+    return _fit_ml(like, blocks, x0, n_runs, np.random.RandomState(seed))
+
+
+# per process state of the bootstrap workers, see _init_bootstrap_worker()
+_bootstrap_state = {}
+
+
+def _init_bootstrap_worker(payload, data_spec):
+    """Initializer of the bootstrap workers: attach the shared data and keep
+    the prebuilt objective (or model class) for all resamples."""
+    import cloudpickle
+
+    _bootstrap_state.clear()
+    _bootstrap_state.update(cloudpickle.loads(payload))
+    _bootstrap_state["data"] = _attach_frame(data_spec)
+
+
+def _bootstrap_single(seed):
+    """Worker of AccumulatorModel.optimize(n_bootstraps=..., n_jobs=...):
+    resample the shared data by index and optimize once."""
+    state = _bootstrap_state
+    data = state["data"]
+    rng = np.random.RandomState(seed)
+    idx = rng.randint(0, len(data), len(data))
+
+    if state["method"] != "ML":
+        new_data = data.take(idx).reset_index(drop=True)
+        h = state["cls"](new_data, **state["class_kwargs"])
+        h._run_optimization(
+            method=state["method"], quantiles=state["quantiles"], n_runs=state["n_runs"]
+        )
+        return pd.Series(h.values, dtype=np.float64)
+
+    # every observed node gets the resampled rows that fall into it
+    block_of_row = state["block_of_row"][idx]
+    blocks = [
+        (data.take(idx[block_of_row == k])[columns], fixed, free)
+        for k, (columns, fixed, free) in enumerate(state["blocks"])
+    ]
+    values, _ = _fit_ml(state["like"], blocks, state["x0"], state["n_runs"], rng)
+    return pd.Series(values, index=state["names"], dtype=np.float64)
+
+
+def _bootstrap_stats(res):
+    """Summary statistics and 95% interval of bootstrap estimates."""
+    stats = res.describe()
+    for q in [2.5, 97.5]:
+        stats = stats.append(
+            pd.DataFrame(res.quantile(q / 100.0), columns=[repr(q) + "%"]).T
+        )
+
+    return stats.sort_index()
+
+
+def _effective_sample_size(samples):
+    """Effective sample size of a (n_chains, n_samples) array of draws,
+    truncating the summed autocorrelations at the first negative pair
+    (Geyer's initial positive sequence, Gelman et al. 2013, 11.5).
+    """
+    samples = np.atleast_2d(np.asarray(samples, dtype=np.float64))
+    n_chains, n_samples = samples.shape
+    if n_samples < 4:
+        return float(n_chains * n_samples)
+
+    centered = samples - samples.mean(axis=1, keepdims=True)
+    n_fft = 1 << int(2 * n_samples - 1).bit_length()
+    spectrum = np.fft.rfft(centered, n=n_fft, axis=1)
+    acov = np.fft.irfft(spectrum * np.conjugate(spectrum), n=n_fft, axis=1)
+    acov = acov[:, :n_samples] / n_samples
+
+    within = np.mean(acov[:, 0]) * n_samples / (n_samples - 1.0)
+    var_plus = within * (n_samples - 1.0) / n_samples
+    if n_chains > 1:
+        var_plus += np.var(samples.mean(axis=1), ddof=1)
+    if var_plus <= 0:
+        return float(n_chains * n_samples)
+
+    rho = 1.0 - (within - acov.mean(axis=0)) / var_plus
+    rho[0] = 1.0
+
+    tau = -1.0
+    for t in range(0, n_samples - 1, 2):
+        pair = rho[t] + rho[t + 1]
+        if pair < 0:
+            break
+        tau += 2.0 * pair
+
+    n_draws = n_chains * n_samples
+    return float(n_draws / max(tau, 1.0 / np.log10(n_draws)))
+
+
 class AccumulatorModel(kabuki.Hierarchical):
     def __init__(self, data, **kwargs):
         # Flip sign for lower boundary RTs
@@ -76,6 +343,33 @@ class AccumulatorModel(kabuki.Hierarchical):
         self.std_depends = kwargs.pop("std_depends", False)
         super(AccumulatorModel, self).__init__(data, **kwargs)
 
+    def mcmc(self, *args, **kwargs):
+        """Returns pymc.MCMC object of model.
+
+        :Note:
+            In addition to the PyMC backends, db='memmap' streams the
+            traces to memory mapped files in the directory dbname
+            (see hddm.database).
+        """
+        if kwargs.get("db") == "memmap":
+            dbname = kwargs.pop("dbname", None) or "MCMC.memmap"
+            kwargs["db"] = hddm.database.Database(dbname)
+        return super(AccumulatorModel, self).mcmc(*args, **kwargs)
+
+    def load_db(self, dbname, verbose=0, db="sqlite"):
+        """Load samples from a database created by an earlier model run.
+        See kabuki.Hierarchical.load_db(); additionally supports db='memmap'.
+        """
+        if db != "memmap":
+            return super(AccumulatorModel, self).load_db(
+                dbname, verbose=verbose, db=db
+            )
+
+        self.mc = pm.MCMC(
+            self.nodes_db.node, db=hddm.database.load(dbname), verbose=verbose
+        )
+        return self
+
     def _create_an_average_model(self):
         raise NotImplementedError("This method has to be overloaded. See HDDMBase.")
 
@@ -166,6 +460,8 @@ class AccumulatorModel(kabuki.Hierarchical):
         n_runs=3,
         n_bootstraps=0,
         parallel_profile=None,
+        per_subject=False,
+        n_jobs=None,
     ):
         """
         Optimize model using ML, chi^2 or G^2.
@@ -187,6 +483,17 @@ class AccumulatorModel(kabuki.Hierarchical):
             parrall_profile : str <default=None>
                 IPython profile for parallelization.
 
+            per_subject : bool <default=False>
+                Maximize the likelihood of every subject separately (only
+                method='ML'). Works for group models as well and returns a
+                DataFrame of estimates (see _optimize_subjects()).
+
+            n_jobs : int <default=None>
+                Number of worker processes for per_subject fits. If set,
+                bootstrap iterations run in a local process pool with that
+                many workers instead of serially (unless parrall_profile is
+                given).
+
         :Output:
             results <dict> - a results dictionary of the parameters values.
 
@@ -195,6 +502,11 @@ class AccumulatorModel(kabuki.Hierarchical):
             The nodes of group models are not updated
         """
 
+        if per_subject:
+            if method != "ML":
+                raise ValueError("per_subject optimization requires method='ML'")
+            return self._optimize_subjects(n_runs=n_runs, n_jobs=n_jobs)
+
         results = self._run_optimization(
             method=method, quantiles=quantiles, n_runs=n_runs
         )
@@ -203,6 +515,13 @@ class AccumulatorModel(kabuki.Hierarchical):
         if n_bootstraps == 0:
             return results
 
+        if parallel_profile is None and n_jobs is not None:
+            res = self._bootstrap_pool(
+                n_bootstraps, n_jobs, method=method, quantiles=quantiles, n_runs=n_runs
+            )
+            self.bootstrap_stats = _bootstrap_stats(res)
+            return results
+
         # init DataFrame to save results
         res = pd.DataFrame(
             np.zeros((n_bootstraps, len(self.values))), columns=list(self.values.keys())
@@ -250,15 +569,269 @@ class AccumulatorModel(kabuki.Hierarchical):
             for i_strap in range(n_bootstraps):
                 res.iloc[i_strap] = runs_list[i_strap].get()
 
-        # get statistics
-        stats = res.describe()
-        for q in [2.5, 97.5]:
-            stats = stats.append(
-                pd.DataFrame(res.quantile(q / 100.0), columns=[repr(q) + "%"]).T
+        self.bootstrap_stats = _bootstrap_stats(res)
+        return results
+
+    def sample_chains(
+        self, n_chains=4, iter=2000, burn=1000, thin=1, n_jobs=None, seed=None, **kwargs
+    ):
+        """
+        Draw several independent MCMC chains in a local process pool.
+
+        Every chain is sampled from a fresh copy of the (unsampled) model in
+        its own process with an independent seed. The data is placed in
+        shared memory once instead of being pickled for every worker.
+
+        :Arguments:
+            n_chains : int <default=4>
+                Number of chains.
+            iter : int <default=2000>
+                Number of iterations per chain (see sample()).
+            burn : int <default=1000>
+                Number of burn-in iterations per chain.
+            thin : int <default=1>
+                Thinning factor.
+
+        :Optional:
+            n_jobs : int <default=None>
+                Number of worker processes (defaults to n_chains).
+            seed : int <default=None>
+                Seed from which the per-chain seeds are spawned.
+            kwargs :
+                Forwarded to sample() in every worker.
+
+        :Returns:
+            pandas.DataFrame with the traces of all stochastic nodes, indexed
+            by (chain, sample).
+
+        :Note:
+            The per-node Gelman-Rubin statistic and effective sample size are
+            stored in self.chain_stats.
+        """
+        import cloudpickle
+
+        seeds = [
+            int(s.generate_state(1)[0])
+            for s in np.random.SeedSequence(seed).spawn(n_chains)
+        ]
+        kwargs.setdefault("progress_bar", False)
+
+        # pickle the model as if it had not been sampled yet
+        sampled = self.sampled
+        self.sampled = False
+        try:
+            state = self.__getstate__()
+        finally:
+            self.sampled = sampled
+        data = state.pop("data")
+        model_bytes = cloudpickle.dumps((self.__class__, state))
+
+        shm, data_spec = _share_frame(data)
+        try:
+            with ProcessPoolExecutor(max_workers=n_jobs or n_chains) as pool:
+                futures = [
+                    pool.submit(
+                        _sample_chain,
+                        model_bytes,
+                        data_spec,
+                        chain_seed,
+                        iter,
+                        burn,
+                        thin,
+                        kwargs,
+                    )
+                    for chain_seed in seeds
+                ]
+                chains = [future.result() for future in futures]
+        finally:
+            shm.close()
+            shm.unlink()
+
+        traces = pd.concat(
+            chains, keys=list(range(n_chains)), names=["chain", "sample"]
+        )
+
+        stats = pd.DataFrame(index=chains[0].columns, columns=["rhat", "ess"])
+        for name in chains[0].columns:
+            samples = np.array([chain[name].values for chain in chains])
+            if n_chains > 1:
+                stats.loc[name, "rhat"] = pm.diagnostics.gelman_rubin(samples)
+            stats.loc[name, "ess"] = _effective_sample_size(samples)
+        self.chain_stats = stats.astype(np.float64)
+
+        return traces
+
+    def profile_logp(self, n_iter=100, flamegraph=None):
+        """Time the logp evaluation of every node during a short sampling
+        run and attribute it to node kinds, types and step methods.
+
+        :Optional:
+            n_iter : int <default=100>
+                Number of MCMC iterations.
+            flamegraph : str <default=None>
+                File to write the folded stacks to (flamegraph.pl or
+                speedscope input).
+
+        :Returns:
+            hddm.profiling.LogpProfile with the per-node and per-step-method
+            tables. The model's state and traces are left unchanged.
+        """
+        from hddm.profiling import profile_logp
+
+        return profile_logp(self, n_iter=n_iter, flamegraph=flamegraph)
+
+    def _ml_problems(self):
+        """Collect the direct likelihood problems of all subjects.
+
+        :Returns:
+            OrderedDict mapping subj_idx to (nodes, blocks, like), where nodes
+            maps the names of the free parent nodes to their position in the
+            vector of values and blocks/like are as in _fit_ml().
+        """
+        db = self.nodes_db
+        problems = OrderedDict()
+        for name, obs in self.get_observeds()["node"].items():
+            like = getattr(type(obs), "wfpt_like", None)
+            if like is None:
+                raise TypeError("direct ML optimization is not defined for %s" % name)
+            subj_idx = db.loc[name, "subj_idx"] if "subj_idx" in db.columns else 0
+            subj_idx = 0 if pd.isnull(subj_idx) else subj_idx
+            nodes, blocks, _ = problems.setdefault(
+                subj_idx, (OrderedDict(), [], like)
             )
 
-        self.bootstrap_stats = stats.sort_index()
-        return results
+            fixed = {}
+            free = {}
+            for param, parent in obs.parents.items():
+                if not isinstance(parent, pm.Node):
+                    fixed[param] = parent
+                    continue
+                if np.ndim(parent.value) != 0:
+                    raise TypeError(
+                        "direct ML optimization requires scalar parents, "
+                        "%s is not." % parent.__name__
+                    )
+                free[param] = nodes.setdefault(parent.__name__, len(nodes))
+            blocks.append((obs.value, fixed, free))
+
+        return problems
+
+    def _bootstrap_pool(self, n_bootstraps, n_jobs, method, quantiles, n_runs):
+        """Run the bootstrap iterations of optimize() in a local process pool.
+
+        The data is placed in shared memory once and every worker resamples
+        it by index. For method='ML' each worker keeps the direct likelihood
+        objective of _fit_ml() and only swaps the data of the observed nodes;
+        the estimates of the parents of the observed nodes are mapped back
+        to the nodes of self.values (see _set_node_value()) so the columns
+        are the same as for the serial bootstrap. Other methods build a new
+        model per resample.
+
+        :Returns:
+            pandas.DataFrame with one row per bootstrap iteration.
+        """
+        import cloudpickle
+
+        state = {"method": method, "quantiles": quantiles, "n_runs": n_runs}
+        if method == "ML":
+            nodes, blocks, like = list(self._ml_problems().values())[0]
+            block_of_row = np.full(len(self.data), -1)
+            for k, (x, _, _) in enumerate(blocks):
+                block_of_row[self.data.index.get_indexer(x.index)] = k
+            state.update(
+                like=like,
+                blocks=[
+                    (list(x.columns) if x.ndim == 2 else x.name, fixed, free)
+                    for x, fixed, free in blocks
+                ],
+                block_of_row=block_of_row,
+                names=list(nodes),
+                x0=np.array([float(self.nodes_db.loc[n, "node"].value) for n in nodes]),
+            )
+        else:
+            state.update(cls=self.__class__, class_kwargs=self._kwargs)
+
+        seeds = np.random.SeedSequence(np.random.randint(2 ** 31)).spawn(n_bootstraps)
+        seeds = [int(seed.generate_state(1)[0]) for seed in seeds]
+
+        shm, data_spec = _share_frame(self.data)
+        try:
+            with ProcessPoolExecutor(
+                max_workers=n_jobs,
+                initializer=_init_bootstrap_worker,
+                initargs=(cloudpickle.dumps(state), data_spec),
+            ) as pool:
+                runs = list(pool.map(_bootstrap_single, seeds))
+        finally:
+            shm.close()
+            shm.unlink()
+
+        if method == "ML":
+            db = self.nodes_db
+            values = self.values
+            for k, run in enumerate(runs):
+                for name, value in run.items():
+                    _set_node_value(db, name, value)
+                runs[k] = pd.Series(self.values, dtype=np.float64)
+            # deterministic nodes follow their restored stochastic parents
+            for name, value in values.items():
+                if db.loc[name, "stochastic"]:
+                    _set_node_value(db, name, value)
+
+        return pd.DataFrame(runs).reset_index(drop=True)
+
+    def _optimize_subjects(self, n_runs=3, n_jobs=None):
+        """Fit every subject by maximum likelihood in a process pool.
+
+        The objective of each subject is a closure over the likelihood
+        function of the observed nodes (e.g. hddm.wfpt.wiener_like), their
+        data and the current values of their parents, so no PyMC graph is
+        evaluated. Every distinct parent node of a subject's observed nodes
+        is a free parameter; group-only nodes are estimated separately for
+        every subject. The nodes are set to their estimates, deterministic
+        ones through their stochastic parent (see _set_node_value()); a node
+        shared by several subjects is set to the mean of their estimates.
+
+        :Returns:
+            pandas.DataFrame with columns subj_idx, knode, node, value and
+            logp (the maximized log-likelihood of the subject).
+        """
+        import cloudpickle
+
+        db = self.nodes_db
+        problems = self._ml_problems()
+        seeds = np.random.SeedSequence(np.random.randint(2 ** 31))
+        seeds = seeds.spawn(len(problems))
+        jobs = []
+        for (nodes, blocks, like), seed in zip(problems.values(), seeds):
+            x0 = np.array([float(db.loc[name, "node"].value) for name in nodes])
+            problem = cloudpickle.dumps((like, blocks, x0))
+            jobs.append((problem, n_runs, int(seed.generate_state(1)[0])))
+
+        if n_jobs == 1:
+            fits = [_fit_subject_ml(*job) for job in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+                fits = list(pool.map(_fit_subject_ml, *zip(*jobs)))
+
+        rows = []
+        for (subj_idx, (nodes, _, _)), (values, logp) in zip(problems.items(), fits):
+            for name, value in zip(nodes, values):
+                rows.append(
+                    {
+                        "subj_idx": subj_idx,
+                        "knode": db.loc[name, "knode_name"],
+                        "node": name,
+                        "value": value,
+                        "logp": logp,
+                    }
+                )
+
+        columns = ["subj_idx", "knode", "node", "value", "logp"]
+        fits = pd.DataFrame(rows, columns=columns)
+        for name, value in fits.groupby("node", sort=False)["value"].mean().items():
+            _set_node_value(db, name, value)
+        return fits
 
     def _run_optimization(self, method, quantiles, n_runs):
         """function used by optimize."""
@@ -1285,6 +1858,36 @@ class HDDMBase(AccumulatorModel):
         )
         super(HDDMBase, self).__setstate__(d)
 
+    def sample(self, *args, **kwargs):
+        """Sample from the posterior, see kabuki.Hierarchical.sample().
+
+        :Optional:
+            tolerance_schedule : bool or hddm.tolerance.ToleranceSchedule
+                <default=None>
+                Sample the start of the burn-in with loose wiener_params and
+                switch to the model's tolerances before the burn-in ends
+                (True uses ToleranceSchedule()). The switch iteration and a
+                check of the retained draws are stored in
+                self.tolerance_report.
+        """
+        schedule = kwargs.pop("tolerance_schedule", None)
+        if not schedule:
+            return super(HDDMBase, self).sample(*args, **kwargs)
+        if schedule is True:
+            schedule = hddm.tolerance.ToleranceSchedule()
+
+        burn = args[1] if len(args) > 1 else kwargs.get("burn", 0)
+        if getattr(self, "mc", None) is None:
+            self.mcmc()
+        self.mc.assign_step_methods()
+        schedule.attach(self, burn)
+        try:
+            mc = super(HDDMBase, self).sample(*args, **kwargs)
+        finally:
+            schedule.detach(self)
+        self.tolerance_report = schedule.check(self)
+        return mc
+
     def _create_wfpt_parents_dict(self, knodes):
         wfpt_parents = OrderedDict()
 
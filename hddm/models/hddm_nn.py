@@ -42,6 +42,16 @@ class HDDMnn(HDDM):
             String that defines which kind of network to use for the likelihoods. There are currently two
             options: 'mlp', 'cnn'. CNNs should be treated as experimental at this point.
 
+        backend: str <default='torch'>
+            Inference backend of the network: 'torch' or 'numpy'. The numpy backend
+            does not need pytorch once the weights were converted (see
+            hddm.torch.mlp_numpy_inference).
+
+        precision: str <default='float32'>
+            Precision of the torch network: 'float32', 'bf16' or 'int8' (dynamically
+            quantized, CPU only). Check the resulting likelihood error with
+            hddm.torch.mlp_inference_class.precision_report() first.
+
         nbin: int <default=512>
             Relevant only if network type was chosen to be 'cnn'. CNNs can be trained on coarser or
             finer binnings of RT space. At this moment only networks with 512 bins are available.
@@ -109,6 +119,12 @@ class HDDMnn(HDDM):
              If True it means that both, group mean and std will be split
              by condition.
 
+        batch_nodes : bool (default=False)
+             Evaluate the likelihoods of all observed nodes whose parameters
+             changed in a single forward pass of the network (see
+             hddm.utils.LANBatch). Speeds up group models with many
+             subjects or conditions, in particular on CPU.
+
     :Example:
         >>> data, params = hddm.generate.gen_rand_data() # gen data
         >>> model = hddm.HDDMnn(data, model = 'angle', network_type = 'mlp) # create object
@@ -124,15 +140,23 @@ class HDDMnn(HDDM):
         )
         kwargs["informative"] = False
         self.network_type = kwargs.pop("network_type", "torch_mlp")
+        self.backend = kwargs.pop("backend", "torch")
+        self.precision = kwargs.pop("precision", "float32")
         self.network = kwargs.pop("network", None)  # LAX
         self.non_centered = kwargs.pop("non_centered", False)
         self.w_outlier = kwargs.pop("w_outlier", 0.1)
         self.model = kwargs.pop("model", "ddm")
+        self.batch_nodes = kwargs.pop("batch_nodes", False)
 
         if self.network_type == "torch_mlp":
             if self.network is None:
                 try:
-                    self.network = load_torch_mlp(model=self.model)
+                    self.network = load_torch_mlp(
+                        model=self.model,
+                        backend=self.backend,
+                        precision=self.precision,
+                        owner=self,
+                    )
                 except:
                     print("Couldn't find load_torch_mlp()... pytorch not installed?")
                     return None
@@ -158,16 +182,31 @@ class HDDMnn(HDDM):
             **wfpt_parents
         )
 
+    def create_model(self, *args, **kwargs):
+        super(HDDMnn, self).create_model(*args, **kwargs)
+        if self.batch_nodes:
+            self.lan_batch = hddm.utils.LANBatch(
+                self.get_observeds()["node"],
+                hddm.model_config.model_config[self.model]["params"],
+                self.network,
+            )
+
     def __getstate__(self):
         d = super(HDDMnn, self).__getstate__()
         del d["network"]
         del d["wfpt_nn"]
+        d.pop("lan_batch", None)
         return d
 
     def __setstate__(self, d):
 
         if d["network_type"] == "torch_mlp":
-            d["network"] = load_torch_mlp(model=d["model"])
+            d["network"] = load_torch_mlp(
+                model=d["model"],
+                backend=d.get("backend", "torch"),
+                precision=d.get("precision", "float32"),
+                owner=self,
+            )
             network_dict = {"network": d["network"]}
             d["wfpt_nn"] = hddm.likelihoods_mlp.make_mlp_likelihood(
                 model=d["model"], **network_dict
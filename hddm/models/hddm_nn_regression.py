@@ -92,6 +92,8 @@ class HDDMnnRegressor(HDDMRegressor):
         )
         kwargs["informative"] = False
         self.network_type = kwargs.pop("network_type", "torch_mlp")
+        self.backend = kwargs.pop("backend", "torch")
+        self.precision = kwargs.pop("precision", "float32")
         self.network = kwargs.pop("network", None)
         self.non_centered = kwargs.pop("non_centered", False)
 
@@ -101,7 +103,12 @@ class HDDMnnRegressor(HDDMRegressor):
         if self.network_type == "torch_mlp":
             if self.network is None:
                 try:
-                    self.network = load_torch_mlp(model=self.model)
+                    self.network = load_torch_mlp(
+                        model=self.model,
+                        backend=self.backend,
+                        precision=self.precision,
+                        owner=self,
+                    )
                 except:
                     print("Couldn't find load_torch_mlp()... pytorch not installed?")
                     return None
@@ -136,7 +143,12 @@ class HDDMnnRegressor(HDDMRegressor):
 
     def __setstate__(self, d):
         if d["network_type"] == "torch_mlp":
-            d["network"] = load_torch_mlp(model=d["model"])
+            d["network"] = load_torch_mlp(
+                model=d["model"],
+                backend=d.get("backend", "torch"),
+                precision=d.get("precision", "float32"),
+                owner=self,
+            )
             network_dict = {"network": d["network"]}
             d["wfpt_nn_reg_class"] = hddm.likelihoods_mlp.make_mlp_likelihood_reg(
                 model=d["model"], **network_dict
@@ -36,6 +36,16 @@ class HDDMnnStimCoding(HDDMStimCoding):
             String that defines which kind of network to use for the likelihoods. There are currently two
             options: 'mlp', 'cnn'. CNNs should be treated as experimental at this point.
 
+        backend: str <default='torch'>
+            Inference backend of the network: 'torch' or 'numpy'. The numpy backend
+            does not need pytorch once the weights were converted (see
+            hddm.torch.mlp_numpy_inference).
+
+        precision: str <default='float32'>
+            Precision of the torch network: 'float32', 'bf16' or 'int8' (dynamically
+            quantized, CPU only). Check the resulting likelihood error with
+            hddm.torch.mlp_inference_class.precision_report() first.
+
         nbin: int <default=512>
             Relevant only if network type was chosen to be 'cnn'. CNNs can be trained on coarser or
             finer binnings of RT space. At this moment only networks with 512 bins are available.
@@ -67,6 +77,8 @@ class HDDMnnStimCoding(HDDMStimCoding):
         )
         kwargs["informative"] = False
         self.network_type = kwargs.pop("network_type", "torch_mlp")
+        self.backend = kwargs.pop("backend", "torch")
+        self.precision = kwargs.pop("precision", "float32")
         self.network = kwargs.pop("network", None)
         self.non_centered = kwargs.pop("non_centered", False)
         self.w_outlier = kwargs.pop("w_outlier", 0.1)
@@ -75,7 +87,12 @@ class HDDMnnStimCoding(HDDMStimCoding):
         if self.network_type == "torch_mlp":
             if self.network is None:
                 try:
-                    self.network = load_torch_mlp(model=self.model)
+                    self.network = load_torch_mlp(
+                        model=self.model,
+                        backend=self.backend,
+                        precision=self.precision,
+                        owner=self,
+                    )
                 except:
                     print("Couldn't find load_torch_mlp()... pytorch not installed?")
                     return None
@@ -116,7 +133,12 @@ class HDDMnnStimCoding(HDDMStimCoding):
     def __setstate__(self, d):
 
         if d["network_type"] == "torch_mlp":
-            d["network"] = load_torch_mlp(model=d["model"])
+            d["network"] = load_torch_mlp(
+                model=d["model"],
+                backend=d.get("backend", "torch"),
+                precision=d.get("precision", "float32"),
+                owner=self,
+            )
             network_dict = {"network": d["network"]}
             d["wfpt_nn"] = hddm.likelihoods_mlp.make_mlp_likelihood(
                 model=d["model"], **network_dict
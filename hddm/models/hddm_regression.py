@@ -76,16 +76,16 @@ def generate_wfpt_reg_stochastic_class(
         sampled_rts = self.value.copy()
 
         if sampling_method == "drift":
-            for i in self.value.index:
-                # get current params
-                for p in self.parents["reg_outcomes"]:
-                    param_dict[p] = np.asscalar(self.parents.value[p].loc[i])
-                # sample
-                samples = hddm.generate.gen_rts(
-                    method=sampling_method, size=1, dt=sampling_dt, **param_dict
-                )
-
-                sampled_rts.loc[i, "rt"] = hddm.utils.flip_errors(samples).rt.iloc[0]
+            # one parameter set per trial, simulated in a single call
+            for p in self.parents["reg_outcomes"]:
+                param_dict[p] = self.parents.value[p].loc[self.value.index].values
+            sampled_rts["rt"] = hddm.generate.gen_rts(
+                method=sampling_method,
+                size=self.value.shape[0],
+                dt=sampling_dt,
+                structured=False,
+                **param_dict
+            )
 
             return sampled_rts
 
@@ -100,7 +100,7 @@ def generate_wfpt_reg_stochastic_class(
                     # print(param_dict[tmp_str])
                     # print(param_dict[tmp_str].shape)
                     # print(type(param_dict[tmp_str]))
-                    param_data[:, cnt] = param_dict[tmp_str].iloc[self.value.index]
+                    param_data[:, cnt] = param_dict[tmp_str].loc[self.value.index]
                 else:
                     param_data[:, cnt] = param_dict[tmp_str]
                 cnt += 1
@@ -160,11 +160,13 @@ class KnodeRegress(kabuki.hierarchical.Knode):
 
         # AF-comment: The dmatrix seems to be hardcoded --> If you want to use post_pred_gen() later on other covariates,
         # you can't, because changing model.data doesn't affect func as defined here ?
+        full_design_matrix = dmatrix(
+            reg["model"], data=self.data, return_type="dataframe", NA_action="raise"
+        )
+
         def func(
             args,
-            design_matrix=dmatrix(
-                reg["model"], data=self.data, return_type="dataframe", NA_action="raise"
-            ),
+            design_matrix=full_design_matrix,
             link_func=reg["link_func"],
             knode_data=data,
         ):
@@ -180,9 +182,76 @@ class KnodeRegress(kabuki.hierarchical.Knode):
 
             return predictor
 
-        return self.pymc_node(
+        node = self.pymc_node(
             func, kwargs["doc"], name, parents=parents, trace=self.keep_regressor_trace
         )
+        # kept for reconstructing the trace, see iter_regressor_trace(); like
+        # in func, link_func gets the linear predictor as a Series
+        node.design_matrix = full_design_matrix.loc[data.index]
+        node.link_func = reg["link_func"]
+        return node
+
+
+def iter_regressor_trace(node, chunk_size=1000):
+    """Recompute the posterior trace of a regression node (e.g. v_reg_subj.0)
+    from the traces of its coefficients, chunk_size draws at a time.
+
+    Only the coefficient traces need to be stored (keep_regressor_trace=False);
+    every chunk costs one product of the node's design matrix with the
+    coefficient draws of the chunk. The link function is then applied draw
+    by draw to the linear predictor as a Series indexed like the data, as
+    when the node is evaluated (node.link_func wraps it if the node passes
+    another type).
+
+    :Arguments:
+        node : pymc.Deterministic
+            Regression node created by KnodeRegress.
+
+    :Optional:
+        chunk_size : int <default=1000>
+            Number of draws per chunk.
+
+    :Returns:
+        Generator of numpy.ndarrays of shape (draws in chunk, trials of node).
+    """
+    coefs = []
+    for coef in node.parents["args"]:
+        if not isinstance(coef, pm.Node):
+            coefs.append(coef)
+            continue
+        try:
+            coefs.append(np.asarray(coef.trace()[:], dtype=float))
+        except (AttributeError, TypeError):
+            raise ValueError(
+                "The coefficient %s of %s has no trace."
+                % (coef.__name__, node.__name__)
+            )
+    n_draws = max(np.size(coef) for coef in coefs)
+    coefs = np.column_stack(
+        [np.broadcast_to(coef, n_draws).reshape(-1) for coef in coefs]
+    )
+
+    design_matrix = np.asarray(node.design_matrix, dtype=float)
+    index = node.design_matrix.index
+    for start in range(0, n_draws, chunk_size):
+        linear = np.dot(design_matrix, coefs[start : start + chunk_size].T)
+        yield np.array(
+            [
+                np.ravel(np.asarray(node.link_func(pd.Series(draw, index=index))))
+                for draw in linear.T
+            ],
+            dtype=float,
+        )
+
+
+def _regressor_trace(model, name, chunk_size):
+    node = model.nodes_db.loc[name, "node"]
+    if not hasattr(node, "design_matrix"):
+        raise ValueError("%s is not a regression node." % name)
+    return pd.DataFrame(
+        np.concatenate(list(iter_regressor_trace(node, chunk_size))),
+        columns=node.design_matrix.index,
+    )
 
 
 class HDDMRegressor(HDDM):
@@ -217,8 +286,10 @@ class HDDMRegressor(HDDM):
             * group_only_regressors : bool (default=True)
                 Do not estimate individual subject parameters for all regressors.
             * keep_regressor_trace : bool (default=False)
-                Whether to keep a trace of the regressor. This will use much more space,
-                but needed for posterior predictive checks.
+                Whether to store the trace of the regressor. This uses
+                draws x trials of memory per node; posterior predictive
+                checks and get_regressor_trace() recompute the regressor
+                from the coefficient traces instead.
             * Additional keyword args are passed on to HDDM.
 
         :Note:
@@ -331,6 +402,24 @@ class HDDMRegressor(HDDM):
         # model["link_func"] = id_link
         super(HDDMRegressor, self).__setstate__(d)
 
+    def get_regressor_trace(self, name, chunk_size=1000):
+        """Posterior trace of a regression node, recomputed from the
+        coefficient traces (see iter_regressor_trace()).
+
+        :Arguments:
+            name : str
+                Name of the node, e.g. 'v_reg' or 'v_reg_subj.0'.
+
+        :Optional:
+            chunk_size : int <default=1000>
+                Number of draws computed at once.
+
+        :Returns:
+            pandas.DataFrame with one row per draw and one column per trial
+            (the data index).
+        """
+        return _regressor_trace(self, name, chunk_size)
+
     def _create_wfpt_knode(self, knodes):
         wfpt_parents = self._create_wfpt_parents_dict(knodes)
         return Knode(
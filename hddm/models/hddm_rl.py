@@ -2,6 +2,7 @@
 """
 
 from copy import copy
+from functools import partial
 import numpy as np
 import pymc
 import wfpt
@@ -12,6 +13,16 @@ from hddm.models import HDDM
 from wfpt import wiener_like_rlddm, wiener_like_rlddm_2step , wiener_like_rlddm_uncertainty  #wiener_like_rlddm_2step_reg, wiener_like_rlddm_2step_reg_sliding_window # wiener_like_rlddm_2step,
 from collections import OrderedDict
 
+# default wiener_params of the RL-DDM likelihoods; HDDMrl passes its own
+WIENER_PARAMS = {
+    "err": 1e-4,
+    "n_st": 2,
+    "n_sz": 2,
+    "use_adaptive": 1,
+    "simps_err": 1e-3,
+    "w_outlier": 0.1,
+}
+
 
 class HDDMrl(HDDM):
     """HDDM model that can be used for two-armed bandit tasks."""
@@ -781,7 +792,9 @@ class HDDMrl(HDDM):
     def _create_wfpt_knode(self, knodes):
         wfpt_parents = self._create_wfpt_parents_dict(knodes)
         return Knode(
-            self.wfpt_rl_class,
+            generate_wfpt_rl_stochastic_class(
+                self.wiener_params, self.wfpt_rl_class.wfpt_like
+            ),
             "wfpt",
             observed=True,
             col_name=["split_by", "feedback", "response1", "response2", "rt1", "rt2",  "q_init", "state1", "state2", ],
@@ -790,17 +803,9 @@ class HDDMrl(HDDM):
         )
 
 
-def wienerRL_like(x, v, alpha, pos_alpha, sv, a, z, sz, t, st, p_outlier=0):
+def wienerRL_like(x, v, alpha, pos_alpha, sv, a, z, sz, t, st, p_outlier=0, trial_logp=None, *, wiener_params=None):
 
-    wiener_params = {
-        "err": 1e-4,
-        "n_st": 2,
-        "n_sz": 2,
-        "use_adaptive": 1,
-        "simps_err": 1e-3,
-        "w_outlier": 0.1,
-    }
-    wp = wiener_params
+    wp = WIENER_PARAMS if wiener_params is None else wiener_params
     response = x["response"].values.astype(int)
     q = x["q_init"].iloc[0]
     feedback = x["feedback"].values.astype(float)
@@ -821,23 +826,16 @@ def wienerRL_like(x, v, alpha, pos_alpha, sv, a, z, sz, t, st, p_outlier=0):
         t,
         st,
         p_outlier=p_outlier,
+        trial_logp=trial_logp,
         **wp
     )
 
 
 def wienerRL_like_2step(x, v0, v1, v2, v_interaction, z0, z1, z2, z_interaction, lambda_, alpha, pos_alpha, gamma,gamma2, a,z,sz,t,st,v,sv, a_2, z_2, t_2,v_2,alpha2,
                                            two_stage, w, w2,z_scaler,z_sigma,z_sigma2,window_start,window_size, beta_ndt, beta_ndt2, beta_ndt3,
-                        st2, sv2, sz2, p_outlier=0): # regression ver2: bounded, a fixed to 1
-
-    wiener_params = {
-        "err": 1e-4,
-        "n_st": 2,
-        "n_sz": 2,
-        "use_adaptive": 1,
-        "simps_err": 1e-3,
-        "w_outlier": 0.1,
-    }
-    wp = wiener_params
+                        st2, sv2, sz2, p_outlier=0, trial_logp=None, *, wiener_params=None): # regression ver2: bounded, a fixed to 1
+
+    wp = WIENER_PARAMS if wiener_params is None else wiener_params
     response1 = x["response1"].values.astype(int)
     response2 = x["response2"].values.astype(int)
     state1 = x["state1"].values.astype(int)
@@ -922,6 +920,7 @@ def wienerRL_like_2step(x, v0, v1, v2, v_interaction, z0, z1, z2, z_interaction,
         beta_ndt3,
         st,
         p_outlier=p_outlier,
+        trial_logp=trial_logp,
         **wp
     )
 # def wienerRL_like_bayesianQ(x, v0, v1, v2, v_interaction, z0, z1, z2, z_interaction, lambda_, alpha, pos_alpha, gamma, gamma2,a,z,t,v, a_2, z_2, t_2,v_2,alpha2,
@@ -1020,17 +1019,9 @@ def wienerRL_like_2step(x, v0, v1, v2, v_interaction, z0, z1, z2, z_interaction,
 #     )
 def wienerRL_like_uncertainty(x, v0, v1, v2, v_interaction, z0, z1, z2, z_interaction, lambda_, alpha, pos_alpha, gamma, gamma2, a,z,sz,t,st,v,sv, a_2, z_2, t_2,v_2,alpha2,
                                            two_stage, w, w2,z_scaler, z_scaler_2, z_sigma,z_sigma2,window_start,window_size, beta_ndt, beta_ndt2, beta_ndt3, beta_ndt4,
-                              model_unc_rep, mem_unc_rep, unc_hybrid, w_unc, st2, sv2, sz2, p_outlier=0): # regression ver2: bounded, a fixed to 1
-
-    wiener_params = {
-        "err": 1e-4,
-        "n_st": 2,
-        "n_sz": 2,
-        "use_adaptive": 1,
-        "simps_err": 1e-3,
-        "w_outlier": 0.1,
-    }
-    wp = wiener_params
+                              model_unc_rep, mem_unc_rep, unc_hybrid, w_unc, st2, sv2, sz2, p_outlier=0, trial_logp=None, *, wiener_params=None): # regression ver2: bounded, a fixed to 1
+
+    wp = WIENER_PARAMS if wiener_params is None else wiener_params
     response1 = x["response1"].values.astype(int)
     response2 = x["response2"].values.astype(int)
     state1 = x["state1"].values.astype(int)
@@ -1122,8 +1113,37 @@ def wienerRL_like_uncertainty(x, v0, v1, v2, v_interaction, z0, z1, z2, z_intera
         w_unc,
         st,
         p_outlier=p_outlier,
+        trial_logp=trial_logp,
         **wp
     )
+def generate_wfpt_rl_stochastic_class(wiener_params=None, like=None):
+    """Create the stochastic class of an RL-DDM likelihood bound to
+    wiener_params.
+
+    :Arguments:
+        wiener_params : dict <default=None>
+            wiener_params of the likelihood (WIENER_PARAMS if None). The dict is
+            read at every evaluation, so updating it in place changes the
+            tolerances of existing nodes (see hddm.tolerance).
+        like : function <default=wienerRL_like_uncertainty>
+            Likelihood taking wiener_params as keyword argument.
+
+    :Output:
+        class: the stochastic, with the bound likelihood as wfpt_like
+    """
+    if wiener_params is None:
+        wiener_params = dict(WIENER_PARAMS)
+    if like is None:
+        like = wienerRL_like_uncertainty
+    # keyword-only, so wiener_params does not become a parent of the nodes
+    logp = partial(like, wiener_params=wiener_params)
+    stoch = stochastic_from_dist(like.__name__.replace("_like", ""), logp)
+    stoch.wfpt_like = staticmethod(logp)
+    stoch.wiener_params = wiener_params
+    return stoch
+
+
 # WienerRL = stochastic_from_dist("wienerRL_2step", wienerRL_like_2step)
 # WienerRL = stochastic_from_dist("wienerRL_bayesianQ", wienerRL_like_bayesianQ)
-WienerRL = stochastic_from_dist("wienerRL_uncertainty", wienerRL_like_uncertainty)
\ No newline at end of file
+WienerRL = stochastic_from_dist("wienerRL_uncertainty", wienerRL_like_uncertainty)
+WienerRL.wfpt_like = staticmethod(wienerRL_like_uncertainty)
\ No newline at end of file
@@ -10,6 +10,7 @@ from hddm.models import HDDM
 import kabuki
 from kabuki import Knode
 from kabuki.utils import stochastic_from_dist
+from hddm.models.hddm_regression import _regressor_trace
 
 
 def generate_wfpt_rl_reg_stochastic_class(
@@ -71,16 +72,34 @@ def generate_wfpt_rl_reg_stochastic_class(
         del param_dict["reg_outcomes"]
         sampled_rts = self.value.copy()
 
-        for i in self.value.index:
-            # get current params
+        if sampling_method == "drift":
+            # one parameter set per trial, simulated in a single call
             for p in self.parents["reg_outcomes"]:
-                param_dict[p] = np.asscalar(self.parents.value[p].loc[i])
-            # sample
-            samples = hddm.generate.gen_rts(
-                method=sampling_method, size=1, dt=sampling_dt, **param_dict
+                param_dict[p] = self.parents.value[p].loc[self.value.index].values
+            sampled_rts["rt"] = hddm.generate.gen_rts(
+                method=sampling_method,
+                size=self.value.shape[0],
+                dt=sampling_dt,
+                structured=False,
+                **param_dict
             )
+            return sampled_rts
 
-            sampled_rts.loc[i, "rt"] = hddm.utils.flip_errors(samples).rt
+        # the cdf sampler only takes scalar parameters
+        rts = np.empty(self.value.shape[0])
+        for j, i in enumerate(self.value.index):
+            # get current params
+            for p in self.parents["reg_outcomes"]:
+                param_dict[p] = float(self.parents.value[p].loc[i])
+            # sample
+            rts[j] = hddm.generate.gen_rts(
+                method=sampling_method,
+                size=1,
+                dt=sampling_dt,
+                structured=False,
+                **param_dict
+            )[0]
+        sampled_rts["rt"] = rts
 
         return sampled_rts
 
@@ -134,9 +153,16 @@ class KnodeRegress(kabuki.hierarchical.Knode):
 
             return pd.DataFrame(predictor, index=data.index)
 
-        return self.pymc_node(
+        node = self.pymc_node(
             func, kwargs["doc"], name, parents=parents, trace=self.keep_regressor_trace
         )
+        # kept for reconstructing the trace, see iter_regressor_trace(); like
+        # in func, the link function gets a one-column DataFrame
+        node.design_matrix = pd.DataFrame(np.asarray(dm), index=data.index)
+        node.link_func = lambda linear, link_func=reg["link_func"]: link_func(
+            linear.to_frame()
+        )
+        return node
 
 
 class HDDMrlRegressor(HDDM):
@@ -171,8 +197,10 @@ class HDDMrlRegressor(HDDM):
             * group_only_regressors : bool (default=True)
                 Do not estimate individual subject parameters for all regressors.
             * keep_regressor_trace : bool (default=False)
-                Whether to keep a trace of the regressor. This will use much more space,
-                but needed for posterior predictive checks.
+                Whether to store the trace of the regressor. This uses
+                draws x trials of memory per node; posterior predictive
+                checks and get_regressor_trace() recompute the regressor
+                from the coefficient traces instead.
             * Additional keyword args are passed on to HDDM.
 
         :Note:
@@ -284,6 +312,11 @@ class HDDMrlRegressor(HDDM):
             model["link_func"] = lambda x: x
         super(HDDMrlRegressor, self).__setstate__(d)
 
+    def get_regressor_trace(self, name, chunk_size=1000):
+        """Posterior trace of a regression node, recomputed from the
+        coefficient traces, see HDDMRegressor.get_regressor_trace()."""
+        return _regressor_trace(self, name, chunk_size)
+
     def _create_stochastic_knodes_rl(self, include):
         knodes = super(HDDMrlRegressor, self)._create_stochastic_knodes(include)
         if "alpha" in include:
@@ -324,7 +324,7 @@ class Hrl(HDDM):
             **wfpt_parents
         )
 
-def RL_like(x, v, alpha, pos_alpha, z=0.5, p_outlier=0):
+def RL_like(x, v, alpha, pos_alpha, z=0.5, p_outlier=0, trial_logp=None):
 
     wiener_params = {
         "err": 1e-4,
@@ -350,6 +350,7 @@ def RL_like(x, v, alpha, pos_alpha, z=0.5, p_outlier=0):
         v,
         z,
         p_outlier=p_outlier,
+        trial_logp=trial_logp,
         **wp
     )
 
@@ -433,7 +434,7 @@ def RL_like(x, v, alpha, pos_alpha, z=0.5, p_outlier=0):
 #     )
 
 
-def RL_like_2step(x, v, v_2, alpha, alpha2, two_stage, pos_alpha, gamma, gamma2, lambda_, w, window_start, window_size, sv, sz, st, sv2, sz2, st2, z=0.5, z_2 = 0.5, p_outlier=0):
+def RL_like_2step(x, v, v_2, alpha, alpha2, two_stage, pos_alpha, gamma, gamma2, lambda_, w, window_start, window_size, sv, sz, st, sv2, sz2, st2, z=0.5, z_2 = 0.5, p_outlier=0, trial_logp=None):
 
     # wiener_params = {
     #     "err": 1e-4,
@@ -513,10 +514,12 @@ def RL_like_2step(x, v, v_2, alpha, alpha2, two_stage, pos_alpha, gamma, gamma2,
         window_size,
         sv, sz, st, sv2, sz2, st2, 
         p_outlier=p_outlier,
+        trial_logp=trial_logp,
         
         **wp
     )
 # RL = stochastic_from_dist("RL", RL_like)
 RL_2step = stochastic_from_dist("RL_2step", RL_like_2step)
+RL_2step.wfpt_like = staticmethod(RL_like_2step)
 # RL_2step_sliding_window = stochastic_from_dist("RL_2step_sliding_window", RL_like_2step_sliding_window)
 #
\ No newline at end of file
@@ -24,7 +24,9 @@ except:
 from hddm.simulators.basic_simulator import *
 
 from sklearn.neighbors import KernelDensity
+from scipy.special import logsumexp
 import os
+from collections import OrderedDict
 
 from hddm.model_config import model_config
 
@@ -98,6 +100,91 @@ def _bandwidth_silverman(
     return np.power((4 / 3), 1 / 5) * std * np.power(n, (-1 / 5))
 
 
+class _FFTKernelDensity:
+    """Gaussian kernel density estimator on a regular grid.
+
+    The sample is linearly binned on n_grid points spanning its range plus
+    5 bandwidths on either side, convolved with the Gaussian kernel through
+    the FFT and interpolated linearly at the evaluation points, which makes
+    evaluation O(n_grid log n_grid + n_eval) instead of O(n_data * n_eval).
+    Points outside the grid, or where the gridded density falls below
+    rel_tol times its maximum (FFT round-off), are evaluated exactly from
+    the samples near them.
+    Mirrors the fit / score_samples / sample interface of
+    sklearn.neighbors.KernelDensity used by logkde.
+
+    :Arguments:
+        bandwidth: float
+            Standard deviation of the Gaussian kernel.
+        n_grid: int <default=4096>
+            Number of grid points.
+        rel_tol: float <default=1e-10>
+            Relative density below which the exact evaluation is used.
+    """
+
+    def __init__(self, bandwidth=1.0, n_grid=4096, rel_tol=1e-10):
+        self.bandwidth = bandwidth
+        self.n_grid = n_grid
+        self.rel_tol = rel_tol
+
+    def fit(self, X):
+        self.sample_ = np.ravel(X).astype(np.float64)
+        self.sorted_sample_ = np.sort(self.sample_)
+        lo = self.sample_.min() - 5 * self.bandwidth
+        hi = self.sample_.max() + 5 * self.bandwidth
+        self.grid_ = np.linspace(lo, hi, self.n_grid)
+        dx = self.grid_[1] - self.grid_[0]
+
+        # linear binning: split every sample between its two grid neighbours
+        pos = (self.sample_ - lo) / dx
+        left = np.minimum(np.floor(pos).astype(np.int64), self.n_grid - 2)
+        frac = pos - left
+        counts = np.bincount(left, 1 - frac, minlength=self.n_grid)
+        counts += np.bincount(left + 1, frac, minlength=self.n_grid)
+
+        # convolution with the (periodic) Gaussian kernel in frequency space,
+        # the 5 bandwidth margins keep the wrap around negligible
+        freqs = np.fft.rfftfreq(self.n_grid, d=dx)
+        kernel_ft = np.exp(-2 * (np.pi * freqs * self.bandwidth) ** 2)
+        density = np.fft.irfft(np.fft.rfft(counts) * kernel_ft, self.n_grid)
+        self.density_ = density / (len(self.sample_) * dx)
+        return self
+
+    def _exact_score(self, x):
+        # only samples within 10 bandwidths of the distance to the nearest
+        # sample contribute (the rest is below exp(-50) relative to it)
+        sample = self.sorted_sample_
+        nearest = np.clip(np.searchsorted(sample, x), 1, len(sample) - 1)
+        dist = np.minimum(np.abs(x - sample[nearest - 1]), np.abs(x - sample[nearest]))
+        lo = np.searchsorted(sample, x - dist - 10 * self.bandwidth)
+        hi = np.searchsorted(sample, x + dist + 10 * self.bandwidth, side="right")
+
+        out = np.empty(len(x))
+        for i in range(len(x)):
+            z = (x[i] - sample[lo[i] : hi[i]]) / self.bandwidth
+            out[i] = logsumexp(-0.5 * z ** 2)
+        return out - np.log(len(sample) * self.bandwidth * np.sqrt(2 * np.pi))
+
+    def score_samples(self, X):
+        x = np.ravel(X).astype(np.float64)
+        density = np.interp(x, self.grid_, self.density_)
+        exact = (
+            (x < self.grid_[0])
+            | (x > self.grid_[-1])
+            | (density < self.rel_tol * self.density_.max())
+        )
+        out = np.empty(len(x))
+        out[~exact] = np.log(density[~exact])
+        if exact.any():
+            out[exact] = self._exact_score(x[exact])
+        return out
+
+    def sample(self, n_samples=1):
+        draws = np.random.choice(self.sample_, size=n_samples)
+        draws += np.random.normal(scale=self.bandwidth, size=n_samples)
+        return draws[:, None]
+
+
 class logkde:
     """Class that takes in simulator data and constructs a kernel density estimator from it.
 
@@ -108,6 +195,12 @@ class logkde:
             At this point only 'silverman' is allowed.
         auto_bandwidth: bool <default=True>
             At this point only true is allowed. Kernel Bandwidth is going to be determined automatically.
+        engine: str <default='sklearn'>
+            'sklearn' evaluates the kdes exactly with sklearn.neighbors.KernelDensity,
+            'fft' bins the log rts on a grid and convolves them with the kernel through
+            the FFT. The latter is much faster for large simulations (100k+ samples).
+        n_grid: int <default=4096>
+            Number of grid points of the 'fft' engine.
     """
 
     def __init__(
@@ -115,8 +208,14 @@ class logkde:
         simulator_data,  # Simulator_data is the kind of data returned by the simulators in ddm_data_simulatoin.py
         bandwidth_type="silverman",
         auto_bandwidth=True,
+        engine="sklearn",
+        n_grid=4096,
     ):
 
+        if engine not in ("sklearn", "fft"):
+            raise ValueError("Unknown kde engine %s." % engine)
+        self.engine = engine
+        self.n_grid = n_grid
         self.attach_data_from_simulator(simulator_data)
         self.generate_base_kdes(
             auto_bandwidth=auto_bandwidth, bandwidth_type=bandwidth_type
@@ -155,6 +254,12 @@ class logkde:
         for i in range(0, len(self.data["choices"]), 1):
             if self.bandwidths[i] == "no_base_data":
                 self.base_kdes.append("no_base_data")
+            elif self.engine == "fft":
+                self.base_kdes.append(
+                    _FFTKernelDensity(
+                        bandwidth=self.bandwidths[i], n_grid=self.n_grid
+                    ).fit(np.log(self.data["rts"][i]))
+                )
             else:
                 self.base_kdes.append(
                     KernelDensity(kernel="gaussian", bandwidth=self.bandwidths[i]).fit(
@@ -266,6 +371,180 @@ class logkde:
             self.data["choice_proportions"].append(prop_tmp)
 
 
+# LIKELIHOOD SURFACES -----------------------------------------------------------------
+class LikelihoodSurface:
+    """Likelihoods on a grid, labelled by their coordinates (a minimal
+    stand-in for xarray.DataArray).
+
+    :Arguments:
+        values: np.ndarray
+            Array of likelihoods, one axis per coordinate.
+        coords: OrderedDict
+            Coordinate name -> values along the respective axis.
+        logp: bool <default=True>
+            Whether values holds log-likelihoods.
+    """
+
+    def __init__(self, values, coords, logp=True):
+        self.values = values
+        self.coords = OrderedDict(coords)
+        self.dims = tuple(self.coords)
+        self.logp = logp
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    def sel(self, **indexers):
+        """Select the nearest coordinate value along the given dimensions.
+
+        :Example:
+            >>> surface.sel(v=0.5, choice=1)
+        """
+        index = []
+        coords = OrderedDict()
+        for dim, values in self.coords.items():
+            if dim in indexers:
+                index.append(np.argmin(np.abs(values - indexers[dim])))
+            else:
+                index.append(slice(None))
+                coords[dim] = values
+        return LikelihoodSurface(self.values[tuple(index)], coords, self.logp)
+
+    def to_dataframe(self, name=None):
+        """Long format pandas.DataFrame with one row per grid point."""
+        name = name or ("logp" if self.logp else "likelihood")
+        index = pd.MultiIndex.from_product(self.coords.values(), names=self.dims)
+        return pd.DataFrame({name: np.ravel(self.values)}, index=index)
+
+    def to_xarray(self):
+        """Convert to xarray.DataArray (requires xarray)."""
+        import xarray
+
+        return xarray.DataArray(self.values, coords=self.coords, dims=self.dims)
+
+
+def likelihood_surface(
+    parameters,
+    vary_dict,
+    model="ddm",
+    rts=None,
+    choices=None,
+    n_rt_steps=200,
+    max_rt=5.0,
+    engine="lan",
+    network=None,
+    logp=True,
+    chunk_size=2 ** 16,
+    out=None,
+):
+    """Evaluate the likelihood of a model on a grid of parameters x choices x rts.
+
+    The grid is streamed through the network in chunks of chunk_size points,
+    so that the memory besides the result is bounded by one chunk. Every
+    varied parameter becomes an axis of the result, followed by the choice and
+    rt axes.
+
+    :Arguments:
+        parameters: dict, pandas.Series or array
+            Values of all model parameters (arrays in the order of
+            model_config[model]['params']). Varied parameters are overwritten by
+            the grid.
+        vary_dict: dict
+            Parameter name -> values to evaluate. Any number of parameters can be
+            varied.
+
+    :Optional:
+        model: str <default='ddm'>
+            Model whose likelihood to evaluate.
+        rts: np.ndarray <default=None>
+            Positive reaction times to evaluate; defaults to n_rt_steps equidistant
+            steps up to max_rt.
+        choices: list <default=None>
+            Choices to evaluate; defaults to the choices of the model.
+        n_rt_steps: int <default=200>
+            Number of default rt steps.
+        max_rt: float <default=5.0>
+            Largest default rt.
+        engine: str <default='lan'>
+            'lan' evaluates the LAN of the model, 'analytic' the exact density of
+            hddm.wfpt.pdf_array (only for model='ddm'; the LAN boundaries at +-a
+            are converted to the boundary separation 2a of wfpt).
+        network: object <default=None>
+            Network providing predict_on_batch(); loaded with load_torch_mlp() if None.
+        logp: bool <default=True>
+            Return log-likelihoods (True) or likelihoods (False).
+        chunk_size: int <default=65536>
+            Number of grid points per forward pass.
+        out: np.ndarray <default=None>
+            Array of the shape of the grid to write the result to, e.g. a np.memmap
+            for surfaces that do not fit in memory.
+
+    :Returns:
+        LikelihoodSurface
+
+    :Example:
+        >>> surface = likelihood_surface(
+        ...     {'v': 0.5, 'a': 1.5, 'z': 0.5, 't': 0.3},
+        ...     {'v': np.linspace(-2, 2, 41), 'a': np.linspace(0.5, 2, 31)})
+        >>> surface.sel(v=1.0, a=1.0, choice=1).values
+    """
+    params = model_config[model]["params"]
+    n_params = len(params)
+    if isinstance(parameters, dict):
+        base = np.array([parameters[p] for p in params], dtype=np.float64)
+    elif isinstance(parameters, pd.Series):
+        base = parameters[params].values.astype(np.float64)
+    else:
+        base = np.array(parameters, dtype=np.float64).ravel()
+
+    if rts is None:
+        rts = np.linspace(max_rt / n_rt_steps, max_rt, n_rt_steps)
+    if choices is None:
+        choices = model_config[model]["choices"]
+    coords = OrderedDict((name, np.asarray(vary_dict[name])) for name in vary_dict)
+    coords["choice"] = np.asarray(choices)
+    coords["rt"] = np.asarray(rts, dtype=np.float64)
+    shape = tuple(len(c) for c in coords.values())
+    if out is None:
+        out = np.empty(shape, dtype=np.float64)
+    flat = out.reshape(-1)
+    vary_cols = [params.index(name) for name in vary_dict]
+
+    if engine == "analytic":
+        if model != "ddm":
+            raise ValueError("The analytic engine is only available for model='ddm'.")
+        x = np.ravel(coords["choice"][:, None] * coords["rt"][None, :])
+        n = len(x)
+        theta = base.copy()
+        for i, level in enumerate(np.ndindex(*shape[:-2])):
+            for col, name, j in zip(vary_cols, vary_dict, level):
+                theta[col] = coords[name][j]
+            v, a, z, t = theta
+            flat[i * n : (i + 1) * n] = hddm.wfpt.pdf_array(
+                x, v, 0, 2 * a, z, 0, t, 0, logp=logp
+            )
+        return LikelihoodSurface(out, coords, logp)
+    if engine != "lan":
+        raise ValueError("Unknown engine %s." % engine)
+
+    if network is None:
+        network = load_torch_mlp(model=model)
+    data = np.empty((min(chunk_size, flat.size), n_params + 2), dtype=np.float32)
+    data[:, :n_params] = base
+    for start in range(0, flat.size, chunk_size):
+        stop = min(start + chunk_size, flat.size)
+        chunk = data[: stop - start]
+        index = np.unravel_index(np.arange(start, stop), shape)
+        for col, name, idx in zip(vary_cols, vary_dict, index):
+            chunk[:, col] = coords[name][idx]
+        chunk[:, n_params] = coords["rt"][index[-1]]
+        chunk[:, n_params + 1] = coords["choice"][index[-2]]
+        result = np.ravel(network.predict_on_batch(chunk))
+        flat[start:stop] = result if logp else np.exp(result)
+    return LikelihoodSurface(out, coords, logp)
+
+
 # PLOTTNG -------------------------------------------------------------------------------------
 def kde_vs_lan_likelihoods(  # ax_titles = [],
     parameter_df=None,
@@ -277,6 +556,7 @@ def kde_vs_lan_likelihoods(  # ax_titles = [],
     save=False,
     show=True,
     font_scale=1.5,
+    kde_engine="sklearn",
 ):
     """Function creates a plot that compares kernel density estimates from simulation data with mlp output.
 
@@ -299,6 +579,8 @@ def kde_vs_lan_likelihoods(  # ax_titles = [],
         font_scale: float <default=1.5>
             Seaborn setting, exposed here to be adjusted by user, since it is not always
             obvious which value is best.
+        kde_engine: str <default='sklearn'>
+            Engine of the kernel density estimates, 'sklearn' or 'fft' (see logkde).
 
     :Returns:
         empty
@@ -369,7 +651,7 @@ def kde_vs_lan_likelihoods(  # ax_titles = [],
                 delta_t=0.001,
             )
 
-            mykde = logkde((out[0], out[1], out[2]))
+            mykde = logkde((out[0], out[1], out[2]), engine=kde_engine)
             ll_out_gt = mykde.kde_eval((plot_data[:, 0], plot_data[:, 1]))
 
             # Plot kde predictions
@@ -532,50 +814,29 @@ def lan_manifold(
     else:
         parameters = parameter_df
 
-    # Load Keras model and initialize batch container
-    torch_model = get_torch_mlp(model=model)
-
-    # Prepare data structures
-
-    # Data template
-    plot_data = np.zeros((n_rt_steps * 2, 2))
-    plot_data[:, 0] = np.concatenate(
-        (
-            [(i * (max_rt / n_rt_steps)) for i in range(n_rt_steps, 0, -1)],
-            [(i * (max_rt / n_rt_steps)) for i in range(1, n_rt_steps + 1, 1)],
-        )
-    )
-    plot_data[:, 1] = np.concatenate(
-        (np.repeat(-1, n_rt_steps), np.repeat(1, n_rt_steps))
-    )
-
-    n_params = model_config[model]["n_params"]
-    n_levels = vary_dict[list(vary_dict.keys())[0]].shape[0]
-    data_var = np.zeros(((n_rt_steps * 2) * n_levels, n_params + 3))
-
-    cnt = 0
     vary_param_name = list(vary_dict.keys())[0]
+    surface = likelihood_surface(
+        parameters,
+        {vary_param_name: vary_dict[vary_param_name]},
+        model=model,
+        choices=[-1, 1],
+        n_rt_steps=n_rt_steps,
+        max_rt=max_rt,
+        logp=False,
+    )
 
-    for par_tmp in vary_dict[vary_param_name]:
-
-        tmp_begin = (n_rt_steps * 2) * cnt
-        tmp_end = (n_rt_steps * 2) * (cnt + 1)
-        parameters[model_config[model]["params"].index(vary_param_name)] = par_tmp
-
-        data_var[tmp_begin:tmp_end, :n_params] = parameters
-        data_var[tmp_begin:tmp_end, n_params : (n_params + 2)] = plot_data
-        data_var[tmp_begin:tmp_end, (n_params + 2)] = np.squeeze(
-            np.exp(torch_model(data_var[tmp_begin:tmp_end, :-1].astype(np.float32)))
-        )
-
-        cnt += 1
+    # Columns: signed rt, varied parameter, likelihood
+    level, choice, rt = np.meshgrid(*surface.coords.values(), indexing="ij")
+    data_var = np.column_stack(
+        [np.ravel(choice * rt), np.ravel(level), np.ravel(surface.values)]
+    )
 
     fig = plt.figure(figsize=(8 * fig_scale, 5.5 * fig_scale))
     ax = fig.add_subplot(111, projection="3d")
     ax.plot_trisurf(
-        data_var[:, -2] * data_var[:, -3],
-        data_var[:, model_config[model]["params"].index(vary_param_name)],
-        data_var[:, -1],
+        data_var[:, 0],
+        data_var[:, 1],
+        data_var[:, 2],
         linewidth=0.5,
         alpha=1.0,
         cmap=cm.coolwarm,
@@ -594,8 +855,8 @@ def lan_manifold(
     ax.set_yticks(
         np.round(
             np.linspace(
-                min(data_var[:, model_config[model]["params"].index(vary_param_name)]),
-                max(data_var[:, model_config[model]["params"].index(vary_param_name)]),
+                min(data_var[:, 1]),
+                max(data_var[:, 1]),
                 5,
             ),
             1,
@@ -605,8 +866,8 @@ def lan_manifold(
     ax.set_xticks(
         np.round(
             np.linspace(
-                min(data_var[:, -2] * data_var[:, -3]),
-                max(data_var[:, -2] * data_var[:, -3]),
+                min(data_var[:, 0]),
+                max(data_var[:, 0]),
                 5,
             ),
             1,
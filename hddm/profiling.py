@@ -0,0 +1,303 @@
+"""
+.. module:: HDDM
+   :platform: Agnostic
+   :synopsis: Per-node timing of the logp evaluations of a model.
+
+profile_logp() runs a short MCMC chain of a built model in which every
+stochastic logp and every deterministic value computation is timed, and
+attributes the time to the node, its kind (likelihood, prior, deterministic,
+potential) and type (the node class, e.g. Wienerrl or Normal) and to the
+step method that triggered it. Time spent in a step method outside of node
+evaluations is its bookkeeping; time outside all step methods is the
+sampler's own overhead (tallying, tuning).
+
+    >>> prof = model.profile_logp(n_iter=200)
+    >>> prof.nodes.head(10)
+    >>> prof.by_type()
+    >>> prof.step_methods
+    >>> prof.to_folded("model.folded")  # flamegraph.pl / speedscope input
+
+Times are exclusive: the evaluation of a deterministic parent that a logp
+triggers is counted for the deterministic, not for the stochastic.
+"""
+
+import time
+from collections import OrderedDict, defaultdict
+from copy import copy
+
+import numpy as np
+import pandas as pd
+import pymc as pm
+
+_MISSING = object()
+
+
+class _Profiler(object):
+    """Stack of running timers; records the exclusive time of every frame,
+    per node and per path of frames."""
+
+    def __init__(self):
+        self.stack = []
+        self.step = None
+        self.node_calls = defaultdict(int)
+        self.node_time = defaultdict(float)
+        # step method (None outside of step methods) -> number of logp /
+        # value evaluations it triggered and their exclusive time
+        self.step_evals = defaultdict(lambda: defaultdict(int))
+        self.step_node_time = defaultdict(float)
+        self.step_calls = defaultdict(int)
+        self.step_time = defaultdict(float)
+        self.folded = defaultdict(float)
+
+    def enter(self, frame):
+        self.stack.append([frame, time.perf_counter(), 0.0])
+
+    def exit(self):
+        frame, start, children = self.stack.pop()
+        elapsed = time.perf_counter() - start
+        if self.stack:
+            self.stack[-1][2] += elapsed
+        path = tuple(f[0] for f in self.stack) + (frame,)
+        self.folded[path] += elapsed - children
+
+        kind, obj = frame
+        if kind == "step":
+            self.step_calls[obj] += 1
+            self.step_time[obj] += elapsed
+        else:
+            self.node_calls[obj] += 1
+            self.node_time[obj] += elapsed - children
+            self.step_evals[self.step][kind] += 1
+            self.step_node_time[self.step] += elapsed - children
+
+    def timed_step(self, step_method):
+        step = step_method.step
+
+        def timed():
+            self.step = step_method
+            self.enter(("step", step_method))
+            try:
+                return step()
+            finally:
+                self.exit()
+                self.step = None
+
+        return timed
+
+    def timed_class(self, cls, attr):
+        """Subclass of cls timing the property attr ('logp' or 'value')."""
+        prop = getattr(cls, attr)
+        kind = "logp" if attr == "logp" else "value"
+
+        def get(node):
+            self.enter((kind, node))
+            try:
+                return prop.fget(node)
+            finally:
+                self.exit()
+
+        return type(cls.__name__, (cls,), {attr: property(get, prop.fset)})
+
+
+class LogpProfile(object):
+    """Result of profile_logp().
+
+    :Attributes:
+        nodes : pandas.DataFrame
+            One row per node with its knode, kind, type, number of
+            evaluations and exclusive time in seconds, sorted by time.
+        step_methods : pandas.DataFrame
+            One row per step method with the number of steps, the total
+            time, the time outside of node evaluations (bookkeeping) and the
+            number of logp and deterministic evaluations it triggered; the
+            row '<sampler>' holds the time spent outside all step methods.
+        folded : OrderedDict
+            Exclusive time in seconds of every stack of frames.
+        total_time : float
+            Wall time of the sampling run in seconds.
+        n_iter : int
+            Number of iterations of the run.
+    """
+
+    def __init__(self, nodes, step_methods, folded, total_time, n_iter):
+        self.nodes = nodes
+        self.step_methods = step_methods
+        self.folded = folded
+        self.total_time = total_time
+        self.n_iter = n_iter
+
+    def by_type(self):
+        """Number of evaluations and time summed per node kind and type."""
+        table = self.nodes.groupby(["kind", "type"])[["calls", "time"]].sum()
+        table["fraction"] = table["time"] / self.total_time
+        return table.sort_values("time", ascending=False)
+
+    def to_folded(self, fname=None):
+        """Export the stacks in the folded format of flamegraph.pl and
+        speedscope, one 'frame;frame;... microseconds' line per stack.
+
+        :Optional:
+            fname : str <default=None>
+                File to write to.
+
+        :Returns:
+            str with the folded stacks.
+        """
+        lines = [
+            "%s %d" % (";".join(path), int(round(1e6 * seconds)))
+            for path, seconds in self.folded.items()
+        ]
+        text = "\n".join(line for line in lines if not line.endswith(" 0"))
+        if fname is not None:
+            with open(fname, "w") as f:
+                f.write(text + "\n")
+        return text
+
+    def __repr__(self):
+        return "<LogpProfile of %d iterations, %.3fs, %d nodes>" % (
+            self.n_iter,
+            self.total_time,
+            len(self.nodes),
+        )
+
+
+def _node_kind(node):
+    if isinstance(node, pm.Potential):
+        return "potential"
+    if isinstance(node, pm.Deterministic):
+        return "deterministic"
+    if getattr(node, "observed", False):
+        return "likelihood"
+    return "prior"
+
+
+def _step_name(step_method):
+    names = sorted(s.__name__ for s in step_method.stochastics)
+    return "%s[%s]" % (type(step_method).__name__, ",".join(names))
+
+
+def _frame_name(frame):
+    kind, obj = frame
+    if kind == "step":
+        return _step_name(obj)
+    return "%s (%s)" % (obj.__name__, kind)
+
+
+def profile_logp(model, n_iter=100, flamegraph=None):
+    """Time the logp evaluations of every node during a short sampling run.
+
+    The model is sampled with its own step method assignment; afterwards the
+    node values, traces and the model's MCMC object are restored, so that a
+    profiled model can still be (or stay) sampled normally.
+
+    :Arguments:
+        model : kabuki.Hierarchical
+            A built model, e.g. hddm.HDDM or hddm.HDDMrl.
+
+    :Optional:
+        n_iter : int <default=100>
+            Number of MCMC iterations.
+        flamegraph : str <default=None>
+            File to write the folded stacks to, see LogpProfile.to_folded().
+
+    :Returns:
+        LogpProfile.
+    """
+    db = model.nodes_db
+    knodes = dict(zip(db["node"], db["knode_name"]))
+
+    old_mc = getattr(model, "mc", None)
+    model.mc = None
+    mc = model.mcmc()
+
+    profiler = _Profiler()
+    nodes = list(mc.stochastics | mc.observed_stochastics)
+    nodes += list(mc.deterministics) + list(mc.potentials)
+    values = [(n, copy(n.value)) for n in mc.stochastics]
+    traces = [(n, vars(n).get("trace", _MISSING)) for n in nodes]
+    classes = [(n, type(n)) for n in nodes]
+
+    timed = {}
+    for node, cls in classes:
+        attr = "value" if isinstance(node, pm.Deterministic) else "logp"
+        if cls not in timed:
+            timed[cls] = profiler.timed_class(cls, attr)
+        node.__class__ = timed[cls]
+
+    try:
+        mc.assign_step_methods()
+        for step_method in mc.step_methods:
+            step_method.step = profiler.timed_step(step_method)
+        start = time.perf_counter()
+        mc.sample(n_iter, progress_bar=False)
+        total_time = time.perf_counter() - start
+    finally:
+        for node, cls in classes:
+            node.__class__ = cls
+        for node, value in values:
+            node.value = value
+        for node, trace in traces:
+            if trace is not _MISSING:
+                node.trace = trace
+            elif "trace" in vars(node):
+                del node.trace
+        model.mc = old_mc
+
+    rows = []
+    for node, _ in classes:
+        rows.append(
+            OrderedDict(
+                [
+                    ("node", node.__name__),
+                    ("knode", knodes.get(node)),
+                    ("kind", _node_kind(node)),
+                    ("type", type(node).__name__),
+                    ("calls", profiler.node_calls[node]),
+                    ("time", profiler.node_time[node]),
+                ]
+            )
+        )
+    nodes_table = pd.DataFrame(rows)
+    nodes_table["time_per_call"] = nodes_table["time"] / np.maximum(
+        nodes_table["calls"], 1
+    )
+    nodes_table["fraction"] = nodes_table["time"] / total_time
+    nodes_table = nodes_table.sort_values("time", ascending=False)
+    nodes_table = nodes_table.set_index("node")
+
+    rows = []
+    for step_method in list(mc.step_methods) + [None]:
+        if step_method is None:
+            name = "<sampler>"
+            steps = n_iter
+            step_time = total_time - sum(profiler.step_time.values())
+        else:
+            name = _step_name(step_method)
+            steps = profiler.step_calls[step_method]
+            step_time = profiler.step_time[step_method]
+        evals = profiler.step_evals[step_method]
+        rows.append(
+            OrderedDict(
+                [
+                    ("step_method", name),
+                    ("steps", steps),
+                    ("time", step_time),
+                    ("bookkeeping", step_time - profiler.step_node_time[step_method]),
+                    ("logp_calls", evals["logp"]),
+                    ("value_calls", evals["value"]),
+                ]
+            )
+        )
+    step_table = pd.DataFrame(rows).sort_values("time", ascending=False)
+    step_table = step_table.set_index("step_method")
+
+    folded = OrderedDict()
+    for path, seconds in sorted(profiler.folded.items(), key=lambda x: -x[1]):
+        key = ("sample",) + tuple(_frame_name(frame) for frame in path)
+        folded[key] = folded.get(key, 0.0) + seconds
+    folded[("sample",)] = max(step_table.loc["<sampler>", "bookkeeping"], 0.0)
+
+    profile = LogpProfile(nodes_table, step_table, folded, total_time, n_iter)
+    if flamegraph is not None:
+        profile.to_folded(flamegraph)
+    return profile
@@ -1,6 +1,5 @@
 import pandas as pd
 import numpy as np
-from copy import deepcopy
 from data_simulators import ddm_flexbound
 from data_simulators import levy_flexbound
 from data_simulators import ornstein_uhlenbeck
@@ -45,8 +44,6 @@ def bin_simulator_output_pointwise(
         2d array. The first columns collects bin-identifiers by trial, the second column lists the corresponding choices.
     """
 
-    out_copy = deepcopy(out)
-
     # Generate bins
     if nbins == 0:
         nbins = int(out[2]["max_t"] / bin_dt)
@@ -58,15 +55,11 @@ def bin_simulator_output_pointwise(
         bins[:nbins] = np.linspace(0, out[2]["max_t"], nbins)
         bins[nbins] = np.inf
 
-    out_copy_tmp = deepcopy(out_copy)
-    for i in range(out_copy[0].shape[0]):
-        for j in range(1, bins.shape[0], 1):
-            if out_copy[0][i] > bins[j - 1] and out_copy[0][i] < bins[j]:
-                out_copy_tmp[0][i] = j - 1
-    out_copy = out_copy_tmp
-    out_copy[1][out_copy[1] == -1] = 0
+    # Bin j collects rts in [bins[j], bins[j + 1])
+    rt_bins = np.searchsorted(bins, out[0], side="right") - 1
+    choices = np.where(out[1] == -1, 0, out[1])
 
-    return np.concatenate([out_copy[0], out_copy[1]], axis=-1).astype(np.int32)
+    return np.concatenate([rt_bins, choices], axis=-1).astype(np.int32)
 
 
 def bin_simulator_output(
@@ -330,7 +323,9 @@ def simulator(
         no_noise: bool <default=False>
             Turn noise of (useful for plotting purposes mostly)
         bin_dim: int <default=None>
-            Number of bins to use (in case the simulator output is supposed to come out as a count histogram)
+            Number of bins to use (in case the simulator output is supposed to come out as a count histogram).
+            For single-stage models the histogram is accumulated inside the simulator, so individual
+            rts are never stored and n_samples can be very large.
         bin_pointwise: bool <default=False>
             Wheter or not to bin the output data pointwise. If true the 'RT' part of the data is now specifies the
             'bin-number' of a given trial instead of the 'RT' directly. You need to specify bin_dim as some number for this to work.
@@ -340,6 +335,9 @@ def simulator(
         or     (rt-response histogram, metadata)
         or     (rts binned pointwise, responses, metadata)
 
+        The rt-response histogram has shape (bin_dim, n_choices), or (n_trials, bin_dim, n_choices)
+        for multi-trial single-stage models.
+
     """
 
     # Useful for sbi
@@ -367,6 +365,12 @@ def simulator(
     else:
         s = 1.0
 
+    # Histograms are accumulated inside the simulator (no per-sample rts are stored)
+    if bin_dim is not None and bin_dim > 0 and not bin_pointwise:
+        nbins = bin_dim
+    else:
+        nbins = 0
+
     if model == "test":
         x = ddm_flexbound(
             v=theta[:, 0],
@@ -381,6 +385,7 @@ def simulator(
             boundary_fun=bf.constant,
             boundary_multiplicative=True,
             max_t=max_t,
+            nbins=nbins,
         )
 
     if model == "ddm" or model == "ddm_elife" or model == "ddm_analytic":
@@ -397,6 +402,7 @@ def simulator(
             boundary_fun=bf.constant,
             boundary_multiplicative=True,
             max_t=max_t,
+            nbins=nbins,
         )
 
     if model == "ddm_legacy" or model == "ddm_vanilla":
@@ -410,6 +416,7 @@ def simulator(
             n_trials=n_trials,
             delta_t=delta_t,
             max_t=max_t,
+            nbins=nbins,
         )
 
     if model == "full_ddm_legacy" or model == "full_ddm_vanilla":
@@ -426,6 +433,7 @@ def simulator(
             n_trials=n_trials,
             delta_t=delta_t,
             max_t=max_t,
+            nbins=nbins,
         )
 
     if model == "angle" or model == "angle2":
@@ -442,6 +450,7 @@ def simulator(
             n_samples=n_samples,
             n_trials=n_trials,
             max_t=max_t,
+            nbins=nbins,
         )
 
     if (
@@ -464,6 +473,7 @@ def simulator(
             n_samples=n_samples,
             n_trials=n_trials,
             max_t=max_t,
+            nbins=nbins,
         )
 
     if model == "levy":
@@ -481,6 +491,7 @@ def simulator(
             n_samples=n_samples,
             n_trials=n_trials,
             max_t=max_t,
+            nbins=nbins,
         )
 
     if model == "full_ddm" or model == "full_ddm2":
@@ -500,6 +511,7 @@ def simulator(
             n_samples=n_samples,
             n_trials=n_trials,
             max_t=max_t,
+            nbins=nbins,
         )
 
     if model == "ddm_sdv":
@@ -517,6 +529,7 @@ def simulator(
             n_samples=n_samples,
             n_trials=n_trials,
             max_t=max_t,
+            nbins=nbins,
         )
 
     if model == "ornstein" or model == "ornstein_uhlenbeck":
@@ -534,6 +547,7 @@ def simulator(
             n_samples=n_samples,
             n_trials=n_trials,
             max_t=max_t,
+            nbins=nbins,
         )
 
     # 3 Choice models
@@ -556,6 +570,7 @@ def simulator(
             n_samples=n_samples,
             n_trials=n_trials,
             max_t=max_t,
+            nbins=nbins,
         )
 
     if model == "race_no_bias_3":
@@ -572,6 +587,7 @@ def simulator(
             n_samples=n_samples,
             n_trials=n_trials,
             max_t=max_t,
+            nbins=nbins,
         )
 
     if model == "race_no_bias_angle_3":
@@ -588,6 +604,7 @@ def simulator(
             n_samples=n_samples,
             n_trials=n_trials,
             max_t=max_t,
+            nbins=nbins,
         )
 
     if model == "lca_3":
@@ -606,6 +623,7 @@ def simulator(
             n_samples=n_samples,
             n_trials=n_trials,
             max_t=max_t,
+            nbins=nbins,
         )
 
     if model == "lca_no_bias_3":
@@ -624,6 +642,7 @@ def simulator(
             n_samples=n_samples,
             n_trials=n_trials,
             max_t=max_t,
+            nbins=nbins,
         )
 
     if model == "lca_no_bias_angle_3":
@@ -642,6 +661,7 @@ def simulator(
             n_samples=n_samples,
             n_trials=n_trials,
             max_t=max_t,
+            nbins=nbins,
         )
 
     # 4 Choice models
@@ -664,6 +684,7 @@ def simulator(
             n_samples=n_samples,
             n_trials=n_trials,
             max_t=max_t,
+            nbins=nbins,
         )
 
     if model == "race_no_bias_4":
@@ -682,6 +703,7 @@ def simulator(
             n_samples=n_samples,
             n_trials=n_trials,
             max_t=max_t,
+            nbins=nbins,
         )
 
     if model == "race_no_bias_angle_4":
@@ -700,6 +722,7 @@ def simulator(
             n_samples=n_samples,
             n_trials=n_trials,
             max_t=max_t,
+            nbins=nbins,
         )
 
     if model == "lca_4":
@@ -718,6 +741,7 @@ def simulator(
             n_samples=n_samples,
             n_trials=n_trials,
             max_t=max_t,
+            nbins=nbins,
         )
 
     if model == "lca_no_bias_4":
@@ -738,6 +762,7 @@ def simulator(
             n_samples=n_samples,
             n_trials=n_trials,
             max_t=max_t,
+            nbins=nbins,
         )
 
     if model == "lca_no_bias_angle_4":
@@ -758,6 +783,7 @@ def simulator(
             n_samples=n_samples,
             n_trials=n_trials,
             max_t=max_t,
+            nbins=nbins,
         )
 
     # Seq / Parallel models (4 choice)
@@ -1013,6 +1039,14 @@ def simulator(
             boundary_params={"alpha": theta[:, 6], "beta": theta[:, 7]},
         )
 
+    # Binned output accumulated by the simulator: (n_trials, nbins, n_choices) counts
+    if nbins > 0 and len(x) == 2:
+        x[1]["model"] = model
+        binned_out = x[0] / n_samples
+        if n_trials == 1:
+            binned_out = binned_out[0]
+        return (binned_out, x[1])
+
     # Output compatibility
     if n_trials == 1:
         x = (np.squeeze(x[0], axis=1), np.squeeze(x[1], axis=1), x[2])
@@ -1,120 +1,447 @@
+"""
+Micro-benchmarks of the compiled kernels, the simulators and LAN inference.
+
+Every benchmark builds a fixed synthetic dataset from a fixed seed and times
+one call of the code under test, so that results of different commits,
+machines or dependency versions are comparable. Results are stored as JSON;
+compare() flags benchmarks that got slower than a threshold.
+
+    $ python -m hddm.tests.benchmark run -o before.json
+    $ # upgrade / change something
+    $ python -m hddm.tests.benchmark run -o after.json
+    $ python -m hddm.tests.benchmark compare before.json after.json --threshold 0.1
+
+run -k <substring> restricts the run to matching benchmarks; compare exits
+with status 1 if any benchmark regressed.
+"""
+
+import argparse
+import datetime
+import json
+import platform
+import subprocess
+import sys
+import timeit
+from collections import OrderedDict
+
 import numpy as np
-from numpy.random import rand
-
-import time
-import pymc as pm
-import matplotlib.pyplot as plt
-import pandas as pd
-
-import hddm
-import hddm.diag
-from scipy.integrate import *
-from scipy.stats import kstest
-from scipy.optimize import fmin_powell
-
-np.random.seed(3123)
-
-
-def compare_cdf_from_pdf_to_cdf_from_fastdm(
-    repeats=500, bins=25, include=("sv", "st", "sz", "z")
-):
-    """Comparing the numerical integration of wfpt PDF to fastdm CDF."""
-    N = 500
-    np.random.seed(10)
-    diff = np.zeros(repeats)
-    for i in range(repeats):
-        params = hddm.generate.gen_rand_params(include=include)
-        tic1 = time.time()
-        x, cum_pdf = hddm.wfpt.gen_cdf_from_pdf(err=1e-4, N=N, **params)
-        tic2 = time.time()
-        x_cdf, cdf = hddm.wfpt.gen_cdf(N=N, **params)
-        tic3 = time.time()
-
-        pdf_time = tic2 - tic1
-        fastdm_time = tic3 - tic2
-        diff[i] = pdf_time - fastdm_time
-
-    plt.figure()
-    plt.hist(diff, bins)
-    plt.title("compare gen_cdf_from_pdf to gen_cdf (using fastdm)")
-    plt.xlabel("Difference in time. (positive values mean the fastdm is faster)")
-
-
-def check_outlier_model(seed=None, p_outlier=0.05):
-    """Estimate data which contains outliers"""
-
-    if seed is not None:
-        np.random.seed(seed)
-
-    # generate params and data
-    params_true = hddm.generate.gen_rand_params(include=())
-    data, temp = hddm.generate.gen_rand_data(size=500, params=params_true)
-    data = pd.DataFrame(data)
-
-    # generating outliers
-    n_outliers = int(len(data) * p_outlier)
-    outliers = data[:n_outliers].copy()
-    # fast outliers
-    outliers.rt[: n_outliers // 2] = (
-        np.random.rand(n_outliers // 2) * (min(abs(data["rt"])) - 0.11) + 0.11
+
+SEED = 3123
+
+# name -> setup function returning the callable to time
+BENCHMARKS = OrderedDict()
+
+
+def benchmark(name):
+    """Register the decorated setup function as benchmark name."""
+
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+
+    return register
+
+
+def _rts(n=1000, seed=SEED):
+    rng = np.random.RandomState(seed)
+    return rng.uniform(0.3, 3.0, n) * rng.choice([-1, 1], n)
+
+
+DDM = dict(v=1.0, sv=0, a=2.0, z=0.5, sz=0, t=0.3, st=0)
+PDF_REGIMES = OrderedDict(
+    [
+        ("plain", {}),
+        ("sv", dict(sv=0.5)),
+        ("sz", dict(sz=0.2)),
+        ("st", dict(st=0.2)),
+        ("sv_sz_st", dict(sv=0.5, sz=0.2, st=0.2)),
+    ]
+)
+WIENER_PARAMS = dict(err=1e-4, n_st=2, n_sz=2, use_adaptive=1, simps_err=1e-3)
+
+
+def _register_pdf(regime, update):
+    @benchmark("full_pdf_" + regime)
+    def setup():
+        import hddm
+
+        x = _rts()
+        kwargs = dict(DDM, **update)
+        kwargs.update(WIENER_PARAMS)
+        return lambda: hddm.wfpt.pdf_array(x, **kwargs)
+
+
+for _regime, _update in PDF_REGIMES.items():
+    _register_pdf(_regime, _update)
+
+
+@benchmark("wiener_like")
+def _wiener_like():
+    import hddm
+
+    x = _rts()
+    kwargs = dict(DDM, **WIENER_PARAMS)
+    return lambda: hddm.wfpt.wiener_like(x, **kwargs)
+
+
+@benchmark("dmat_cdf_array")
+def _dmat_cdf_array():
+    import hddm
+
+    x = _rts()
+    p = DDM
+    return lambda: hddm.cdfdif.dmat_cdf_array(
+        x, p["v"], 0.5, p["a"], p["z"], 0.2, p["t"], 0.2, 0.0, 0.1
+    )
+
+
+@benchmark("wiener_like_rl")
+def _wiener_like_rl():
+    import hddm
+
+    rng = np.random.RandomState(SEED)
+    response = rng.randint(0, 2, 300)
+    feedback = rng.rand(300)
+    split_by = np.repeat(np.arange(3), 100)
+    return lambda: hddm.wfpt.wiener_like_rl(
+        response, feedback, split_by, 0.5, -1.0, 100.0, 2.0, 0.5, **WIENER_PARAMS
     )
-    # slow outliers
-    outliers.rt[n_outliers // 2 :] = np.random.rand(
-        n_outliers - n_outliers // 2
-    ) * 2 + max(abs(data["rt"]))
-    outliers.response = np.random.randint(0, 2, n_outliers)
-    print(
-        "generating %d outliers. %f of the dataset"
-        % (n_outliers, float(n_outliers) / (n_outliers + len(data)))
+
+
+def two_step_data(n_trials=300, nstates=4, seed=SEED):
+    """Fixed synthetic two-step session as passed to the 2-step kernels."""
+    rng = np.random.RandomState(seed)
+    n_sets = nstates * (nstates - 1) // 2
+    response1 = rng.randint(0, 2, n_trials)
+    response2 = rng.randint(0, 2, n_trials)
+    return OrderedDict(
+        [
+            ("x1", rng.uniform(0.3, 2.0, n_trials) * np.where(response1, 1, -1)),
+            ("x2", rng.uniform(0.3, 2.0, n_trials) * np.where(response2, 1, -1)),
+            ("s1", rng.randint(0, n_sets, n_trials)),
+            ("s2", rng.randint(0, nstates, n_trials)),
+            ("response1", response1),
+            ("response2", response2),
+            ("feedback", rng.rand(n_trials)),
+            ("split_by", np.zeros(n_trials, dtype=int)),
+        ]
     )
-    print("%d outliers are fast" % sum(outliers.rt < min(data.rt)))
-    print("%d outliers are slow" % sum(outliers.rt > max(data.rt)))
-
-    # Estimating the data without outliers. this is the best estimation we could get
-    # from this data
-    hm = hddm.HDDMTruncated(data)
-    hm.map()
-    index = ["true", "estimated"]
-    best_estimate = hm.values
-    df = pd.DataFrame([params_true, hm.values], index=index, dtype=np.float).dropna(1)
-    print("benchmark: MAP of clean data. This is as good as we can get")
-    print(df)
-
-    # combine data with outliers
-    data = pd.concat((data, outliers), ignore_index=True)
-
-    # estimate the data with outlier, to confirm that it is worse
-    hm = hddm.HDDMTruncated(data)
-    hm.map()
-    index = ["best_estimate", "this_estimate"]
-    df = pd.DataFrame([best_estimate, hm.values], index=index, dtype=np.float).dropna(1)
-    print("MAP with outliers: This is as bas as we can get")
-    print(df)
-
-    # MAP with p_outlier as random variable
-    hm = hddm.HDDMTruncated(data, include="p_outlier")
-    hm.map()
-    df = pd.DataFrame([best_estimate, hm.values], index=index, dtype=np.float)
-    df.loc["best_estimate", "p_outlier"] = 0
-    print("MAP with random p_outlier (Estimated from the data)")
-    print(df.dropna(1))
-
-    # MAP with fixed p_outlier
-    fixed_p_outlier = 0.1
-    hm = hddm.HDDMTruncated(data, p_outlier=fixed_p_outlier)
-    hm.map()
-    df = pd.DataFrame([best_estimate, hm.values], index=index, dtype=np.float)
-    print("MAP with fixed p_outlier (%.3f) " % fixed_p_outlier)
-    print(df.dropna(1))
-
-    # Chi-square
-    hm = hddm.HDDMTruncated(data)
-    hm.optimize(method="chisquare")
-    df = pd.DataFrame([best_estimate, hm.values], index=index, dtype=np.float).dropna(1)
-    print("Chisquare method")
-    print(df)
-
-    return data
-
-
-data = check_outlier_model(seed=1, p_outlier=0)
+
+
+# parameters of the 2-step kernels; 100.0 switches a parameter off
+RL_2STEP = OrderedDict(
+    [
+        ("q", 0.5),
+        ("alpha", -1.0),
+        ("pos_alpha", 100.0),
+        ("gamma", -2.0),
+        ("gamma2", 100.0),
+        ("lambda_", 0.0),
+        ("v", 2.0),
+        ("z", 0.5),
+        ("nstates", 4),
+        ("two_stage", 1.0),
+        ("z_2", 0.5),
+        ("v_2", 2.0),
+        ("alpha2", 100.0),
+        ("w", 0.0),
+        ("window_start", 0),
+        ("window_size", 300),
+        ("sv", 0.0),
+        ("sz", 0.0),
+        ("st", 0.0),
+        ("sv2", 0.0),
+        ("sz2", 0.0),
+        ("st2", 0.0),
+    ]
+)
+RLDDM_2STEP = OrderedDict(
+    [
+        ("q", 0.5),
+        ("alpha", -1.0),
+        ("pos_alpha", 100.0),
+        ("gamma", -2.0),
+        ("gamma2", 100.0),
+        ("lambda_", 0.0),
+        ("v0", 0.0),
+        ("v1", 0.0),
+        ("v2", 0.0),
+        ("v", 2.0),
+        ("sv", 0.0),
+        ("a", 1.5),
+        ("z0", 0.0),
+        ("z1", 0.0),
+        ("z2", 0.0),
+        ("z", 0.5),
+        ("sz", 0.0),
+        ("t", 0.2),
+        ("nstates", 4),
+        ("v_interaction", 0.0),
+        ("z_interaction", 0.0),
+        ("two_stage", 1.0),
+        ("a_2", 100.0),
+        ("z_2", 0.5),
+        ("t_2", 100.0),
+        ("v_2", 100.0),
+        ("sz2", 0.0),
+        ("st2", 0.0),
+        ("sv2", 0.0),
+        ("alpha2", 100.0),
+        ("w", 0.0),
+        ("w2", 0.0),
+        ("z_scaler", 1.0),
+        ("z_sigma", 100.0),
+        ("z_sigma2", 100.0),
+        ("window_start", 0),
+        ("window_size", 300),
+        ("beta_ndt", 0.0),
+        ("beta_ndt2", 0.0),
+        ("beta_ndt3", 0.0),
+        ("st", 0.0),
+    ]
+)
+RLDDM_UNCERTAINTY = OrderedDict(RLDDM_2STEP)
+RLDDM_UNCERTAINTY.update(
+    [
+        ("z_scaler_2", 100.0),
+        ("beta_ndt", 0.1),
+        ("beta_ndt4", 0.0),
+        ("model_unc_rep", 1.0),
+        ("mem_unc_rep", 0.0),
+        ("unc_hybrid", 0.0),
+        ("w_unc", 0.0),
+    ]
+)
+
+
+def _register_2step(name, params):
+    @benchmark(name)
+    def setup():
+        import hddm
+
+        kernel = getattr(hddm.wfpt, name)
+        data = two_step_data()
+        kwargs = dict(params, **WIENER_PARAMS)
+        return lambda: kernel(*data.values(), **kwargs)
+
+
+_register_2step("wiener_like_rl_2step", RL_2STEP)
+_register_2step("wiener_like_rlddm_2step", RLDDM_2STEP)
+_register_2step("wiener_like_rlddm_uncertainty", RLDDM_UNCERTAINTY)
+
+
+def _register_simulator(model):
+    @benchmark("simulator_" + model)
+    def setup():
+        import hddm
+
+        simulator = hddm.simulators.simulator
+        theta = np.array(hddm.model_config.model_config[model]["default_params"])
+
+        def simulate():
+            np.random.seed(SEED)
+            return simulator(theta, model=model, n_samples=1000)
+
+        return simulate
+
+
+for _model in ["ddm", "angle", "weibull", "full_ddm"]:
+    _register_simulator(_model)
+
+
+@benchmark("gen_rand_data")
+def _gen_rand_data():
+    import hddm
+
+    gen_rand_data = hddm.generate.gen_rand_data
+
+    def generate():
+        np.random.seed(SEED)
+        return gen_rand_data(params=dict(DDM), size=1000)
+
+    return generate
+
+
+def _register_lan(model):
+    @benchmark("lan_" + model)
+    def setup():
+        from hddm.torch.mlp_inference_class import load_torch_mlp
+        import hddm
+
+        network = load_torch_mlp(model=model)
+        params = hddm.model_config.model_config[model]["default_params"]
+        rng = np.random.RandomState(SEED)
+        data = np.empty((10000, len(params) + 2), dtype=np.float32)
+        data[:, :-2] = params
+        data[:, -2] = rng.uniform(0.3, 3.0, len(data))
+        data[:, -1] = rng.choice([-1, 1], len(data))
+        return lambda: network.predict_on_batch(data)
+
+
+for _model in ["ddm", "angle"]:
+    _register_lan(_model)
+
+
+def _git_revision():
+    try:
+        return (
+            subprocess.check_output(
+                ["git", "rev-parse", "HEAD"], stderr=subprocess.DEVNULL
+            )
+            .decode()
+            .strip()
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(names=None, repeat=5, min_time=0.2, verbose=True):
+    """Run the benchmarks.
+
+    :Optional:
+        names : list of str <default=None>
+            Substrings selecting the benchmarks to run; all if None.
+        repeat : int <default=5>
+            Number of timing repeats.
+        min_time : float <default=0.2>
+            Minimal duration of one repeat in seconds; the number of calls
+            per repeat is chosen to reach it.
+        verbose : bool <default=True>
+            Print every result.
+
+    :Returns:
+        dict with the run's metadata and, per benchmark, the min / median /
+        mean / std of the time per call in seconds. Benchmarks whose setup
+        fails (e.g. pytorch missing) are reported as skipped.
+    """
+    import hddm
+
+    results = OrderedDict()
+    for name, setup in BENCHMARKS.items():
+        if names and not any(n in name for n in names):
+            continue
+        try:
+            func = setup()
+        except Exception as e:
+            results[name] = {"skipped": "%s: %s" % (type(e).__name__, e)}
+            if verbose:
+                print("%-32s skipped (%s)" % (name, results[name]["skipped"]))
+            continue
+
+        timer = timeit.Timer(func)
+        number = 1
+        while timer.timeit(number) < min_time:
+            number *= 2
+        times = np.array(timer.repeat(repeat=repeat, number=number)) / number
+        results[name] = OrderedDict(
+            [
+                ("min", times.min()),
+                ("median", np.median(times)),
+                ("mean", times.mean()),
+                ("std", times.std()),
+                ("number", number),
+                ("repeat", repeat),
+            ]
+        )
+        if verbose:
+            print("%-32s %12.3f ms" % (name, 1e3 * times.min()))
+
+    return OrderedDict(
+        [
+            (
+                "meta",
+                OrderedDict(
+                    [
+                        ("date", datetime.datetime.now().isoformat()),
+                        ("hddm", hddm.__version__),
+                        ("git", _git_revision()),
+                        ("numpy", np.__version__),
+                        ("python", platform.python_version()),
+                        ("machine", platform.machine()),
+                        ("processor", platform.processor()),
+                        ("platform", platform.platform()),
+                        ("seed", SEED),
+                    ]
+                ),
+            ),
+            ("results", results),
+        ]
+    )
+
+
+def compare(old, new, threshold=0.1, stat="min"):
+    """Compare two benchmark runs.
+
+    :Arguments:
+        old, new : dict or str
+            Results of run() or paths of their JSON files.
+
+    :Optional:
+        threshold : float <default=0.1>
+            Relative slow-down above which a benchmark counts as a regression.
+        stat : str <default='min'>
+            Statistic to compare; the minimum is the least noisy.
+
+    :Returns:
+        list of (name, old time, new time, ratio, status) with status one of
+        'regression', 'improvement' or 'ok'.
+    """
+    if not isinstance(old, dict):
+        with open(old) as f:
+            old = json.load(f)
+    if not isinstance(new, dict):
+        with open(new) as f:
+            new = json.load(f)
+
+    rows = []
+    for name, result in new["results"].items():
+        before = old["results"].get(name, {})
+        if stat not in result or stat not in before:
+            continue
+        ratio = result[stat] / before[stat]
+        if ratio > 1 + threshold:
+            status = "regression"
+        elif ratio < 1 / (1 + threshold):
+            status = "improvement"
+        else:
+            status = "ok"
+        rows.append((name, before[stat], result[stat], ratio, status))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    commands = parser.add_subparsers(dest="command")
+
+    run_parser = commands.add_parser("run", help="run the benchmarks")
+    run_parser.add_argument("-o", "--output", help="JSON file to write")
+    run_parser.add_argument("-k", action="append", help="benchmark name filter")
+    run_parser.add_argument("--repeat", type=int, default=5)
+    run_parser.add_argument("--min-time", type=float, default=0.2)
+
+    compare_parser = commands.add_parser("compare", help="compare two runs")
+    compare_parser.add_argument("old")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--threshold", type=float, default=0.1)
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        results = run(names=args.k, repeat=args.repeat, min_time=args.min_time)
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(results, f, indent=2)
+        return 0
+    if args.command == "compare":
+        rows = compare(args.old, args.new, threshold=args.threshold)
+        for name, before, after, ratio, status in rows:
+            print(
+                "%-32s %10.3f ms %10.3f ms %6.2fx  %s"
+                % (name, 1e3 * before, 1e3 * after, ratio, status)
+            )
+        return int(any(row[-1] == "regression" for row in rows))
+    parser.print_help()
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
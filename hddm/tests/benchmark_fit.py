@@ -0,0 +1,401 @@
+"""
+End-to-end benchmark of HDDMrl group fits on simulated two-step cohorts.
+
+A cohort of n_subjects x n_trials is simulated from a fixed seed with
+hddm.generate.simulation(), every subject drawing its parameters around the
+group values. Each model configuration of CONFIGS is then fit to the same
+cohort in a fresh worker process, timing the phases of a real analysis:
+model construction, find_starting_values(), sampling, gen_stats() and a
+posterior predictive check of every subject. Per configuration the peak
+resident memory of the worker and the effective samples per second of the
+slowest-mixing node are reported, which is what a cluster job has to be
+sized for.
+
+    $ python -m hddm.tests.benchmark_fit --subjects 20 --trials 150 \\
+          --samples 1000 --burn 200 -o fit.json
+    $ python -m hddm.tests.benchmark_fit -k uncertainty --no-ppc
+
+Results are written as JSON with the same metadata as hddm.tests.benchmark.
+"""
+
+import argparse
+import contextlib
+import datetime
+import json
+import multiprocessing
+import platform
+import resource
+import sys
+import time
+import traceback
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy.special import comb
+
+from hddm.tests.benchmark import SEED, _git_revision
+
+# group parameters of the simulated cohort, in the convention of
+# hddm.generate.simulation() (alpha and z_2 on the logit scale)
+COHORT_PARAMS = OrderedDict(
+    [
+        ("a", 1.5),
+        ("a_2", 1.5),
+        ("t", 0.3),
+        ("t_2", 0.3),
+        ("scaler", 3.0),
+        ("v_2", 3.0),
+        ("z", 0.5),
+        ("z_2", 0.1),
+        ("alpha", 0.0),
+        ("beta_ndt", 0.1),
+    ]
+)
+# between-subject standard deviations
+COHORT_SPREAD = OrderedDict(
+    [("a", 0.15), ("t", 0.05), ("scaler", 0.5), ("v_2", 0.5), ("alpha", 0.5)]
+)
+
+# model configurations: name -> HDDMrl keyword arguments. All of them
+# regress the first-stage drift on the model-based q-values, which is what
+# the posterior predictive check simulates.
+CONFIGS = OrderedDict(
+    [
+        ("one_stage", dict(alpha=True, v_reg=True, v0=True, v1=True)),
+        (
+            "two_stage",
+            dict(alpha=True, v_reg=True, v0=True, v1=True, two_stage=True),
+        ),
+        (
+            "two_stage_regress_ndt",
+            dict(
+                alpha=True,
+                v_reg=True,
+                v0=True,
+                v1=True,
+                two_stage=True,
+                regress_ndt=True,
+            ),
+        ),
+        (
+            "two_stage_uncertainty",
+            dict(
+                alpha=True,
+                v_reg=True,
+                v0=True,
+                v1=True,
+                two_stage=True,
+                regress_ndt=True,
+                model_unc_rep="ind",
+            ),
+        ),
+    ]
+)
+
+# parents of the wfpt node understood by posterior_predictive_check(),
+# renamed where the simulator uses a different keyword
+PPC_PARAMS = OrderedDict(
+    [
+        ("a", "a"),
+        ("a_2", "a_2"),
+        ("t", "t"),
+        ("t_2", "t_2"),
+        ("v", "scaler"),
+        ("v0", "v0"),
+        ("v1", "v1"),
+        ("v2", "v2"),
+        ("v_interaction", "v_interaction"),
+        ("v_2", "v_2"),
+        ("z", "z"),
+        ("z0", "z0"),
+        ("z1", "z1"),
+        ("z2", "z2"),
+        ("z_interaction", "z_interaction"),
+        ("z_2", "z_2"),
+        ("z_scaler", "z_scaler"),
+        ("alpha", "alpha"),
+        ("pos_alpha", "pos_alpha"),
+        ("alpha2", "alpha2"),
+        ("gamma", "gamma"),
+        ("lambda_", "lambda_"),
+        ("w", "w"),
+        ("w2", "w2"),
+        ("beta_ndt", "beta_ndt"),
+        ("beta_ndt2", "beta_ndt2"),
+    ]
+)
+
+
+def make_cohort(n_subjects=20, n_trials=150, nstates=4, seed=SEED, **params):
+    """Simulate a two-step cohort with hddm.generate.simulation().
+
+    :Optional:
+        n_subjects : int <default=20>
+            Number of subjects.
+        n_trials : int <default=150>
+            Number of trials per subject, rounded to a multiple of the
+            number of first-stage state pairs.
+        nstates : int <default=4>
+            Number of second-stage states.
+        seed : int <default=SEED>
+            Seed of the subject parameters and of the simulations.
+        params : dict
+            Group parameters overriding COHORT_PARAMS.
+
+    :Returns:
+        pandas.DataFrame in the format expected by HDDMrl, with a subj_idx
+        column.
+    """
+    import hddm
+
+    # the simulator tiles all first-stage state pairs the same number of times
+    n_sets = comb(nstates, 2, exact=True)
+    n_trials = n_sets * max(1, int(round(n_trials / float(n_sets))))
+    group = OrderedDict(COHORT_PARAMS)
+    group.update(params)
+
+    rng = np.random.RandomState(seed)
+    subjects = []
+    for subj_idx in range(n_subjects):
+        subj_params = OrderedDict(group)
+        for name, sd in COHORT_SPREAD.items():
+            subj_params[name] = group[name] + sd * rng.randn()
+        subj_params["a"] = max(subj_params["a"], 0.5)
+        subj_params["t"] = max(subj_params["t"], 0.05)
+        data = hddm.generate.simulation(
+            nstates, seed + subj_idx, ntrials=n_trials, **subj_params
+        )
+        data["subj_idx"] = subj_idx
+        subjects.append(data)
+    return pd.concat(subjects, ignore_index=True)
+
+
+def _peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024.0 ** 2 if sys.platform == "darwin" else 1024.0)
+
+
+@contextlib.contextmanager
+def _phase(result, name):
+    start = time.perf_counter()
+    yield
+    result["time"][name] = time.perf_counter() - start
+    result["peak_rss_mb"][name] = _peak_rss_mb()
+
+
+def _ppc_params(obs):
+    """Keyword arguments of posterior_predictive_check() from the current
+    values of the parents of the wfpt node obs; parameters switched off with
+    the 100.0 sentinel are left out."""
+    params = {}
+    for name, keyword in PPC_PARAMS.items():
+        if name not in obs.parents:
+            continue
+        value = float(getattr(obs.parents[name], "value", obs.parents[name]))
+        if value != 100.0:
+            params[keyword] = value
+    return params
+
+
+def fit(data, config, n_samples=500, burn=100, ppc=True, seed=SEED):
+    """Fit one HDDMrl configuration to data, timing every phase.
+
+    :Arguments:
+        data : pandas.DataFrame
+            Cohort as returned by make_cohort().
+        config : dict
+            HDDMrl keyword arguments.
+
+    :Optional:
+        n_samples : int <default=500>
+            Number of MCMC iterations, including burn.
+        burn : int <default=100>
+            Number of burn-in iterations.
+        ppc : bool <default=True>
+            Run a posterior predictive check of every subject from the final
+            posterior draw.
+        seed : int <default=SEED>
+            Seed of the sampler.
+
+    :Returns:
+        OrderedDict with the wall time and the peak RSS (MB, of the whole
+        process) after each phase, the number of sampled nodes and the
+        minimal and median effective sample size over the nodes, also per
+        second of sampling.
+    """
+    import hddm
+    from hddm.models.base import _effective_sample_size
+
+    np.random.seed(seed)
+    result = OrderedDict([("time", OrderedDict()), ("peak_rss_mb", OrderedDict())])
+    with _phase(result, "construction"):
+        m = hddm.HDDMrl(data, **config)
+    with _phase(result, "find_starting_values"):
+        m.find_starting_values()
+    with _phase(result, "sample"):
+        m.sample(n_samples, burn=burn, progress_bar=False)
+    with _phase(result, "gen_stats"):
+        m.gen_stats()
+    if ppc:
+        with _phase(result, "ppc"):
+            for obs in m.get_observeds()["node"]:
+                # the wfpt node only holds its likelihood columns, the check
+                # also needs e.g. subj_idx
+                rows = m.data.loc[obs.value.index].reset_index(drop=True)
+                hddm.generate.posterior_predictive_check(
+                    rows, size=len(rows), **_ppc_params(obs)
+                )
+
+    traces = m.get_traces()
+    ess = np.array([_effective_sample_size(traces[name].values) for name in traces])
+    sample_time = result["time"]["sample"]
+    result["n_nodes"] = int(traces.shape[1])
+    result["n_draws"] = int(traces.shape[0])
+    result["ess_min"] = float(ess.min())
+    result["ess_median"] = float(np.median(ess))
+    result["ess_min_per_s"] = float(ess.min() / sample_time)
+    result["ess_median_per_s"] = float(np.median(ess) / sample_time)
+    return result
+
+
+def _fit_worker(data, config, n_samples, burn, ppc, seed):
+    try:
+        return fit(data, config, n_samples=n_samples, burn=burn, ppc=ppc, seed=seed)
+    except Exception as e:
+        return OrderedDict(
+            [
+                ("failed", "%s: %s" % (type(e).__name__, e)),
+                ("traceback", traceback.format_exc()),
+            ]
+        )
+
+
+def run(
+    names=None,
+    n_subjects=20,
+    n_trials=150,
+    nstates=4,
+    n_samples=500,
+    burn=100,
+    ppc=True,
+    seed=SEED,
+    verbose=True,
+):
+    """Fit the configurations of CONFIGS to one simulated cohort.
+
+    Every configuration runs in its own freshly spawned process, so that
+    the peak RSS is that of a cluster job fitting it alone.
+
+    :Optional:
+        names : list of str <default=None>
+            Substrings selecting the configurations to run; all if None.
+        n_subjects, n_trials, nstates : int
+            Size of the cohort, see make_cohort().
+        n_samples : int <default=500>
+            Number of MCMC iterations, including burn.
+        burn : int <default=100>
+            Number of burn-in iterations.
+        ppc : bool <default=True>
+            Include the posterior predictive check.
+        seed : int <default=SEED>
+            Seed of the cohort and of the samplers.
+        verbose : bool <default=True>
+            Print every result.
+
+    :Returns:
+        dict with the run's metadata and, per configuration, the result of
+        fit() or the error it failed with.
+    """
+    import hddm
+
+    start = time.perf_counter()
+    data = make_cohort(n_subjects, n_trials, nstates, seed=seed)
+    simulation_time = time.perf_counter() - start
+
+    results = OrderedDict()
+    context = multiprocessing.get_context("spawn")
+    for name, config in CONFIGS.items():
+        if names and not any(n in name for n in names):
+            continue
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            results[name] = pool.submit(
+                _fit_worker, data, config, n_samples, burn, ppc, seed
+            ).result()
+        if verbose:
+            _print_result(name, results[name])
+
+    meta = OrderedDict(
+        [
+            ("date", datetime.datetime.now().isoformat()),
+            ("hddm", hddm.__version__),
+            ("git", _git_revision()),
+            ("numpy", np.__version__),
+            ("python", platform.python_version()),
+            ("machine", platform.machine()),
+            ("processor", platform.processor()),
+            ("platform", platform.platform()),
+            ("seed", seed),
+            ("n_subjects", n_subjects),
+            ("n_trials", int(len(data) // n_subjects)),
+            ("nstates", nstates),
+            ("n_samples", n_samples),
+            ("burn", burn),
+            ("simulation_time", simulation_time),
+        ]
+    )
+    return OrderedDict([("meta", meta), ("results", results)])
+
+
+def _print_result(name, result):
+    if "failed" in result:
+        print("%-24s failed (%s)" % (name, result["failed"]))
+        return
+    phases = "  ".join(
+        "%s %.1fs" % (phase, seconds) for phase, seconds in result["time"].items()
+    )
+    print(
+        "%-24s %s  peak %.0f MB  ESS/s min %.2f median %.2f"
+        % (
+            name,
+            phases,
+            max(result["peak_rss_mb"].values()),
+            result["ess_min_per_s"],
+            result["ess_median_per_s"],
+        )
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("-o", "--output", help="JSON file to write")
+    parser.add_argument("-k", action="append", help="configuration name filter")
+    parser.add_argument("--subjects", type=int, default=20)
+    parser.add_argument("--trials", type=int, default=150)
+    parser.add_argument("--nstates", type=int, default=4)
+    parser.add_argument("--samples", type=int, default=500)
+    parser.add_argument("--burn", type=int, default=100)
+    parser.add_argument("--no-ppc", action="store_true")
+    parser.add_argument("--seed", type=int, default=SEED)
+
+    args = parser.parse_args(argv)
+    results = run(
+        names=args.k,
+        n_subjects=args.subjects,
+        n_trials=args.trials,
+        nstates=args.nstates,
+        n_samples=args.samples,
+        burn=args.burn,
+        ppc=not args.no_ppc,
+        seed=args.seed,
+    )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    return int(any("failed" in result for result in results["results"].values()))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
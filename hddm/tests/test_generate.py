@@ -3,6 +3,7 @@ import unittest
 import hddm
 from scipy.stats import ks_2samp, kstest
 import numpy as np
+import pandas as pd
 
 from nose import SkipTest
 
@@ -49,8 +50,31 @@ class TestGenerate(unittest.TestCase):
             print("p_value: %f" % p_value)
             self.assertTrue(p_value > 0.05)
 
+    def test_simulated_drift_batched(self):
+        np.random.seed(100)
+        params = {"v": np.array([2.0, -2.0, 0.5]), "a": 1.5, "z": 0.5, "t": 0.3}
+        rts, paths = hddm.generate._gen_rts_from_simulated_drift(params, samples=3)
+        self.assertEqual(rts.shape, (3,))
+        self.assertIsNone(paths)
+        self.assertTrue(np.all(np.abs(rts) > 0.3))
+
+        params = {"v": 1.0, "a": 2.0, "z": 0.5, "t": 0.3}
+        params.update({"v_switch": -3.0, "t_switch": 0.1})
+        rts, paths = hddm.generate._gen_rts_from_simulated_drift(
+            params, samples=200, return_paths=True
+        )
+        self.assertEqual(len(paths), 200)
+        self.assertTrue(np.mean(rts < 0) > 0.5)
+
     def test_generate_breakdown(self):
         hddm.generate.gen_rand_data(subjs=10)
         hddm.generate.gen_rand_data(subjs=1)
         hddm.generate.gen_rand_data(n_fast_outliers=5, n_slow_outliers=5)
         hddm.generate.gen_rand_data(size=100)
+
+    def test_cross_validation_folds(self):
+        data = pd.DataFrame({"subj_idx": np.repeat([3, 1], 25), "rt": np.arange(50)})
+        folds = hddm.cross_validation.make_folds(data, n_folds=5)
+        for _, subj_folds in folds.groupby(data.subj_idx):
+            # contiguous blocks in trial order
+            np.testing.assert_array_equal(subj_folds.values, np.repeat(range(5), 5))
@@ -173,6 +173,62 @@ class ModelLoad(unittest.TestCase):
                 print("Skipping n > 2 choice models for this test for now !")
         pass
 
+    def test_numpy_backend(self):
+        import numpy as np
+        from hddm.torch.mlp_numpy_inference import convert_torch_mlp
+        from hddm.torch.mlp_numpy_inference import LoadNumpyMLPInfer
+
+        for model in ["ddm", "angle"]:
+            fname = convert_torch_mlp(model, self.filepath + model + ".npz")
+            numpy_net = LoadNumpyMLPInfer(weights_path=fname)
+            torch_net = hddm.torch.mlp_inference_class.load_torch_mlp(model=model)
+
+            data = np.random.uniform(0.2, 1.5, size=(500, numpy_net.input_dim))
+            data = data.astype(np.float32)
+            np.testing.assert_allclose(
+                numpy_net.predict_on_batch(data),
+                torch_net.predict_on_batch(data),
+                rtol=1e-4,
+                atol=1e-4,
+            )
+            # the scratch arrays are reused for smaller batches
+            np.testing.assert_allclose(
+                numpy_net.predict_on_batch(data[:10]),
+                numpy_net.predict_on_batch(data)[:10],
+            )
+
+    def test_network_cache(self):
+        import gc
+        from hddm.torch.mlp_inference_class import load_torch_mlp, network_cache
+
+        key = ("ddm", "torch", "float32")
+        network_cache.evict(model="ddm", force=True)
+        data = self.get_data_single_subj(model="ddm")
+        m1 = hddm.HDDMnn(data, model="ddm")
+        m2 = hddm.HDDMnn(data, model="ddm")
+        # both models share one loaded network
+        self.assertIs(m1.network, m2.network)
+        self.assertIs(load_torch_mlp(model="ddm"), m1.network)
+        self.assertEqual(network_cache.info()[key], 2)
+
+        # networks in use are only evicted with force=True
+        self.assertEqual(network_cache.evict(model="ddm"), [])
+        del m1, m2
+        gc.collect()
+        self.assertEqual(network_cache.info()[key], 0)
+        self.assertEqual(network_cache.evict(model="ddm"), [key])
+        self.assertNotIn(key, network_cache.info())
+
+    def test_reduced_precision(self):
+        from hddm.torch.mlp_inference_class import precision_report
+
+        for precision in ["int8", "bf16"]:
+            report = precision_report(
+                "ddm", precision=precision, n_samples=5000, seed=1
+            )
+            self.assertLess(report["mean_abs_err_above_ll_min"], 0.1)
+            self.assertLess(abs(report["sum_err_per_1000_trials"]), 100)
+
 
 if __name__ == "__main__":
     unittest.main()
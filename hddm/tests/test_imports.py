@@ -0,0 +1,64 @@
+import subprocess
+import sys
+import unittest
+
+# modules that `import hddm` must not load (see the lazy imports in hddm/__init__)
+HEAVY_MODULES = [
+    "seaborn",
+    "sklearn",
+    "torch",
+    "hddm.plotting",
+    "hddm.network_inspectors",
+    "hddm.likelihoods_mlp",
+    "hddm.models.hddm_nn",
+]
+
+# generous bound on the import time in seconds, to catch gross regressions
+MAX_IMPORT_TIME = 10.0
+
+
+def _run(code):
+    return subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout
+
+
+class TestImports(unittest.TestCase):
+    def test_import_is_lazy(self):
+        loaded = _run(
+            "import sys, hddm\n"
+            "print(' '.join(m for m in %r if m in sys.modules))" % HEAVY_MODULES
+        )
+        self.assertEqual(loaded.split(), [])
+
+    def test_lazy_attributes(self):
+        loaded = _run(
+            "import sys, hddm\n"
+            "hddm.utils, hddm.generate, hddm.analyze\n"
+            "print('hddm.utils' in sys.modules, hddm.HDDMrl.__name__)"
+        )
+        self.assertEqual(loaded.split(), ["True", "HDDMrl"])
+
+    def test_lazy_torch_submodules(self):
+        loaded = _run(
+            "import sys, hddm\n"
+            "hddm.torch.torch_config.TorchConfig\n"
+            "print('hddm.torch.torch_config' in sys.modules, 'torch' in sys.modules)"
+        )
+        self.assertEqual(loaded.split(), ["True", "False"])
+
+    def test_import_time(self):
+        elapsed = float(
+            _run(
+                "import time\n"
+                "start = time.perf_counter()\n"
+                "import hddm\n"
+                "print(time.perf_counter() - start)"
+            )
+        )
+        print("import hddm: %.2fs" % elapsed)
+        self.assertLess(elapsed, MAX_IMPORT_TIME)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,5 @@
 import numpy as np
+import pandas as pd
 from numpy.random import rand
 import scipy as sp
 
@@ -42,6 +43,28 @@ def gen_like_from_matlab(samples=20, seed=3123):
     return vals
 
 
+class Network(object):
+    """Stand-in for a LAN, recording the size of every forward pass."""
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    def predict_on_batch(self, x):
+        self.batch_sizes.append(len(x))
+        return x[:, :1] * x[:, -2:-1] - x[:, 1:2]
+
+
+class Parents(dict):
+    """Stand-in for the parents of a PyMC node, counting reads of .value."""
+
+    reads = 0
+
+    @property
+    def value(self):
+        Parents.reads += 1
+        return {name: getattr(p, "value", p) for name, p in self.items()}
+
+
 class TestWfpt(unittest.TestCase):
     def __init__(self, *args, **kwargs):
         super(TestWfpt, self).__init__(*args, **kwargs)
@@ -150,6 +173,148 @@ class TestWfpt(unittest.TestCase):
             hddm_result = hddm.wfpt.full_pdf(rt, v, sv, a, z, 0, 0, 0, err)
             np.testing.assert_array_almost_equal(hddm_result, sp_result)
 
+    def test_rl_trial_logp(self):
+        response = np.random.randint(0, 2, 60)
+        feedback = np.random.rand(60)
+        split_by = np.repeat([0, 1, 2], 20)
+        np.random.shuffle(split_by)
+        trial_logp = np.empty(60)
+        params = (0.5, -1.0, 100.00, 2.0, 0.5)  # q, alpha, pos_alpha, v, z
+        logp = hddm.wfpt.wiener_like_rl(
+            response, feedback, split_by, *params, trial_logp=trial_logp
+        )
+        np.testing.assert_almost_equal(trial_logp.sum(), logp)
+        # the first trial of every condition only updates the q values
+        first = [np.flatnonzero(split_by == s)[0] for s in range(3)]
+        np.testing.assert_array_equal(trial_logp[first], 0)
+
+    def test_stats(self):
+        if not hddm.wfpt.STATS_ENABLED:
+            self.assertRaises(RuntimeError, hddm.wfpt.get_stats)
+            raise SkipTest("wfpt was compiled without HDDM_WFPT_STATS")
+        x = np.linspace(0.5, 2.0, 50)
+        hddm.wfpt.reset_stats()
+        hddm.wfpt.pdf_array(x, 1.0, 0, 2.0, 0.5, 0.2, 0.3, 0.2)
+        hddm.wfpt.wiener_like(x, 1.0, 0, 2.0, 0.5, 0, 0.3, 0, 1e-4, p_outlier=2)
+        stats = hddm.wfpt.get_stats()
+        self.assertEqual(stats["full_pdf"]["calls"], 50)
+        self.assertEqual(stats["full_pdf"]["sz_st"], 50)
+        self.assertEqual(stats["early_exit"]["params"], 1)
+        self.assertGreater(stats["simpson_2d"]["depth"].sum(), 0)
+        ftt = stats["ftt_01w"]
+        self.assertGreaterEqual(ftt["small_t_terms"], ftt["small_t_calls"])
+        hddm.wfpt.reset_stats()
+        self.assertEqual(hddm.wfpt.get_stats()["full_pdf"]["calls"], 0)
+
+    def test_nn_mlp_input_buffer(self):
+        class Network(object):
+            def predict_on_batch(self, x):
+                return x[:, :1] * x[:, -2:-1] - x[:, 1:2]
+
+        x = pd.DataFrame(
+            {"rt": rand(40), "response": np.sign(rand(40) - 0.5)}, dtype=np.float32
+        )
+        params = np.array([1.0, 2.0, 0.5, 0.3], dtype=np.float32)
+        logp = hddm.wfpt.wiener_like_nn_mlp(
+            x["rt"].values, x["response"].values, params, network=Network()
+        )
+        data = hddm.utils.lan_input_buffer(x, 4)
+        self.assertIs(data, hddm.utils.lan_input_buffer(x, 4))
+        logp_buffer = hddm.wfpt.wiener_like_nn_mlp(
+            data[:, 4], data[:, 5], params, network=Network(), data=data
+        )
+        np.testing.assert_almost_equal(logp, logp_buffer)
+
+        # the data columns follow x and abs_rt
+        x["rt"] = -x["rt"]
+        np.testing.assert_array_equal(hddm.utils.lan_input_buffer(x, 4)[:, 4], x.rt)
+        self.assertIs(data, hddm.utils.lan_input_buffer(x, 4, abs_rt=True))
+        np.testing.assert_array_equal(data[:, 4], -x.rt)
+
+        outcome = pd.Series(rand(40), index=x.index)
+        rows = hddm.utils.lan_reg_rows(x, "v", outcome)
+        np.testing.assert_array_equal(rows, np.arange(40))
+        rows = hddm.utils.lan_reg_rows(x, "v", outcome[::-1])
+        np.testing.assert_array_equal(rows, np.arange(40)[::-1])
+
+    def test_nn_mlp_batch(self):
+        from types import SimpleNamespace
+
+        namespace = {"np": np, "hddm": hddm}
+        exec(hddm.utils.make_likelihood_str_mlp({"params": ["v", "a"]}), namespace)
+        like = namespace["custom_likelihood"]
+
+        nodes = []
+        for v in [0.5, 1.0, 1.5]:
+            x = pd.DataFrame({"rt": rand(20), "response": np.ones(20)})
+            nodes.append(SimpleNamespace(value=x, parents=Parents(v=v, a=2.0)))
+        logps = [like(n.value, network=Network(), **n.parents.value) for n in nodes]
+
+        network = Network()
+        # the nodes only hold weak references to their batch
+        batch = hddm.utils.LANBatch(nodes, ["v", "a"], network)
+        batched = [like(n.value, network=network, **n.parents.value) for n in nodes]
+        np.testing.assert_array_almost_equal(logps, batched, 4)
+        self.assertEqual(network.batch_sizes, [60])
+
+    def test_nn_mlp_batch_subject_step(self):
+        from types import SimpleNamespace
+
+        namespace = {"np": np, "hddm": hddm}
+        exec(hddm.utils.make_likelihood_str_mlp({"params": ["v", "a"]}), namespace)
+        like = namespace["custom_likelihood"]
+
+        # the cost of a step must not grow with the number of nodes
+        for n_nodes in [4, 40]:
+            network = Network()
+            a = pm.Normal("a", 2.0, 1.0, value=2.0)
+            nodes = []
+            for k in range(n_nodes):
+                x = pd.DataFrame({"rt": rand(20), "response": np.ones(20)})
+                v = pm.Normal("v.%d" % k, 1.0, 1.0, value=1.0)
+                nodes.append(SimpleNamespace(value=x, parents=Parents(v=v, a=a)))
+            batch = hddm.utils.LANBatch(nodes, ["v", "a"], network)
+            for node in nodes:
+                like(node.value, network=network, **node.parents.value)
+            self.assertEqual(network.batch_sizes, [20 * n_nodes])
+
+            # a step of a subject node evaluates only that node, without
+            # reading the parents of the others
+            nodes[1].parents["v"].value = 1.5
+            params = nodes[1].parents.value
+            Parents.reads = 0
+            like(nodes[1].value, network=network, **params)
+            self.assertEqual(Parents.reads, 0)
+            self.assertEqual(network.batch_sizes[-1], 20)
+
+            # a step of the shared node evaluates all nodes together
+            a.value = 2.5
+            for node in nodes:
+                like(node.value, network=network, **node.parents.value)
+            self.assertEqual(network.batch_sizes[1:], [20, 20 * n_nodes])
+
+    def test_nn_mlp_reg(self):
+        class Network(object):
+            def predict_on_batch(self, x):
+                return x[:, :1] * x[:, -2:-1] - x[:, 1:2]
+
+        config = hddm.model_config.model_config["ddm"]
+        namespace = {"np": np, "hddm": hddm}
+        exec(hddm.utils.make_reg_likelihood_str_mlp(config), namespace)
+        like = namespace["custom_likelihood_reg"]
+
+        data = pd.DataFrame(
+            {"rt": rand(30) + 0.3, "response": np.ones(30)}, index=np.arange(10, 40)
+        )
+        x = data.iloc[5:25]
+        v = pd.Series(np.linspace(-1, 1, 30), index=data.index)
+        logp = like(x, v, 1.5, 0.5, 0.2, ["v"], network=Network())
+        expected = np.sum(v.loc[x.index].values * x["rt"].values - 1.5)
+        np.testing.assert_almost_equal(logp, expected, 4)
+        # regressor outputs outside of the parameter bounds
+        logp = like(x, 10 * v, 1.5, 0.5, 0.2, ["v"], network=Network())
+        self.assertEqual(logp, -np.inf)
+
 
 class TestWfptFull(unittest.TestCase):
     def test_adaptive(self):
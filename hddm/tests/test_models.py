@@ -38,6 +38,42 @@ def diff_model(param, subj=True, num_subjs=10, change=0.5, size=500):
     return model
 
 
+def rl_model(n_subjects=2, n_trials=48, **kwargs):
+    """HDDMrl of the one-stage benchmark configuration on a small simulated
+    two-step cohort."""
+    from hddm.tests.benchmark_fit import CONFIGS, make_cohort
+
+    params = dict(CONFIGS["one_stage"], **kwargs)
+    return hddm.HDDMrl(make_cohort(n_subjects, n_trials), **params)
+
+
+def regression_node(
+    data, outcome, model, link_func=lambda x: x, knode_class=None, **kwargs
+):
+    """Regression node of outcome ~ model with Normal priors on the
+    coefficients, built by KnodeRegress (or knode_class) outside of a
+    model."""
+    from patsy import dmatrix
+    from hddm.models.hddm_regression import KnodeRegress
+
+    knode_class = knode_class or KnodeRegress
+
+    covariates = dmatrix(model, data).design_info.column_names
+    reg = {
+        "outcome": outcome,
+        "model": model,
+        "params": ["%s_%s" % (outcome, cov) for cov in covariates],
+        "link_func": link_func,
+    }
+    coefs = {name: pm.Normal(name, 0, 1, value=0.1) for name in reg["params"]}
+    knode = knode_class(pm.Deterministic, "%s_reg" % outcome, **kwargs)
+    knode.set_data(data)
+    name = "%s_reg" % outcome
+    return knode.create_node(
+        name, {"regressor": reg, "parents": coefs, "doc": name}, data
+    )
+
+
 class TestMulti(unittest.TestCase):
     def runTest(self):
         pass
@@ -180,6 +216,189 @@ class TestSingleBreakdown(unittest.TestCase):
             os.remove("test.db")
             os.remove("test.model")
 
+    def test_HDDM_optimize_per_subject(self):
+        # with bias the z_subj nodes are deterministic, invlogit(z_subj_trans);
+        # the group-only a is estimated for every subject
+        params = dict(bias=True, group_only_nodes=["a"])
+        model, refit = rl_model(3, **params), rl_model(3, **params)
+
+        self.assertRaises(TypeError, model.optimize, "ML")
+        np.random.seed(1)
+        fits = model.optimize("ML", per_subject=True, n_runs=2, n_jobs=2)
+        self.assertEqual(
+            list(fits.columns), ["subj_idx", "knode", "node", "value", "logp"]
+        )
+        self.assertEqual(sorted(fits.subj_idx.unique()), [0, 1, 2])
+        self.assertTrue(np.all(np.isfinite(fits.logp)))
+        self.assertIn("z_subj", set(fits.knode))
+        self.assertEqual(sorted(fits.subj_idx[fits.node == "a"]), [0, 1, 2])
+        estimates = fits.groupby("node").value.mean()
+        for name, value in estimates.items():
+            self.assertAlmostEqual(model.nodes_db.loc[name, "node"].value, value)
+
+        np.random.seed(1)
+        refits = refit.optimize("ML", per_subject=True, n_runs=2, n_jobs=2)
+        np.testing.assert_array_equal(refits.value, fits.value)
+
+    def test_HDDM_memmap_db(self):
+        import shutil
+
+        dbname = "test.memmap"
+
+        model = rl_model()
+        model.mcmc(db=hddm.database.Database(dbname, dbmode="w", chunk_size=7))
+        model.sample(50, burn=10)
+        trace = model.nodes_db.loc["a", "node"].trace()
+        self.assertEqual(len(trace), 40)
+        self.assertIsInstance(trace[::2], np.memmap)
+
+        model.save("test.model")
+        m_load = hddm.load("test.model")
+        np.testing.assert_array_equal(
+            m_load.nodes_db.loc["a", "node"].trace(), trace[:]
+        )
+
+        # an unfinished chain is resumed from its last committed chunk
+        db = hddm.database.load(dbname)
+        db._chains[-1]["finalized"] = False
+        model = rl_model()
+        model.sample(10, db=db)
+        trace = np.array(model.nodes_db.loc["a", "node"].trace())
+        self.assertEqual(len(trace), 50)
+
+        # halting a resumed chain keeps the samples committed before it
+        db = hddm.database.load(dbname)
+        db._chains[-1]["finalized"] = False
+        model = rl_model()
+        tally, tallied = db.tally, []
+
+        def tally_then_halt(chain=-1):
+            tally(chain)
+            tallied.append(chain)
+            if len(tallied) == 5:
+                model.mc.status = "halt"
+
+        db.tally = tally_then_halt
+        model.sample(10, db=db)
+        resumed = model.nodes_db.loc["a", "node"].trace()
+        self.assertEqual(len(resumed), 55)
+        np.testing.assert_array_equal(resumed[:50], trace)
+
+        shutil.rmtree(dbname)
+        os.remove("test.model")
+
+    def test_HDDM_memmap_load_db(self):
+        import shutil
+
+        dbname = "test_load.memmap"
+        model = rl_model()
+        model.sample(30, burn=10, db="memmap", dbname=dbname)
+        traces = model.get_traces()
+
+        m_load = rl_model()
+        m_load.load_db(dbname, db="memmap")
+        pd.testing.assert_frame_equal(m_load.get_traces(), traces)
+        shutil.rmtree(dbname)
+
+    def test_HDDM_sample_chains(self):
+        model = rl_model()
+
+        traces = model.sample_chains(n_chains=2, iter=60, burn=10, seed=123)
+        self.assertEqual(traces.index.names, ["chain", "sample"])
+        self.assertEqual(len(traces.loc[0]), 50)
+        self.assertEqual(len(traces.loc[1]), 50)
+        self.assertFalse(np.allclose(traces.loc[0].values, traces.loc[1].values))
+        self.assertEqual(list(model.chain_stats.columns), ["rhat", "ess"])
+        self.assertEqual(set(model.chain_stats.index), set(traces.columns))
+        self.assertFalse(model.sampled)
+
+    def test_HDDM_profile_logp(self):
+        model = rl_model()
+
+        fname = "test.folded"
+        mc = getattr(model, "mc", None)
+        prof = model.profile_logp(n_iter=20, flamegraph=fname)
+        self.assertTrue(set(model.nodes_db.index) <= set(prof.nodes.index))
+        likelihoods = prof.nodes[prof.nodes.kind == "likelihood"]
+        self.assertEqual(len(likelihoods), 2)
+        self.assertTrue((likelihoods.calls > 0).all())
+        self.assertIn("<sampler>", prof.step_methods.index)
+        with open(fname) as f:
+            for line in f:
+                stack, micros = line.rsplit(" ", 1)
+                self.assertTrue(stack.startswith("sample"))
+                self.assertGreater(int(micros), 0)
+        os.remove(fname)
+        self.assertIs(getattr(model, "mc", None), mc)
+
+    def test_HDDM_waic_loo(self):
+        from scipy.special import logsumexp
+        from hddm.utils import _gpdfit, _gpinv
+
+        model = rl_model()
+        model.sample(60, burn=20)
+        obs_nodes = list(model.get_observeds()["node"])
+        stochastics = list(model.mc.stochastics)
+        values = [node.value for node in stochastics]
+
+        # dense draws x trials log-likelihood matrix
+        logp = np.zeros((40, sum(len(obs.value) for obs in obs_nodes)))
+        for draw in range(40):
+            for node in stochastics:
+                node.value = node.trace()[draw]
+            start = 0
+            for obs in obs_nodes:
+                kwargs = dict(obs.parents.value)
+                kwargs.pop("trial_logp", None)
+                row = logp[draw, start : start + len(obs.value)]
+                type(obs).wfpt_like(obs.value, trial_logp=row, **kwargs)
+                start += len(obs.value)
+        for node, value in zip(stochastics, values):
+            node.value = value
+        logp = logp[:, np.any(logp != 0, axis=0)]
+
+        # PSIS of every trial on the full matrix, as in Vehtari et al. (2017)
+        n_tail = int(np.ceil(min(0.2 * 40, 3 * np.sqrt(40))))
+        elpd_loo, pareto_k = [], []
+        for raw in -logp.T:
+            lw = raw - raw.max()
+            order = np.argsort(lw)
+            cutoff, tail = lw[order[-n_tail - 1]], lw[order[-n_tail:]]
+            k, sigma = _gpdfit(np.exp(tail) - np.exp(cutoff))
+            probs = (np.arange(n_tail) + 0.5) / n_tail
+            smoothed = np.log(_gpinv(probs, k, sigma) + np.exp(cutoff))
+            lw[order[-n_tail:]] = np.minimum(smoothed, 0)
+            elpd_loo.append(logsumexp(lw - logsumexp(lw) - raw))
+            pareto_k.append(k)
+
+        for n_jobs in [1, 2]:
+            stats, pointwise = hddm.utils.waic_loo(model, chunk_size=7, n_jobs=n_jobs)
+            self.assertEqual(len(pointwise), logp.shape[1])
+            np.testing.assert_allclose(
+                pointwise.lppd, logsumexp(logp, axis=0) - np.log(40)
+            )
+            np.testing.assert_allclose(pointwise.p_waic, logp.var(axis=0, ddof=1))
+            np.testing.assert_allclose(pointwise.elpd_loo, elpd_loo)
+            np.testing.assert_allclose(pointwise.pareto_k, pareto_k)
+            self.assertEqual(stats["n_bad_k"], int((np.array(pareto_k) > 0.7).sum()))
+            self.assertAlmostEqual(stats["waic"], -2 * pointwise.elpd_waic.sum())
+
+    def test_HDDM_tolerance_schedule(self):
+        model = rl_model(1, include=("sv", "sz", "st"), is_group_model=False)
+        wiener_params = dict(model.wiener_params)
+        wfpt = model.get_observeds()["node"].iloc[0]
+        self.assertIs(type(wfpt).wiener_params, model.wiener_params)
+
+        schedule = hddm.tolerance.ToleranceSchedule(window=5)
+        model.sample(80, burn=40, tolerance_schedule=schedule)
+        report = model.tolerance_report
+        self.assertLessEqual(report["switch_iter"], 30)
+        self.assertEqual(model.wiener_params, wiener_params)
+        self.assertTrue(np.isfinite(report["loglike_shift"]))
+        self.assertEqual(
+            set(report["geweke_z"].index), set(model.get_traces().columns)
+        )
+
     def test_HDDMTruncated_distributions(self):
         params = hddm.generate.gen_rand_params()
         data, params_subj = hddm.generate.gen_rand_data(subjs=4, params=params, size=10)
@@ -387,6 +606,66 @@ class TestHDDMRegressor(unittest.TestCase):
             len(np.unique(m.nodes_db.loc["wfpt.0"]["node"].parents["v"].value)), 1
         )
 
+    def test_regressor_trace(self):
+        from hddm.models import hddm_regression, hddm_rl_regression
+
+        data = pd.DataFrame(
+            {"cov": np.random.randn(30), "cond": np.tile(["a", "b", "c"], 10)}
+        )
+        # the regression models pass their link function a Series and a
+        # one-column DataFrame, respectively
+        for knode_class in [
+            hddm_regression.KnodeRegress,
+            hddm_rl_regression.KnodeRegress,
+        ]:
+            node = regression_node(
+                data,
+                "v",
+                "1 + cov + C(cond)",
+                link_func=lambda x: 1 / (1 + np.exp(-x)),
+                knode_class=knode_class,
+                keep_regressor_trace=True,
+            )
+            pm.MCMC([node] + node.parents["args"]).sample(50, 10, progress_bar=False)
+
+            trace = np.concatenate(
+                list(hddm_regression.iter_regressor_trace(node, chunk_size=7))
+            )
+            self.assertEqual(trace.shape, (40, len(data)))
+            np.testing.assert_allclose(
+                trace, [np.ravel(value) for value in node.trace()[:]]
+            )
+
+    def test_random_drift_batched(self):
+        data = pd.DataFrame(
+            {
+                "rt": np.random.rand(40) + 0.5,
+                "response": np.random.randint(0, 2, 40),
+                "cov": np.random.randn(40),
+            }
+        )
+        stoch = hddm.models.hddm_regression.generate_wfpt_reg_stochastic_class(
+            sampling_method="drift"
+        )
+        node = stoch(
+            "wfpt",
+            value=data,
+            observed=True,
+            v=regression_node(data, "v", "1 + cov"),
+            sv=0,
+            a=2.0,
+            z=0.5,
+            sz=0,
+            t=0.3,
+            st=0,
+            reg_outcomes={"v"},
+            p_outlier=0,
+        )
+        sampled = stoch.random(node)
+        self.assertTrue(sampled.index.equals(node.value.index))
+        self.assertTrue(np.all(np.isfinite(sampled["rt"].values)))
+        self.assertFalse(np.allclose(sampled["rt"].values, node.value["rt"].values))
+
     def test_link_func_on_z(self):
         params = hddm.generate.gen_rand_params()
         data, params_true = hddm.generate.gen_rand_data(params, size=10, subjs=4)
@@ -684,6 +963,20 @@ def test_posterior_plots_breakdown():
     hddm.utils.post_pred_stats(data, ppc)
 
 
+def test_benchmark_fit():
+    from hddm.tests.benchmark_fit import CONFIGS, fit, make_cohort
+
+    result = fit(make_cohort(2, 24), CONFIGS["one_stage"], n_samples=20, burn=10)
+    assert list(result["time"]) == [
+        "construction",
+        "find_starting_values",
+        "sample",
+        "gen_stats",
+        "ppc",
+    ]
+    assert result["n_draws"] == 10
+
+
 class TestRecovery(unittest.TestCase):
     def __init__(self, *args, **kwargs):
         super(TestRecovery, self).__init__(*args, **kwargs)
@@ -54,6 +54,46 @@ class NetworkInspectorTest(unittest.TestCase):
             print(torch_model.predict_on_batch(tmp_data).shape)
             pass
 
+    def test_fft_kde(self):
+        out = hddm.simulators.simulator(
+            theta=hddm.model_config.model_config["ddm"]["default_params"],
+            model="ddm",
+            n_samples=5000,
+        )
+        rts = np.concatenate([np.linspace(0.05, 5, 200)] * 2)
+        choices = np.repeat([-1, 1], 200)
+
+        exact = hddm.network_inspectors.logkde(out).kde_eval((rts, choices))
+        fft = hddm.network_inspectors.logkde(out, engine="fft").kde_eval((rts, choices))
+        np.testing.assert_allclose(fft, exact, atol=0.05)
+
+    def test_likelihood_surface(self):
+        theta = {"v": 0.5, "a": 1.0, "z": 0.5, "t": 0.3}
+        vary = {"v": np.linspace(-1, 1, 3), "a": np.linspace(0.8, 1.2, 3)}
+        rts = np.linspace(0.01, 20, 4000)
+
+        analytic = hddm.network_inspectors.likelihood_surface(
+            theta, vary, rts=rts, engine="analytic", logp=False
+        )
+        self.assertEqual(analytic.dims, ("v", "a", "choice", "rt"))
+        # densities integrate to one over choices and rts
+        mass = analytic.values.sum(axis=(2, 3)) * (rts[1] - rts[0])
+        np.testing.assert_allclose(mass, 1, atol=0.01)
+
+        # chunked LAN evaluation matches a single forward pass
+        lan = hddm.network_inspectors.likelihood_surface(
+            theta, vary, rts=rts[:100], chunk_size=77
+        )
+        point = lan.sel(v=1, a=0.8, choice=-1)
+        data = np.zeros((100, 6), dtype=np.float32)
+        data[:, :4] = [1, 0.8, 0.5, 0.3]
+        data[:, 4] = rts[:100]
+        data[:, 5] = -1
+        network = hddm.torch.mlp_inference_class.load_torch_mlp(model="ddm")
+        np.testing.assert_allclose(
+            point.values, np.ravel(network.predict_on_batch(data)), rtol=1e-5
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
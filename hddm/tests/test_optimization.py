@@ -241,3 +241,50 @@ def test_recovery_with_random_p_outlier():
 def test_recovery_with_fixed_p_outlier():
     """test for recovery with p_outliers as a fixed value"""
     recovery_with_outliers(repeats=5, seed=1, random_p_outlier=False)
+
+
+def test_bootstrap_process_pool():
+    """bootstrap iterations in the local process pool"""
+    from hddm.tests.benchmark_fit import CONFIGS, make_cohort
+
+    np.random.seed(1)
+    data = make_cohort(n_subjects=1, n_trials=96)
+    # with bias, z is the deterministic invlogit(z_trans)
+    h = hddm.HDDMrl(data, bias=True, is_group_model=False, **CONFIGS["one_stage"])
+    results = h.optimize(method="ML", n_runs=1, n_bootstraps=4, n_jobs=2)
+
+    stats = h.bootstrap_stats
+    assert set(stats.columns) == set(results.keys())
+    assert {"z", "z_trans"} <= set(stats.columns)
+    assert stats.loc["count"].eq(4).all()
+    assert h.values == results
+    for name in ["a", "t"]:
+        assert stats.loc["min", name] <= results[name] + 0.5
+        assert stats.loc["max", name] >= results[name] - 0.5
+
+
+def test_kfold_cache():
+    """k-fold cross-validation, read back from the cache on the second call"""
+    import tempfile
+    from unittest import mock
+    from hddm.tests.benchmark_fit import CONFIGS, make_cohort
+
+    np.random.seed(1)
+    data = make_cohort(n_subjects=2, n_trials=48)
+    kwargs = dict(model_kwargs=CONFIGS["one_stage"], n_folds=2, n_runs=1, seed=1)
+    with tempfile.TemporaryDirectory() as cache_dir:
+        res = hddm.cross_validation.kfold(
+            data, hddm.HDDMrl, n_jobs=2, cache_dir=cache_dir, **kwargs
+        )
+        assert list(res.index) == [(0, 0), (0, 1), (1, 0), (1, 1)]
+        assert np.all(np.isfinite(res.test_logp))
+        n_trials = data.groupby("subj_idx").size()
+        assert (res.n_train + res.n_test).groupby("subj_idx").max().eq(n_trials).all()
+
+        with mock.patch(
+            "hddm.cross_validation._fit_fold", side_effect=AssertionError("refit")
+        ):
+            cached = hddm.cross_validation.kfold(
+                data, hddm.HDDMrl, n_jobs=1, cache_dir=cache_dir, **kwargs
+            )
+        pd.testing.assert_frame_equal(cached, res)
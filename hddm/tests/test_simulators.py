@@ -88,6 +88,48 @@ class SimulatorTests(unittest.TestCase):
 
             # Potentially add some simulator behavior tests
 
+    def test_binned_simulator(self):
+        print("Testing histograms accumulated inside the simulators")
+        nbins = 32
+        for model in [
+            "ddm",
+            "angle",
+            "ddm_vanilla",
+            "full_ddm_vanilla",
+            "race_no_bias_3",
+        ]:
+            print("Now testing model: ", model)
+            theta = hddm.model_config.model_config[model]["default_params"]
+            n_choices = len(hddm.model_config.model_config[model]["choices"])
+
+            out = hddm.simulators.simulator(
+                theta=theta, model=model, n_samples=2000, bin_dim=nbins
+            )
+            self.assertEqual(out[0].shape, (nbins, n_choices))
+            self.assertAlmostEqual(out[0].sum(), 1.0, places=5)
+
+            out = hddm.simulators.simulator(
+                theta=np.tile(theta, reps=(self.n_trials, 1)),
+                model=model,
+                n_samples=2000,
+                bin_dim=nbins,
+            )
+            self.assertEqual(out[0].shape, (self.n_trials, nbins, n_choices))
+            np.testing.assert_allclose(out[0].sum(axis=(1, 2)), 1.0, rtol=1e-5)
+
+        print("Comparing against binning of the full simulator output")
+        np.random.seed(42)
+        theta = hddm.model_config.model_config["ddm"]["default_params"]
+        full = hddm.simulators.simulator(theta=theta, model="ddm", n_samples=20000)
+        binned = hddm.simulators.simulator(
+            theta=theta, model="ddm", n_samples=20000, bin_dim=nbins
+        )
+        reference = hddm.simulators.bin_simulator_output(full, nbins=nbins)
+        np.testing.assert_allclose(
+            binned[0].sum(axis=0), reference.sum(axis=0), atol=0.02
+        )
+        np.testing.assert_allclose(binned[0], reference, atol=0.02)
+
     def test_simulator_h_c_depends(self):
         # print(hddm.__path__ + '/examples/cavanagh_theta_nn.csv')
 
@@ -0,0 +1,175 @@
+"""
+.. module:: HDDM
+   :platform: Agnostic
+   :synopsis: Loose numerical tolerances during burn-in, tight ones after.
+
+The wfpt likelihood of HDDMBase and the RL-DDM likelihood of HDDMrl read
+model.wiener_params at every evaluation, so their tolerances can be changed
+while sampling. A
+ToleranceSchedule samples the start of the burn-in with cheap, loose
+tolerances (LOOSE_WIENER_PARAMS) and switches to the model's own tolerances
+
+* as soon as the log-likelihood of the loose chain stops improving, i.e. the
+  mean over the last window of iterations is within one standard deviation
+  of the window before, or
+* at the latest min_tight_burn * burn iterations before the end of the
+  burn-in,
+
+so that the chain re-equilibrates under the tight tolerances before any draw
+is kept. After sampling, check() compares the log-likelihood of the final
+state under both tolerances and runs a Geweke test (early vs. late retained
+draws) on every node; a warning is issued if the retained draws still drift.
+
+    >>> model.sample(5000, burn=3000, tolerance_schedule=True)
+    >>> model.tolerance_report["switch_iter"]
+"""
+
+import warnings
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+LOOSE_WIENER_PARAMS = {"err": 1e-3, "n_st": 1, "n_sz": 1, "simps_err": 1e-2}
+
+
+def _geweke(samples, first=0.1, last=0.5):
+    """Geweke z-score of the mean of the first and the last part of a
+    chain, with autocorrelation-corrected standard errors."""
+    from hddm.models.base import _effective_sample_size
+
+    n = len(samples)
+    a = samples[: max(int(first * n), 2)]
+    b = samples[n - max(int(last * n), 2) :]
+    var = np.var(a) / _effective_sample_size(a) + np.var(b) / _effective_sample_size(b)
+    if var <= 0:
+        return 0.0
+    return (np.mean(a) - np.mean(b)) / np.sqrt(var)
+
+
+class ToleranceSchedule(object):
+    """Switch the wiener_params of a model from loose to tight during the
+    burn-in of model.sample().
+
+    :Optional:
+        loose : dict <default=LOOSE_WIENER_PARAMS>
+            wiener_params used at the start of the burn-in; keys not given
+            keep the model's value.
+        min_tight_burn : float <default=0.25>
+            Fraction of the burn-in that is always sampled with the tight
+            tolerances.
+        window : int <default=None>
+            Number of iterations over which the log-likelihood is averaged to
+            detect the end of the loose phase; burn // 20 (at least 10) if
+            None.
+        z_threshold : float <default=3>
+            Geweke |z| above which check() warns about a node.
+    """
+
+    def __init__(self, loose=None, min_tight_burn=0.25, window=None, z_threshold=3):
+        self.loose = dict(LOOSE_WIENER_PARAMS if loose is None else loose)
+        self.min_tight_burn = min_tight_burn
+        self.window = window
+        self.z_threshold = z_threshold
+
+    def _set(self, model, params):
+        model.wiener_params.update(params)
+        # drop the log-likelihoods cached under the previous tolerances
+        for obs in self._observeds:
+            obs._logp.force_compute()
+
+    def _loglike(self):
+        return sum(obs.logp for obs in self._observeds)
+
+    def attach(self, model, burn):
+        """Install the schedule on model.mc for a run with the given burn-in;
+        called by HDDMBase.sample()."""
+        observeds = list(model.get_observeds()["node"])
+        # the stochastic classes record the wiener_params they read
+        wiener_params = getattr(model, "wiener_params", None)
+        if not all(
+            getattr(type(obs), "wiener_params", None) is wiener_params
+            for obs in observeds
+        ):
+            raise ValueError(
+                "Tolerance schedules need a likelihood reading model.wiener_params; "
+                "the likelihood of %s has fixed tolerances." % type(model).__name__
+            )
+        self._observeds = observeds
+        self._tight = {key: model.wiener_params[key] for key in self.loose}
+        self._trace = []
+        self.burn = burn
+        self.switch_iter = None
+        self.latest = int(burn * (1 - self.min_tight_burn))
+        window = self.window or max(10, burn // 20)
+        if self.latest <= 0:
+            self.switch_iter = 0
+            return
+
+        self._set(model, self.loose)
+        mc = model.mc
+        step_method = next(iter(mc.step_methods))
+        step = step_method.step
+
+        def scheduled():
+            if self.switch_iter is None:
+                i = mc._current_iter
+                self._trace.append(self._loglike())
+                converged = False
+                if i >= 2 * window and i % window == 0:
+                    current = self._trace[-window:]
+                    previous = self._trace[-2 * window : -window]
+                    converged = np.mean(current) - np.mean(previous) <= np.std(current)
+                if converged or i >= self.latest:
+                    self.switch_iter = i
+                    self._set(model, self._tight)
+            return step()
+
+        step_method.step = scheduled
+        self._step_method = step_method
+
+    def detach(self, model):
+        """Remove the schedule and restore the tight tolerances."""
+        step_method = getattr(self, "_step_method", None)
+        if step_method is not None and "step" in vars(step_method):
+            del step_method.step
+        if self.switch_iter is None:
+            self._set(model, self._tight)
+
+    def check(self, model):
+        """Compare loose and tight tolerances at the final state and test the
+        retained draws for drift.
+
+        :Returns:
+            OrderedDict with the switch iteration, the burn-in, the
+            log-likelihood difference (tight - loose) at the final state and
+            the Geweke z-scores of all nodes (pandas.Series). Warns if any
+            |z| exceeds z_threshold.
+        """
+        tight = self._loglike()
+        self._set(model, self.loose)
+        loose = self._loglike()
+        self._set(model, self._tight)
+
+        traces = model.get_traces()
+        z = pd.Series(
+            {name: _geweke(traces[name].values) for name in traces.columns},
+            dtype=float,
+        )
+        drifting = z[z.abs() > self.z_threshold]
+        if len(drifting):
+            warnings.warn(
+                "The retained draws of %s drift (Geweke |z| > %g) after the "
+                "tolerance switch at iteration %s; increase burn or "
+                "min_tight_burn."
+                % (", ".join(drifting.index), self.z_threshold, self.switch_iter)
+            )
+
+        return OrderedDict(
+            [
+                ("switch_iter", self.switch_iter),
+                ("burn", self.burn),
+                ("loglike_shift", tight - loose),
+                ("geweke_z", z),
+            ]
+        )
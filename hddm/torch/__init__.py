@@ -1 +1,20 @@
-from . import *
+import importlib
+
+# The submodules are imported on first access, e.g. hddm.torch.torch_config,
+# so that pytorch is only loaded when a network is.
+_lazy_submodules = [
+    "torch_config",
+    "mlp_inference_class",
+    "mlp_model_class",
+    "mlp_numpy_inference",
+]
+
+
+def __getattr__(name):
+    if name in _lazy_submodules:
+        return importlib.import_module("." + name, __name__)
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_lazy_submodules))
@@ -1,11 +1,21 @@
+import weakref
+
+import hddm
+from .torch_config import TorchConfig
+
 try:
+    import numpy as np
     import torch
-    from .torch_config import TorchConfig
     from .mlp_model_class import TorchMLP
-    import hddm
 
     class LoadTorchMLPInfer:
-        def __init__(self, model_file_path=None, network_config=None, input_dim=None):
+        def __init__(
+            self,
+            model_file_path=None,
+            network_config=None,
+            input_dim=None,
+            precision="float32",
+        ):
 
             torch.backends.cudnn.benchmark = True
             self.dev = (
@@ -16,6 +26,8 @@ try:
             self.model_file_path = model_file_path
             self.network_config = network_config
             self.input_dim = input_dim
+            self.precision = precision
+            self.dtype = torch.float32
 
             self.net = TorchMLP(
                 network_config=self.network_config,
@@ -30,22 +42,211 @@ try:
 
             self.net.eval()
 
+            if precision == "int8":
+                # dynamically quantized linear layers only run on the CPU
+                self.dev = torch.device("cpu")
+                self.net = torch.quantization.quantize_dynamic(
+                    self.net.to(self.dev), {torch.nn.Linear}, dtype=torch.qint8
+                )
+            elif precision == "bf16":
+                self.dtype = torch.bfloat16
+                self.net.to(self.dtype)
+            elif precision != "float32":
+                raise ValueError("Unknown LAN precision %s." % precision)
+
+        def input_buffer(self, shape):
+            """Allocate a float32 network input; page-locked on CUDA so that
+            predict_on_batch() can copy it to the device asynchronously."""
+            if self.dev.type == "cuda":
+                return torch.empty(shape, dtype=torch.float32).pin_memory().numpy()
+            return np.empty(shape, dtype=np.float32)
+
         @torch.no_grad()
         def predict_on_batch(self, x=None):
-            return self.net(torch.from_numpy(x).to(self.dev)).cpu().numpy()
+            x = torch.from_numpy(x).to(self.dev, self.dtype, non_blocking=True)
+            return self.net(x).float().cpu().numpy()
 
-    def load_torch_mlp(model=None):
-        cfg = TorchConfig(model=model)
-        infer_model = LoadTorchMLPInfer(
-            model_file_path=cfg.network_path,
-            network_config=cfg.network_config,
-            input_dim=len(hddm.model_config.model_config[model]["params"]) + 2,
-        )
-        return infer_model
+except:
+    print(
+        "HDDM: pytorch module seems missing. "
+        "Only the numpy LAN backend (load_torch_mlp(backend='numpy')) can be used."
+    )
 
 
-except:
-    print("HDDM: pytorch module seems missing. No LAN functionality can be loaded.")
+def _load_network(model, backend, precision):
+    if backend == "numpy":
+        from .mlp_numpy_inference import load_numpy_mlp
+
+        if precision != "float32":
+            raise ValueError("The numpy backend only supports float32 inference.")
+
+        return load_numpy_mlp(model=model)
+    if backend != "torch":
+        raise ValueError("Unknown LAN backend %s." % backend)
+
+    cfg = TorchConfig(model=model)
+    infer_model = LoadTorchMLPInfer(
+        model_file_path=cfg.network_path,
+        network_config=cfg.network_config,
+        input_dim=len(hddm.model_config.model_config[model]["params"]) + 2,
+        precision=precision,
+    )
+    return infer_model
+
+
+class NetworkCache(object):
+    """Process wide cache of loaded LANs, keyed by (model, backend, precision).
+
+    Models register as owners of the network they use; the owner count of
+    an entry drops again when an owner is garbage collected. Entries are
+    only removed by evict(), so that networks survive between models, e.g.
+    in a model comparison sweep.
+    """
+
+    def __init__(self):
+        self._networks = {}
+        self._owners = {}
+        self._loads = {}
+
+    def get(self, model, backend="torch", precision="float32", owner=None):
+        """Return the network of model, loading it on first use.
+
+        :Optional:
+            owner : object <default=None>
+                Object using the network, counted until it is garbage
+                collected.
+        """
+        key = (model, backend, precision)
+        if key not in self._networks:
+            self._networks[key] = _load_network(model, backend, precision)
+            self._owners[key] = 0
+            self._loads[key] = object()
+        if owner is not None:
+            self._owners[key] += 1
+            weakref.finalize(owner, self._release, key, self._loads[key])
+        return self._networks[key]
+
+    def _release(self, key, load):
+        # owners of an evicted network do not count for a reloaded one
+        if self._loads.get(key) is load:
+            self._owners[key] -= 1
+
+    def evict(self, model=None, force=False):
+        """Remove networks from the cache.
+
+        :Optional:
+            model : str <default=None>
+                Only evict the networks of this model.
+            force : bool <default=False>
+                Also evict networks that still have owners (the owners keep
+                using their copy).
+
+        :Returns:
+            list of the evicted (model, backend, precision) keys.
+        """
+        evicted = [
+            key
+            for key, owners in self._owners.items()
+            if (model is None or key[0] == model) and (force or owners <= 0)
+        ]
+        for key in evicted:
+            del self._networks[key]
+            del self._owners[key]
+            del self._loads[key]
+        return evicted
+
+    def info(self):
+        """Dictionary mapping the cached (model, backend, precision) keys to their
+        number of owners."""
+        return dict(self._owners)
+
+
+network_cache = NetworkCache()
+
+
+def load_torch_mlp(
+    model=None, backend="torch", precision="float32", owner=None, cache=True
+):
+    """Load the LAN of model.
+
+    :Optional:
+        backend : str <default='torch'>
+            'torch' evaluates the network with pytorch (on the GPU if
+            available); 'numpy' uses the torch-free float32 implementation of
+            hddm.torch.mlp_numpy_inference, which converts the weights on
+            first use.
+        precision : str <default='float32'>
+            'int8' evaluates the torch network with dynamically quantized
+            int8 linear layers (CPU only), 'bf16' with bfloat16 weights and
+            activations. See precision_report() for the resulting error.
+        owner : object <default=None>
+            Object (e.g. a model) registered as user of the cached network.
+        cache : bool <default=True>
+            Share the network through network_cache; False always loads a
+            new copy.
+    """
+    if not cache:
+        return _load_network(model, backend, precision)
+    return network_cache.get(
+        model, backend=backend, precision=precision, owner=owner
+    )
+
+
+def precision_report(
+    model, precision="int8", n_samples=100000, rt_max=5.0, seed=None
+):
+    """Compare the log-likelihoods of a reduced precision LAN with the
+    float32 network.
+
+    Parameters are drawn uniformly from the param_bounds of the model config,
+    reaction times uniformly from (0, rt_max) and choices uniformly from the
+    model's choices. Both networks are clipped at ll_min, as in the
+    likelihoods.
+
+    :Arguments:
+        model : str
+            Model name, e.g. 'ddm' or 'angle'.
+
+    :Optional:
+        precision : str <default='int8'>
+            Precision to evaluate, 'int8' or 'bf16'.
+        n_samples : int <default=100000>
+            Number of random network inputs.
+        rt_max : float <default=5.0>
+            Largest reaction time drawn.
+        seed : int <default=None>
+            Seed of the random inputs.
+
+    :Returns:
+        dict with the max, mean and 99% quantile of the absolute log-likelihood
+        error, the same statistics restricted to inputs whose float32
+        log-likelihood lies above ll_min, and the summed log-likelihood
+        difference per 1000 trials.
+    """
+    config = hddm.model_config.model_config[model]
+    ll_min = hddm.utils.LANBatch.ll_min
+    rng = np.random.RandomState(seed)
+    lower, upper = np.array(config["param_bounds"], dtype=np.float64)
+    x = np.empty((n_samples, len(lower) + 2), dtype=np.float32)
+    x[:, :-2] = rng.uniform(lower, upper, size=(n_samples, len(lower)))
+    x[:, -2] = rng.uniform(0, rt_max, size=n_samples)
+    x[:, -1] = rng.choice(config["choices"], size=n_samples)
+
+    reference = load_torch_mlp(model=model).predict_on_batch(x)
+    reduced = load_torch_mlp(model=model, precision=precision).predict_on_batch(x)
+    reference = np.maximum(np.ravel(reference), ll_min)
+    diff = np.maximum(np.ravel(reduced), ll_min) - reference
+    error = np.abs(diff)
+    inside = reference > ll_min
+
+    return {
+        "max_abs_err": float(error.max()),
+        "mean_abs_err": float(error.mean()),
+        "q99_abs_err": float(np.quantile(error, 0.99)),
+        "max_abs_err_above_ll_min": float(error[inside].max()),
+        "mean_abs_err_above_ll_min": float(error[inside].mean()),
+        "sum_err_per_1000_trials": float(1000 * diff.mean()),
+    }
 
 # class LoadTorchMLPInfer:
 #     def __init__(self,
@@ -0,0 +1,147 @@
+"""
+Torch-free inference for the bundled LAN MLPs.
+
+The weights of a TorchMLP are converted once (this step needs pytorch) into
+a .npz file holding float32 weight matrices, biases and the activation of
+every layer. LoadNumpyMLPInfer evaluates the network from that file with
+plain numpy, i.e. one float32 BLAS matrix product per layer followed by an
+in place bias and activation, writing into scratch arrays that are reused
+across calls.
+
+    >>> convert_torch_mlp('ddm')  # once, where pytorch is available
+    >>> network = load_torch_mlp('ddm', backend='numpy')
+"""
+
+import os
+
+import numpy as np
+
+from .torch_config import TorchConfig
+
+ACTIVATIONS = ("tanh", "relu", "linear")
+
+
+def _cache_dir():
+    return os.environ.get(
+        "HDDM_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "hddm")
+    )
+
+
+def numpy_weights_files(model):
+    """Candidate paths of the .npz weights of model: next to the torch files
+    and in the user cache directory ($HDDM_CACHE or ~/.cache/hddm)."""
+    cfg = TorchConfig(model=model)
+    name = os.path.basename(cfg.network_path).replace(
+        "_torch_state_dict.pt", "_numpy_weights.npz"
+    )
+    return [
+        os.path.join(os.path.dirname(cfg.network_path), name),
+        os.path.join(_cache_dir(), name),
+    ]
+
+
+def convert_torch_mlp(model, fname=None):
+    """Convert the bundled torch weights of model into the .npz format.
+
+    :Arguments:
+        model : str
+            Model name, e.g. 'ddm' or 'angle'.
+
+    :Optional:
+        fname : str <default=None>
+            Output file. Defaults to the first writable path of
+            numpy_weights_files(model).
+
+    :Returns:
+        str: path of the written file.
+    """
+    import torch
+
+    cfg = TorchConfig(model=model)
+    state_dict = torch.load(cfg.network_path, map_location=torch.device("cpu"))
+    layers = sorted(
+        int(key.split(".")[1]) for key in state_dict if key.endswith(".weight")
+    )
+    activations = list(cfg.network_config["activations"][: len(layers) - 1])
+    activations.append("linear")
+    for activation in activations:
+        if activation not in ACTIVATIONS:
+            raise ValueError("Activation %s is not supported." % activation)
+
+    arrays = {"activations": np.array(activations)}
+    for i, layer in enumerate(layers):
+        weight = state_dict["layers.%d.weight" % layer].numpy()
+        bias = state_dict["layers.%d.bias" % layer].numpy()
+        # stored as (in, out) so that the forward pass is x @ weight
+        arrays["weight_%d" % i] = np.ascontiguousarray(weight.T, dtype=np.float32)
+        arrays["bias_%d" % i] = bias.astype(np.float32)
+
+    candidates = [fname] if fname is not None else numpy_weights_files(model)
+    for candidate in candidates:
+        try:
+            os.makedirs(os.path.dirname(candidate) or ".", exist_ok=True)
+            np.savez(candidate, **arrays)
+            return candidate
+        except OSError:
+            if candidate is candidates[-1]:
+                raise
+
+
+class LoadNumpyMLPInfer(object):
+    """Forward pass of a converted LAN MLP in numpy.
+
+    :Arguments:
+        weights_path : str
+            .npz file written by convert_torch_mlp().
+    """
+
+    def __init__(self, weights_path=None):
+        self.weights_path = weights_path
+        with np.load(weights_path, allow_pickle=False) as f:
+            self.activations = [str(a) for a in f["activations"]]
+            n_layers = len(self.activations)
+            self.weights = [f["weight_%d" % i] for i in range(n_layers)]
+            self.biases = [f["bias_%d" % i] for i in range(n_layers)]
+        self.input_dim = self.weights[0].shape[0]
+        self._scratch = [
+            np.empty((0, w.shape[1]), dtype=np.float32) for w in self.weights
+        ]
+
+    def __getstate__(self):
+        d = self.__dict__.copy()
+        d["_scratch"] = [s[:0] for s in self._scratch]
+        return d
+
+    def input_buffer(self, shape):
+        return np.empty(shape, dtype=np.float32)
+
+    def predict_on_batch(self, x=None):
+        x = np.ascontiguousarray(x, dtype=np.float32)
+        n = x.shape[0]
+        if self._scratch[0].shape[0] < n:
+            self._scratch = [
+                np.empty((n, w.shape[1]), dtype=np.float32) for w in self.weights
+            ]
+
+        for weight, bias, activation, scratch in zip(
+            self.weights, self.biases, self.activations, self._scratch
+        ):
+            out = scratch[:n]
+            np.dot(x, weight, out=out)
+            out += bias
+            if activation == "tanh":
+                np.tanh(out, out=out)
+            elif activation == "relu":
+                np.maximum(out, 0, out=out)
+            x = out
+
+        return x.copy()
+
+
+def load_numpy_mlp(model=None):
+    """Load the numpy backend of model, converting the torch weights on
+    first use."""
+    for fname in numpy_weights_files(model):
+        if os.path.exists(fname):
+            return LoadNumpyMLPInfer(weights_path=fname)
+    return LoadNumpyMLPInfer(weights_path=convert_torch_mlp(model))
@@ -5,6 +5,7 @@ import hddm
 import kabuki
 import pandas as pd
 import string
+import weakref
 from kabuki.analyze import post_pred_gen, post_pred_compare_stats
 import tqdm
 
@@ -32,6 +33,7 @@ def make_likelihood_str_mlp(config=None, fun_name="custom_likelihood"):
 
     """
     params_str = ", ".join(config["params"])
+    n_params_str = str(len(config["params"]))
 
     fun_str = (
         "def "
@@ -39,15 +41,297 @@ def make_likelihood_str_mlp(config=None, fun_name="custom_likelihood"):
         + "(x, "
         + params_str
         + ", p_outlier=0.0, w_outlier=0.1, network = None):\n    "
-        + 'return hddm.wfpt.wiener_like_nn_mlp(x["rt"].values, x["response"].values, '
-        + "np.array(["
+        + "params = np.array(["
         + params_str
-        + "], dtype = np.float32), "
-        + "p_outlier=p_outlier, w_outlier=w_outlier, network=network)"
+        + "], dtype = np.float32)\n    "
+        + "batch = hddm.utils.lan_batch_of(x)\n    "
+        + "if batch is not None:\n        "
+        + "return batch.logp(x, params, p_outlier, w_outlier)\n    "
+        + "data = hddm.utils.lan_input_buffer(x, "
+        + n_params_str
+        + ", network)\n    "
+        + "return hddm.wfpt.wiener_like_nn_mlp(data[:, "
+        + n_params_str
+        + "], data[:, "
+        + n_params_str
+        + " + 1], params, "
+        + "p_outlier=p_outlier, w_outlier=w_outlier, network=network, data=data)"
     )
     return fun_str
 
 
+# network input arrays of the observed LAN nodes, keyed by id() of the data
+# and released together with it
+_lan_inputs = {}
+
+
+def lan_input_buffer(x, n_params, network=None, abs_rt=False):
+    """Return the persistent network input array of the observed data x.
+
+    The array has shape (len(x), n_params + 2). Its last two columns hold
+    rt and response; they are compared with x on every call and only
+    rewritten if x was modified or abs_rt differs from the previous call.
+    The likelihood overwrites the parameter columns in place on every call.
+    The array is released together with x.
+
+    :Arguments:
+        x : pandas.DataFrame
+            Observed data of a node with rt and response columns.
+        n_params : int
+            Number of model parameters.
+
+    :Optional:
+        network : object <default=None>
+            The LAN; if it provides input_buffer(shape) (e.g. page-locked
+            memory for GPU transfers), that is used to allocate the array.
+        abs_rt : bool <default=False>
+            Store absolute reaction times (as the regression likelihoods do).
+    """
+    data = _lan_inputs.get(id(x))
+    if data is not None and data.shape == (len(x), n_params + 2):
+        _fill_lan_input(x, data, n_params, abs_rt)
+        return data
+
+    data = _alloc_lan_input((len(x), n_params + 2), network)
+    _register_lan_input(x, data, n_params, abs_rt)
+    return data
+
+
+def _alloc_lan_input(shape, network):
+    if hasattr(network, "input_buffer"):
+        return network.input_buffer(shape)
+    return np.empty(shape, dtype=np.float32)
+
+
+def _fill_lan_input(x, data, n_params, abs_rt=False):
+    """Write rt and response of x into the data columns of the network input
+    unless they hold them already.
+
+    :Returns:
+        True if the columns were rewritten.
+    """
+    rt = np.absolute(x["rt"].values) if abs_rt else x["rt"].values
+    columns = np.column_stack([rt, x["response"].values]).astype(data.dtype)
+    if np.array_equal(data[:, n_params:], columns):
+        return False
+    data[:, n_params:] = columns
+    return True
+
+
+def _register_lan_input(x, data, n_params, abs_rt=False):
+    """Fill the data columns of the network input of x and keep it until x
+    is released."""
+    _fill_lan_input(x, data, n_params, abs_rt)
+    if id(x) not in _lan_inputs:
+        weakref.finalize(x, _lan_inputs.pop, id(x), None)
+    _lan_inputs[id(x)] = data
+
+
+# row positions of the observed data of regression LAN nodes in the regressor
+# outputs, keyed by id() of the data and the parameter name
+_lan_reg_rows = {}
+
+
+def lan_reg_rows(x, name, outcome):
+    """Return the positions of the rows of the observed data x in the output
+    of the regression of parameter name.
+
+    The positions are looked up by label once, so that the likelihood can
+    gather the parameter values with np.take instead of aligning the
+    outcome by index on every call. They are recomputed if the index of x
+    or of the outcome differs from the one they were computed for and
+    released together with x.
+
+    :Arguments:
+        x : pandas.DataFrame
+            Observed data of a regression LAN node.
+        name : str
+            Name of the regressed parameter.
+        outcome : pandas.Series
+            Output of the regression, indexed like the model data.
+    """
+    key = (id(x), name)
+    cached = _lan_reg_rows.get(key)
+    if cached is not None:
+        x_index, outcome_index, rows = cached
+        # the regressions return the index of the model data itself
+        if (x_index is x.index or x_index.equals(x.index)) and (
+            outcome_index is outcome.index or outcome_index.equals(outcome.index)
+        ):
+            return rows
+
+    rows = outcome.index.get_indexer(x.index)
+    if np.any(rows < 0):
+        raise KeyError("Rows of the data are missing in the regression of %s." % name)
+    if key not in _lan_reg_rows:
+        weakref.finalize(x, _lan_reg_rows.pop, key, None)
+    _lan_reg_rows[key] = (x.index, outcome.index, rows)
+    return rows
+
+
+# batches of observed LAN nodes (weak references), keyed by id() of the data
+_lan_batches = {}
+
+
+def lan_batch_of(x):
+    """Return the LANBatch evaluating the observed data x, or None."""
+    batch = _lan_batches.get(id(x))
+    return None if batch is None else batch()
+
+
+class LANBatch(object):
+    """Evaluate the LAN likelihood of many observed nodes in one forward pass.
+
+    All nodes share one network input array, the rows of each node being a
+    view of it (see lan_input_buffer()). When the likelihood of one node is
+    requested with new parameters, the parameters of the nodes sharing a
+    changed parent node with it are read from their parents, the rows of
+    every one of them whose parameters changed go through the network
+    together and the summed log-likelihoods are stored per node. The
+    remaining nodes of e.g. a step of a group-only node then only look up
+    their result, while a step of a subject node costs a single node. The
+    first evaluation of a node checks all nodes, so that the initial
+    evaluation of the model is a single forward pass.
+
+    :Arguments:
+        nodes : list
+            Observed LAN nodes.
+        params : list
+            Names of the network parameters, in network input order.
+        network : object
+            The LAN, providing predict_on_batch().
+    """
+
+    ll_min = -16.11809
+
+    def __init__(self, nodes, params, network):
+        self.nodes = list(nodes)
+        self.param_names = list(params)
+        self.network = network
+
+        n_params = len(self.param_names)
+        sizes = np.array([len(node.value) for node in self.nodes])
+        self.bounds = np.concatenate([[0], np.cumsum(sizes)])
+        self.data = _alloc_lan_input((self.bounds[-1], n_params + 2), network)
+        self.params = np.full((len(self.nodes), n_params), np.nan, dtype=np.float32)
+        self.outlier = np.zeros((len(self.nodes), 2))
+        self.logps = np.zeros(len(self.nodes))
+        self.index = {}
+
+        # parent nodes of every node and the nodes depending on each of them
+        self.parent_nodes = []
+        self.dependents = {}
+        for k, node in enumerate(self.nodes):
+            parents = {}
+            for name in self.param_names + ["p_outlier", "w_outlier"]:
+                parent = node.parents.get(name)
+                if isinstance(parent, pm.Node):
+                    parents[name] = parent
+                    self.dependents.setdefault(id(parent), set()).add(k)
+            self.parent_nodes.append(parents)
+
+        ref = weakref.ref(self)
+        for k, node in enumerate(self.nodes):
+            x = node.value
+            rows = self.data[self.bounds[k] : self.bounds[k + 1]]
+            _register_lan_input(x, rows, n_params)
+            if id(x) not in _lan_batches:
+                weakref.finalize(x, _lan_batches.pop, id(x), None)
+            _lan_batches[id(x)] = ref
+            self.index[id(x)] = k
+
+    def _is_current(self, k, params, p_outlier, w_outlier):
+        # w_outlier only matters with outliers
+        w_outlier = w_outlier if p_outlier else 0
+        return (
+            np.array_equal(self.params[k], params)
+            and self.outlier[k, 0] == p_outlier
+            and self.outlier[k, 1] == w_outlier
+        )
+
+    def logp(self, x, params, p_outlier=0, w_outlier=0):
+        """Summed log-likelihood of the node with data x."""
+        k = self.index[id(x)]
+        rows = self.data[self.bounds[k] : self.bounds[k + 1]]
+        if _fill_lan_input(x, rows, len(self.param_names)):
+            # x was modified since its rows were evaluated
+            self.params[k] = np.nan
+        if not self._is_current(k, params, p_outlier, w_outlier):
+            if np.isnan(self.params[k]).any():
+                # not evaluated yet (or modified), e.g. on the first call:
+                # all nodes go through the network together
+                nodes = None
+            else:
+                changed = [
+                    name
+                    for name, old, new in zip(self.param_names, self.params[k], params)
+                    if old != new
+                ]
+                if self.outlier[k, 0] != p_outlier:
+                    changed.append("p_outlier")
+                if self.outlier[k, 1] != (w_outlier if p_outlier else 0):
+                    changed.append("w_outlier")
+                nodes = {k}
+                for name in changed:
+                    parent = self.parent_nodes[k].get(name)
+                    if parent is not None:
+                        nodes.update(self.dependents[id(parent)])
+                nodes = sorted(nodes)
+            self.update({k: (params, p_outlier, w_outlier)}, nodes)
+        return self.logps[k]
+
+    def update(self, override=None, nodes=None):
+        """Re-evaluate the nodes whose parameters changed in one forward pass.
+
+        :Optional:
+            override : dict
+                Maps node positions to (params, p_outlier, w_outlier) to use
+                instead of the values of their parents.
+            nodes : list
+                Positions of the nodes to check, all nodes by default.
+        """
+        override = override or {}
+        if nodes is None:
+            nodes = range(len(self.nodes))
+        n_params = len(self.param_names)
+        stale = []
+        for k in nodes:
+            node = self.nodes[k]
+            if k in override:
+                params, p_outlier, w_outlier = override[k]
+            else:
+                values = node.parents.value
+                params = np.array(
+                    [values[name] for name in self.param_names], dtype=np.float32
+                )
+                p_outlier = values.get("p_outlier", 0)
+                w_outlier = values.get("w_outlier", 0)
+            if self._is_current(k, params, p_outlier, w_outlier):
+                continue
+            self.params[k] = params
+            self.outlier[k] = p_outlier, w_outlier if p_outlier else 0
+            self.data[self.bounds[k] : self.bounds[k + 1], :n_params] = params
+            stale.append(k)
+
+        if not stale:
+            return
+        sizes = np.diff(self.bounds)[stale]
+        if len(stale) == len(self.nodes):
+            data = self.data
+        else:
+            data = np.concatenate(
+                [self.data[self.bounds[k] : self.bounds[k + 1]] for k in stale]
+            )
+
+        ll = np.maximum(np.ravel(self.network.predict_on_batch(data)), self.ll_min)
+        p_outlier = np.repeat(self.outlier[stale, 0], sizes)
+        if np.any(p_outlier != 0):
+            w_outlier = np.repeat(self.outlier[stale, 1], sizes)
+            ll = np.log(np.exp(ll) * (1.0 - p_outlier) + w_outlier * p_outlier)
+        starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+        self.logps[stale] = np.add.reduceat(ll, starts)
+
+
 def make_reg_likelihood_str_mlp(config=None, fun_name="custom_likelihood_reg"):
     """Define string for a likelihood function that can be used as a
     mlp-likelihood in the HDDMnnRegressor class. Useful if you want to supply a custom LAN.
@@ -68,7 +352,6 @@ def make_reg_likelihood_str_mlp(config=None, fun_name="custom_likelihood_reg"):
     upper_bounds_str = str(config["param_bounds"][1])
     lower_bounds_str = str(config["param_bounds"][0])
     n_params_str = str(config["n_params"])
-    data_frame_width_str = str(config["n_params"] + 2)
     params_str = str(config["params"])
 
     fun_str = (
@@ -78,29 +361,27 @@ def make_reg_likelihood_str_mlp(config=None, fun_name="custom_likelihood_reg"):
         + params_fun_def_str
         + ", reg_outcomes, p_outlier=0, w_outlier=0.1, **kwargs):"
         + "\n    params = locals()"
-        + "\n    size = int(value.shape[0])"
-        + "\n    data = np.zeros(((size, "
-        + data_frame_width_str
-        + ")), dtype=np.float32)"
-        + "\n    data[:, "
+        + "\n    data = hddm.utils.lan_input_buffer(value, "
         + n_params_str
-        + ':] = np.stack([np.absolute(value["rt"]).astype(np.float32), value["response"].astype(np.float32)], axis=1)'
-        + "\n    cnt=0"
-        + "\n    for tmp_str in "
+        + ', kwargs["network"], abs_rt=True)'
+        + "\n    reg_cols = []"
+        + "\n    for cnt, tmp_str in enumerate("
         + params_str
-        + ":"
+        + "):"
         + "\n        if tmp_str in reg_outcomes:"
-        + '\n            data[:, cnt] = params[tmp_str].loc[value["rt"].index].values'
-        + "\n            if (data[:, cnt].min() < "
-        + lower_bounds_str
-        + "[cnt]) or (data[:, cnt].max() > "
-        + upper_bounds_str
-        + "[cnt]):"
-        + '\n                print("boundary violation of regressor part")'
-        + "\n                return -np.inf"
+        + "\n            rows = hddm.utils.lan_reg_rows(value, tmp_str, params[tmp_str])"
+        + "\n            np.take(params[tmp_str].values, rows, out=data[:, cnt])"
+        + "\n            reg_cols.append(cnt)"
         + "\n        else:"
         + "\n            data[:, cnt] = params[tmp_str]"
-        + "\n        cnt += 1"
+        + "\n    if reg_cols:"
+        + "\n        reg_data = data[:, reg_cols]"
+        + "\n        if np.any(reg_data.min(axis=0) < np.take("
+        + lower_bounds_str
+        + ", reg_cols)) or np.any(reg_data.max(axis=0) > np.take("
+        + upper_bounds_str
+        + ", reg_cols)):"
+        + "\n            return -np.inf"
         + '\n    return hddm.wfpt.wiener_like_multi_nn_mlp(data, p_outlier=p_outlier, w_outlier=w_outlier, network=kwargs["network"])'
     )
     return fun_str
@@ -1032,6 +1313,294 @@ def post_pred_gen_fast(
     return pd.concat(results, names=["node"])
 
 
+# per process state of the pointwise log-likelihood workers
+_loglik_state = {}
+
+
+def _init_loglik_worker(payload):
+    """Initializer of the waic_loo() workers: keep the likelihoods and the
+    observed data of all nodes for every chunk of draws."""
+    import cloudpickle
+
+    _loglik_state.clear()
+    _loglik_state["nodes"] = cloudpickle.loads(payload)
+    _loglik_state["n_trials"] = sum(len(x) for _, x in _loglik_state["nodes"])
+
+
+def _loglik_chunk(params, n_tail):
+    """Reduce the (draws, trials) log-likelihood matrix of one chunk of draws
+    to the streaming statistics merged by _merge_loglik()."""
+    from scipy.special import logsumexp
+
+    nodes = _loglik_state["nodes"]
+    logp = np.zeros((len(params), _loglik_state["n_trials"]))
+    for draw, node_params in enumerate(params):
+        start = 0
+        for (like, x), kwargs in zip(nodes, node_params):
+            like(x, trial_logp=logp[draw, start : start + len(x)], **kwargs)
+            start += len(x)
+
+    lw = -logp
+    if len(lw) > n_tail:
+        lw = np.partition(lw, len(lw) - n_tail, axis=0)[-n_tail:]
+    mean = logp.mean(axis=0)
+    return {
+        "n": len(logp),
+        "mean": mean,
+        "m2": ((logp - mean) ** 2).sum(axis=0),
+        "lse_logp": logsumexp(logp, axis=0),
+        "lse_lw": logsumexp(-logp, axis=0),
+        "tail": lw,
+        "scored": np.any(logp != 0, axis=0),
+    }
+
+
+def _merge_loglik(acc, chunk, n_tail):
+    """Combine the statistics of two sets of draws (Chan et al. for the
+    variance, running logsumexp, largest n_tail importance ratios)."""
+    if acc is None:
+        return chunk
+    n = acc["n"] + chunk["n"]
+    delta = chunk["mean"] - acc["mean"]
+    tail = np.concatenate([acc["tail"], chunk["tail"]])
+    if len(tail) > n_tail:
+        tail = np.partition(tail, len(tail) - n_tail, axis=0)[-n_tail:]
+    return {
+        "n": n,
+        "mean": acc["mean"] + delta * chunk["n"] / n,
+        "m2": acc["m2"] + chunk["m2"] + delta ** 2 * acc["n"] * chunk["n"] / n,
+        "lse_logp": np.logaddexp(acc["lse_logp"], chunk["lse_logp"]),
+        "lse_lw": np.logaddexp(acc["lse_lw"], chunk["lse_lw"]),
+        "tail": tail,
+        "scored": acc["scored"] | chunk["scored"],
+    }
+
+
+def _gpdfit(ary):
+    """Estimate the shape k and scale sigma of a generalized Pareto
+    distribution from sorted exceedances (Zhang & Stephens, 2009, with the
+    weakly informative prior on k of Vehtari et al., 2017)."""
+    prior_bs = 3
+    prior_k = 10
+    n = len(ary)
+    m_est = 30 + int(n ** 0.5)
+
+    b_ary = 1 - np.sqrt(m_est / (np.arange(1, m_est + 1) - 0.5))
+    b_ary /= prior_bs * ary[int(n / 4 + 0.5) - 1]
+    b_ary += 1 / ary[-1]
+
+    k_ary = np.log1p(-b_ary[:, None] * ary).mean(axis=1)
+    len_scale = n * (np.log(-(b_ary / k_ary)) - k_ary - 1)
+    weights = 1 / np.exp(len_scale - len_scale[:, None]).sum(axis=1)
+
+    # remove negligible weights
+    real_idxs = weights >= 10 * np.finfo(float).eps
+    if not np.all(real_idxs):
+        weights = weights[real_idxs]
+        b_ary = b_ary[real_idxs]
+    weights /= weights.sum()
+
+    b_post = np.sum(b_ary * weights)
+    k_post = np.log1p(-b_post * ary).mean()
+    sigma = -k_post / b_post
+    k_post = (n * k_post + prior_k * 0.5) / (n + prior_k)
+
+    return k_post, sigma
+
+
+def _gpinv(probs, kappa, sigma):
+    """Inverse CDF of the generalized Pareto distribution."""
+    if np.abs(kappa) < np.finfo(float).eps:
+        return -sigma * np.log1p(-probs)
+    return sigma * np.expm1(-kappa * np.log1p(-probs)) / kappa
+
+
+def _psis_loo(lse_lw, tail, n_draws):
+    """Pareto smoothed importance sampling LOO of a single trial.
+
+    :Arguments:
+        lse_lw : float
+            logsumexp of the raw log importance ratios -log p(y_i|theta_s).
+        tail : array
+            The len(tail) - 1 largest log ratios plus the cutoff, i.e. the
+            len(tail)-th largest one.
+        n_draws : int
+            Number of posterior draws.
+
+    :Returns:
+        elpd_loo_i, pareto_k
+    """
+    from scipy.special import logsumexp
+
+    tail = np.sort(tail)
+    cutoff, tail = tail[0], tail[1:]
+    n_tail = len(tail)
+    shift = tail[-1]
+
+    smoothed = tail - shift
+    k = np.inf
+    exceed = np.exp(tail - shift) - np.exp(cutoff - shift)
+    if n_tail > 4 and exceed[-1] > 0:
+        k, sigma = _gpdfit(exceed)
+        if np.isfinite(k):
+            probs = (np.arange(n_tail) + 0.5) / n_tail
+            smoothed = np.log(_gpinv(probs, k, sigma) + np.exp(cutoff - shift))
+            smoothed = np.minimum(smoothed, 0)
+
+    # the body keeps its raw weights exp(lw_s), so w_s * p_s = 1 there
+    body = np.exp(lse_lw - shift) - np.exp(tail - shift).sum()
+    log_body = np.log(max(body, np.finfo(float).tiny))
+    log_num = np.logaddexp(
+        np.log(n_draws - n_tail) - shift if n_draws > n_tail else -np.inf,
+        logsumexp(smoothed - tail),
+    )
+    log_den = np.logaddexp(log_body, logsumexp(smoothed))
+
+    return log_num - log_den, k
+
+
+def waic_loo(model, chunk_size=100, n_jobs=None, thin=1):
+    """WAIC and PSIS-LOO of a sampled model with per-trial likelihoods
+    (e.g. HDDMrl, Hrl).
+
+    The posterior draws are processed in chunks, in parallel processes, and
+    each chunk is immediately reduced to running statistics per trial, so
+    the full draws x trials log-likelihood matrix is never held in memory.
+
+    :Arguments:
+        model : kabuki.Hierarchical
+            Sampled model whose observed nodes have a wfpt_like accepting a
+            trial_logp buffer.
+
+    :Optional:
+        chunk_size : int <default=100>
+            Number of posterior draws evaluated per task.
+        n_jobs : int <default=None>
+            Number of worker processes; None uses all CPUs, 1 runs in this
+            process.
+        thin : int <default=1>
+            Use every thin-th posterior draw.
+
+    :Returns:
+        stats : dict
+            elpd_waic, p_waic, waic, elpd_loo, p_loo, looic, the standard
+            errors se_elpd_waic and se_elpd_loo and n_bad_k, the number of
+            trials with a Pareto k above 0.7.
+        pointwise : pandas.DataFrame
+            lppd, p_waic, elpd_waic, elpd_loo and pareto_k of every trial,
+            indexed by (node, trial) with trial the data index.
+
+    :Note:
+        Trials which the likelihood does not score (zero log-likelihood in
+        every draw) are left out.
+
+    :References:
+        Vehtari, A., Gelman, A., & Gabry, J. (2017). Practical Bayesian model
+        evaluation using leave-one-out cross-validation and WAIC.
+    """
+    import inspect
+    import os
+    import cloudpickle
+    from concurrent.futures import ProcessPoolExecutor
+
+    if not model.sampled:
+        raise ValueError("waic_loo() requires a sampled model.")
+
+    obs_nodes = list(model.get_observeds()["node"])
+    nodes = []
+    for obs in obs_nodes:
+        like = getattr(type(obs), "wfpt_like", None)
+        if like is None or "trial_logp" not in inspect.signature(like).parameters:
+            raise TypeError(
+                "%s does not provide per-trial log-likelihoods." % obs.__name__
+            )
+        nodes.append((like, obs.value))
+
+    stochastics = list(model.mc.stochastics)
+    traces = [node.trace()[::thin] for node in stochastics]
+    n_draws = len(traces[0])
+    n_tail = int(np.ceil(min(0.2 * n_draws, 3 * np.sqrt(n_draws)))) + 1
+
+    def chunk_params():
+        # pymc recomputes the deterministic parents from the stochastics
+        for start in range(0, n_draws, chunk_size):
+            params = []
+            for draw in range(start, min(start + chunk_size, n_draws)):
+                for node, trace in zip(stochastics, traces):
+                    node.value = trace[draw]
+                node_params = []
+                for obs in obs_nodes:
+                    kwargs = dict(obs.parents.value)
+                    kwargs.pop("trial_logp", None)
+                    node_params.append(kwargs)
+                params.append(node_params)
+            yield params
+
+    values = [node.value for node in stochastics]
+    payload = cloudpickle.dumps(nodes)
+    acc = None
+    try:
+        if n_jobs == 1:
+            _init_loglik_worker(payload)
+            for params in chunk_params():
+                acc = _merge_loglik(acc, _loglik_chunk(params, n_tail), n_tail)
+        else:
+            n_jobs = n_jobs or os.cpu_count()
+            with ProcessPoolExecutor(
+                max_workers=n_jobs,
+                initializer=_init_loglik_worker,
+                initargs=(payload,),
+            ) as pool:
+                # keep at most two chunks per worker in flight
+                futures = []
+                for params in chunk_params():
+                    futures.append(pool.submit(_loglik_chunk, params, n_tail))
+                    if len(futures) >= 2 * n_jobs:
+                        acc = _merge_loglik(acc, futures.pop(0).result(), n_tail)
+                for future in futures:
+                    acc = _merge_loglik(acc, future.result(), n_tail)
+    finally:
+        for node, value in zip(stochastics, values):
+            node.value = value
+
+    lppd = acc["lse_logp"] - np.log(n_draws)
+    p_waic = acc["m2"] / max(n_draws - 1, 1)
+    loo = np.array(
+        [
+            _psis_loo(acc["lse_lw"][i], acc["tail"][:, i], n_draws)
+            for i in range(len(lppd))
+        ]
+    ).reshape(-1, 2)
+
+    index = pd.MultiIndex.from_tuples(
+        [(obs.__name__, trial) for obs in obs_nodes for trial in obs.value.index],
+        names=["node", "trial"],
+    )
+    pointwise = pd.DataFrame(
+        {
+            "lppd": lppd,
+            "p_waic": p_waic,
+            "elpd_waic": lppd - p_waic,
+            "elpd_loo": loo[:, 0],
+            "pareto_k": loo[:, 1],
+        },
+        index=index,
+    )[acc["scored"]]
+
+    n = len(pointwise)
+    stats = {}
+    for name in ["elpd_waic", "elpd_loo"]:
+        stats[name] = pointwise[name].sum()
+        stats["se_" + name] = np.sqrt(n * pointwise[name].var())
+    stats["p_waic"] = pointwise["p_waic"].sum()
+    stats["p_loo"] = pointwise["lppd"].sum() - stats["elpd_loo"]
+    stats["waic"] = -2 * stats["elpd_waic"]
+    stats["looic"] = -2 * stats["elpd_loo"]
+    stats["n_bad_k"] = int((pointwise["pareto_k"] > 0.7).sum())
+
+    return stats, pointwise
+
+
 if __name__ == "__main__":
     import doctest
 
@@ -82,7 +82,7 @@ class DDM(HasTraits):
 
     @cached_property
     def _get_drifts(self):
-        return hddm.generate._gen_rts_from_simulated_drift(self.params_dict, samples=self.iter_plot, dt=self.dt, intra_sv=self.intra_sv)[1]
+        return hddm.generate._gen_rts_from_simulated_drift(self.params_dict, samples=self.iter_plot, dt=self.dt, intra_sv=self.intra_sv, return_paths=True)[1]
 
     @cached_property
     def _get_rts(self):
@@ -1,15 +1,20 @@
+import os
+
 from setuptools import setup
 from setuptools import Extension
 
+# HDDM_WFPT_STATS=1 compiles the hot-path counters of wfpt, see wfpt.get_stats()
+wfpt_macros = [('HDDM_WFPT_STATS', '1')] if os.environ.get('HDDM_WFPT_STATS') else []
+
 try:
     from Cython.Build import cythonize
-    ext_modules = cythonize([Extension('wfpt', ['src/wfpt.pyx'], language='c++'), # uncomment for OSX: , extra_compile_args=['-stdlib=libc++'], extra_link_args=['-stdlib=libc++', "-mmacosx-version-min=10.9"]),
+    ext_modules = cythonize([Extension('wfpt', ['src/wfpt.pyx'], language='c++', define_macros=wfpt_macros), # uncomment for OSX: , extra_compile_args=['-stdlib=libc++'], extra_link_args=['-stdlib=libc++', "-mmacosx-version-min=10.9"]),
                              Extension('cdfdif_wrapper', ['src/cdfdif_wrapper.pyx', 'src/cdfdif.c']),
                              Extension('data_simulators', ['src/cddm_data_simulation.pyx'], language='c++'),
     ], compiler_directives = {"language_level": "3"})
 
 except ImportError:
-    ext_modules = [Extension('wfpt', ['src/wfpt.cpp'], language='c++'),
+    ext_modules = [Extension('wfpt', ['src/wfpt.cpp'], language='c++', define_macros=wfpt_macros),
                    Extension('cdfdif_wrapper', ['src/cdfdif_wrapper.c', 'src/cdfdif.c']),
                    Extension('data_simulators', ['src/cddm_data_simulation.cpp'], language="c++")
     ]
@@ -97,6 +97,19 @@ cdef float[:] draw_gaussian(int n):
         result[n - 1] = random_gaussian()
     return result
 
+cdef inline Py_ssize_t rt_bin(float rt, float max_t, int nbins):
+    # Same bins as bin_simulator_output(): edges np.linspace(0, max_t, nbins),
+    # the last bin collects everything in [max_t, inf)
+    cdef Py_ssize_t ix
+    if nbins == 1 or rt >= max_t:
+        return nbins - 1
+    if rt <= 0:
+        return 0
+    ix = <Py_ssize_t> ((rt / max_t) * (nbins - 1))
+    if ix > nbins - 2:
+        return nbins - 2
+    return ix
+
 # DUMMY TEST SIMULATOR ------------------------------------------------------------------------
 # Simulate (rt, choice) tuples from: SIMPLE DDM -----------------------------------------------
 # Simplest algorithm
@@ -183,6 +196,7 @@ def full_ddm_vanilla(np.ndarray[float, ndim = 1] v, # = 0,
                      float max_t = 20,
                      int n_samples = 20000,
                      int n_trials = 1,
+                     int nbins = 0, # if > 0, return (n_trials, nbins, n_choices) histogram counts instead of rts / choices
                      ):
 
     # cdef int cov_length = np.max([v.size, a.size, w.size, t.size]).astype(int)
@@ -201,11 +215,15 @@ def full_ddm_vanilla(np.ndarray[float, ndim = 1] v, # = 0,
     traj[:, :] = -999 
     cdef float[:, :] traj_view = traj
 
-    rts = np.zeros((n_samples, n_trials, 1), dtype = DTYPE)
-    choices = np.zeros((n_samples, n_trials, 1), dtype = np.intc)
+    # When binning, samples go straight into the histogram and are never stored
+    cdef int n_rows = 0 if nbins > 0 else n_samples
+    rts = np.zeros((n_rows, n_trials, 1), dtype = DTYPE)
+    choices = np.zeros((n_rows, n_trials, 1), dtype = np.intc)
+    counts = np.zeros((n_trials, max(nbins, 0), 2), dtype = np.int64)
 
     cdef float[:, :, :] rts_view = rts
     cdef int[:, :, :] choices_view = choices
+    cdef np.int64_t[:, :, :] counts_view = counts
 
     cdef float delta_t_sqrt = sqrt(delta_t) # correct scalar so we can use standard normal samples for the brownian motion
     cdef float sqrt_st = delta_t_sqrt * s # scalar to ensure the correct variance for the gaussian step
@@ -261,27 +279,35 @@ def full_ddm_vanilla(np.ndarray[float, ndim = 1] v, # = 0,
                     gaussian_values = draw_gaussian(num_draws)
                     m = 0
 
+            if nbins > 0:
+                counts_view[k, rt_bin(t_particle + t_tmp, max_t, nbins), y >= 0] += 1
+                continue
+
             rts_view[n, k, 0] = t_particle + t_tmp # Store rt
-            
+
             if y < 0:
                 choices_view[n, k, 0] = 0 # Store choice
             else:
                 choices_view[n, k, 0] = 1
 
-    return (rts, choices,  {'v': v,
-                            'a': a,
-                            'z': z,
-                            't': t,
-                            'sz': sz,
-                            'sv': sv,
-                            'st': st,
-                            's': s,
-                            'delta_t': delta_t,
-                            'max_t': max_t,
-                            'n_samples': n_samples,
-                            'simulator': 'full_ddm_vanilla',
-                            'possible_choices': [0, 1],
-                            'trajectory': traj})
+    sim_info = {'v': v,
+                'a': a,
+                'z': z,
+                't': t,
+                'sz': sz,
+                'sv': sv,
+                'st': st,
+                's': s,
+                'delta_t': delta_t,
+                'max_t': max_t,
+                'n_samples': n_samples,
+                'simulator': 'full_ddm_vanilla',
+                'possible_choices': [0, 1],
+                'trajectory': traj}
+
+    if nbins > 0:
+        return (counts, sim_info)
+    return (rts, choices, sim_info)
 # -------------------------------------------------------------------------------------------------
 
 # Simulate (rt, choice) tuples from: SIMPLE DDM -----------------------------------------------
@@ -300,6 +326,7 @@ def ddm(np.ndarray[float, ndim = 1] v, # drift by timestep 'delta_t'
         float max_t = 20, # maximum rt allowed
         int n_samples = 20000, # number of samples considered
         int n_trials = 10,
+        int nbins = 0, # if > 0, return (n_trials, nbins, n_choices) histogram counts instead of rts / choices
         ):
 
     # Param views
@@ -308,10 +335,14 @@ def ddm(np.ndarray[float, ndim = 1] v, # drift by timestep 'delta_t'
     cdef float[:] z_view = z
     cdef float[:] t_view = t
 
-    rts = np.zeros((n_samples, n_trials, 1), dtype = DTYPE)
-    choices = np.zeros((n_samples, n_trials, 1), dtype = np.intc)
+    # When binning, samples go straight into the histogram and are never stored
+    cdef int n_rows = 0 if nbins > 0 else n_samples
+    rts = np.zeros((n_rows, n_trials, 1), dtype = DTYPE)
+    choices = np.zeros((n_rows, n_trials, 1), dtype = np.intc)
+    counts = np.zeros((n_trials, max(nbins, 0), 2), dtype = np.int64)
     cdef float[:, :, :] rts_view = rts
     cdef int[:, :, :] choices_view = choices
+    cdef np.int64_t[:, :, :] counts_view = counts
 
     cdef float delta_t_sqrt = sqrt(delta_t)
     cdef float sqrt_st = delta_t_sqrt * s
@@ -339,6 +370,10 @@ def ddm(np.ndarray[float, ndim = 1] v, # drift by timestep 'delta_t'
                     gaussian_values = draw_gaussian(num_draws)
                     m = 0
 
+            if nbins > 0:
+                counts_view[k, rt_bin(t_particle + t_view[k], max_t, nbins), y >= 0] += 1
+                continue
+
             # Note that for purposes of consistency with Navarro and Fuss, 
             # the choice corresponding the lower barrier is +1, higher barrier is -1
             rts_view[n, k, 0] = t_particle + t_view[k] # store rt
@@ -347,17 +382,21 @@ def ddm(np.ndarray[float, ndim = 1] v, # drift by timestep 'delta_t'
             else:
                 choices_view[n, k, 0] = 1 # store choice
         
-    return (rts, choices, {'v': v,
-                           'a': a,
-                           'z': z,
-                           't': t,
-                           's': s,
-                           'delta_t': delta_t,
-                           'max_t': max_t,
-                           'n_samples': n_samples,
-                           'simulator': 'ddm',
-                           'boundary_fun_type': 'constant',
-                           'possible_choices': [0, 1]})
+    sim_info = {'v': v,
+                'a': a,
+                'z': z,
+                't': t,
+                's': s,
+                'delta_t': delta_t,
+                'max_t': max_t,
+                'n_samples': n_samples,
+                'simulator': 'ddm',
+                'boundary_fun_type': 'constant',
+                'possible_choices': [0, 1]}
+
+    if nbins > 0:
+        return (counts, sim_info)
+    return (rts, choices, sim_info)
 
 
 # # -------------------------------------------------------------------------------------------------
@@ -668,6 +707,7 @@ def ddm_flexbound(np.ndarray[float, ndim = 1] v,
                   float max_t = 20,
                   int n_samples = 20000,
                   int n_trials = 1,
+                  int nbins = 0, # if > 0, return (n_trials, nbins, n_choices) histogram counts instead of rts / choices
                   boundary_fun = None, # function of t (and potentially other parameters) that takes in (t, *args)
                   boundary_multiplicative = True,
                   boundary_params = {},
@@ -685,11 +725,15 @@ def ddm_flexbound(np.ndarray[float, ndim = 1] v,
     traj[:, :] = -999 
     cdef float[:,:] traj_view = traj
 
-    rts = np.zeros((n_samples, n_trials, 1), dtype = DTYPE)
-    choices = np.zeros((n_samples, n_trials, 1), dtype = np.intc)
+    # When binning, samples go straight into the histogram and are never stored
+    cdef int n_rows = 0 if nbins > 0 else n_samples
+    rts = np.zeros((n_rows, n_trials, 1), dtype = DTYPE)
+    choices = np.zeros((n_rows, n_trials, 1), dtype = np.intc)
+    counts = np.zeros((n_trials, max(nbins, 0), 2), dtype = np.int64)
 
     cdef float[:, :, :] rts_view = rts
     cdef int[:, :, :] choices_view = choices
+    cdef np.int64_t[:, :, :] counts_view = counts
 
     cdef float delta_t_sqrt = sqrt(delta_t) # correct scalar so we can use standard normal samples for the brownian motion
     cdef float sqrt_st = delta_t_sqrt * s # scalar to ensure the correct variance for the gaussian step
@@ -742,23 +786,31 @@ def ddm_flexbound(np.ndarray[float, ndim = 1] v,
                     gaussian_values = draw_gaussian(num_draws)
                     m = 0
 
+            if nbins > 0:
+                counts_view[k, rt_bin(t_particle + t_view[k], max_t, nbins), y > 0] += 1
+                continue
+
             rts_view[n, k, 0] = t_particle + t_view[k] # Store rt
             choices_view[n, k, 0] = sign(y) # Store choice
     
-    return (rts, choices,  {'v': v,
-                            'a': a,
-                            'z': z,
-                            't': t,
-                            's': s,
-                            **boundary_params,
-                            'delta_t': delta_t,
-                            'max_t': max_t,
-                            'n_samples': n_samples,
-                            'simulator': 'ddm_flexbound',
-                            'boundary_fun_type': boundary_fun.__name__,
-                            'possible_choices': [-1, 1],
-                            'trajectory': traj,
-                            'boundary': boundary})
+    sim_info = {'v': v,
+                'a': a,
+                'z': z,
+                't': t,
+                's': s,
+                **boundary_params,
+                'delta_t': delta_t,
+                'max_t': max_t,
+                'n_samples': n_samples,
+                'simulator': 'ddm_flexbound',
+                'boundary_fun_type': boundary_fun.__name__,
+                'possible_choices': [-1, 1],
+                'trajectory': traj,
+                'boundary': boundary}
+
+    if nbins > 0:
+        return (counts, sim_info)
+    return (rts, choices, sim_info)
 # ----------------------------------------------------------------------------------------------------
 
 # Simulate (rt, choice) tuples from: DDM WITH FLEXIBLE BOUNDARIES ------------------------------------
@@ -857,6 +909,7 @@ def levy_flexbound(np.ndarray[float, ndim = 1] v,
                    float max_t = 20,
                    int n_samples = 20000,
                    int n_trials = 1,
+                   int nbins = 0, # if > 0, return (n_trials, nbins, n_choices) histogram counts instead of rts / choices
                    boundary_fun = None, # function of t (and potentially other parameters) that takes in (t, *args)
                    boundary_multiplicative = True,
                    boundary_params = {}
@@ -874,11 +927,15 @@ def levy_flexbound(np.ndarray[float, ndim = 1] v,
     traj[:, :] = -999 
     cdef float[:,:] traj_view = traj
 
-    rts = np.zeros((n_samples, n_trials, 1), dtype = DTYPE)
-    choices = np.zeros((n_samples, n_trials, 1), dtype = np.intc)
+    # When binning, samples go straight into the histogram and are never stored
+    cdef int n_rows = 0 if nbins > 0 else n_samples
+    rts = np.zeros((n_rows, n_trials, 1), dtype = DTYPE)
+    choices = np.zeros((n_rows, n_trials, 1), dtype = np.intc)
+    counts = np.zeros((n_trials, max(nbins, 0), 2), dtype = np.int64)
 
     cdef float[:,:, :] rts_view = rts
     cdef int[:,:, :] choices_view = choices
+    cdef np.int64_t[:, :, :] counts_view = counts
 
     cdef float delta_t_alpha # = pow(delta_t, 1.0 / alpha_diff) # correct scalar so we can use standard normal samples for the brownian motion
 
@@ -929,24 +986,32 @@ def levy_flexbound(np.ndarray[float, ndim = 1] v,
                     alpha_stable_values = draw_random_stable(num_draws, alpha_diff_view[k])
                     m = 0
 
+            if nbins > 0:
+                counts_view[k, rt_bin(t_particle + t_view[k], max_t, nbins), y > 0] += 1
+                continue
+
             rts_view[n, k, 0] = t_particle + t_view[k] # Store rt
             choices_view[n, k, 0] = sign(y) # Store choice
         
-    return (rts, choices,  {'v': v,
-                            'a': a,
-                            'z': z,
-                            't': t,
-                            'alpha': alpha_diff,
-                            's': s,
-                            **boundary_params,
-                            'delta_t': delta_t,
-                            'max_t': max_t,
-                            'n_samples': n_samples,
-                            'simulator': 'levy_flexbound',
-                            'boundary_fun_type': boundary_fun.__name__,
-                            'possible_choices': [-1, 1],
-                            'trajectory': traj,
-                            'boundary': boundary})
+    sim_info = {'v': v,
+                'a': a,
+                'z': z,
+                't': t,
+                'alpha': alpha_diff,
+                's': s,
+                **boundary_params,
+                'delta_t': delta_t,
+                'max_t': max_t,
+                'n_samples': n_samples,
+                'simulator': 'levy_flexbound',
+                'boundary_fun_type': boundary_fun.__name__,
+                'possible_choices': [-1, 1],
+                'trajectory': traj,
+                'boundary': boundary}
+
+    if nbins > 0:
+        return (counts, sim_info)
+    return (rts, choices, sim_info)
 # -------------------------------------------------------------------------------------------------
 
 # Simulate (rt, choice) tuples from: Full DDM with flexible bounds --------------------------------
@@ -964,6 +1029,7 @@ def full_ddm(np.ndarray[float, ndim = 1] v, # = 0,
              float max_t = 20,
              int n_samples = 20000,
              int n_trials = 1,
+             int nbins = 0, # if > 0, return (n_trials, nbins, n_choices) histogram counts instead of rts / choices
              boundary_fun = None, # function of t (and potentially other parameters) that takes in (t, *args)
              boundary_multiplicative = True,
              boundary_params = {}
@@ -985,11 +1051,15 @@ def full_ddm(np.ndarray[float, ndim = 1] v, # = 0,
     traj[:, :] = -999 
     cdef float[:, :] traj_view = traj
 
-    rts = np.zeros((n_samples, n_trials, 1), dtype = DTYPE)
-    choices = np.zeros((n_samples, n_trials, 1), dtype = np.intc)
+    # When binning, samples go straight into the histogram and are never stored
+    cdef int n_rows = 0 if nbins > 0 else n_samples
+    rts = np.zeros((n_rows, n_trials, 1), dtype = DTYPE)
+    choices = np.zeros((n_rows, n_trials, 1), dtype = np.intc)
+    counts = np.zeros((n_trials, max(nbins, 0), 2), dtype = np.int64)
 
     cdef float[:, :, :] rts_view = rts
     cdef int[:, :, :] choices_view = choices
+    cdef np.int64_t[:, :, :] counts_view = counts
 
     cdef float delta_t_sqrt = sqrt(delta_t) # correct scalar so we can use standard normal samples for the brownian motion
     cdef float sqrt_st = delta_t_sqrt * s # scalar to ensure the correct variance for the gaussian step
@@ -1055,26 +1125,34 @@ def full_ddm(np.ndarray[float, ndim = 1] v, # = 0,
                     gaussian_values = draw_gaussian(num_draws)
                     m = 0
 
+            if nbins > 0:
+                counts_view[k, rt_bin(t_particle + t_tmp, max_t, nbins), y > 0] += 1
+                continue
+
             rts_view[n, k, 0] = t_particle + t_tmp # Store rt
             choices_view[n, k, 0] = np.sign(y) # Store choice
 
-    return (rts, choices,  {'v': v,
-                            'a': a,
-                            'z': z,
-                            't': t,
-                            'sz': sz,
-                            'sv': sv,
-                            'st': st,
-                            's': s,
-                            **boundary_params,
-                            'delta_t': delta_t,
-                            'max_t': max_t,
-                            'n_samples': n_samples,
-                            'simulator': 'full_ddm',
-                            'boundary_fun_type': boundary_fun.__name__,
-                            'possible_choices': [-1, 1],
-                            'trajectory': traj,
-                            'boundary': boundary})
+    sim_info = {'v': v,
+                'a': a,
+                'z': z,
+                't': t,
+                'sz': sz,
+                'sv': sv,
+                'st': st,
+                's': s,
+                **boundary_params,
+                'delta_t': delta_t,
+                'max_t': max_t,
+                'n_samples': n_samples,
+                'simulator': 'full_ddm',
+                'boundary_fun_type': boundary_fun.__name__,
+                'possible_choices': [-1, 1],
+                'trajectory': traj,
+                'boundary': boundary}
+
+    if nbins > 0:
+        return (counts, sim_info)
+    return (rts, choices, sim_info)
 
 # -------------------------------------------------------------------------------------------------
 
@@ -1091,6 +1169,7 @@ def ddm_sdv(np.ndarray[float, ndim = 1] v,
             float max_t = 20,
             int n_samples = 20000,
             int n_trials = 1,
+            int nbins = 0, # if > 0, return (n_trials, nbins, n_choices) histogram counts instead of rts / choices
             boundary_fun = None, # function of t (and potentially other parameters) that takes in (t, *args)
             boundary_multiplicative = True,
             boundary_params = {}
@@ -1108,11 +1187,15 @@ def ddm_sdv(np.ndarray[float, ndim = 1] v,
     cdef float[:] t_view = t
     cdef float[:] sv_view = sv
     
-    rts = np.zeros((n_samples, n_trials, 1), dtype = DTYPE)
-    choices = np.zeros((n_samples, n_trials, 1), dtype = np.intc)
+    # When binning, samples go straight into the histogram and are never stored
+    cdef int n_rows = 0 if nbins > 0 else n_samples
+    rts = np.zeros((n_rows, n_trials, 1), dtype = DTYPE)
+    choices = np.zeros((n_rows, n_trials, 1), dtype = np.intc)
+    counts = np.zeros((n_trials, max(nbins, 0), 2), dtype = np.int64)
 
     cdef float[:, :, :] rts_view = rts
     cdef int[:, :, :] choices_view = choices
+    cdef np.int64_t[:, :, :] counts_view = counts
 
     cdef float delta_t_sqrt = sqrt(delta_t) # correct scalar so we can use standard normal samples for the brownian motion
     cdef float sqrt_st = delta_t_sqrt * s # scalar to ensure the correct variance for the gaussian step
@@ -1181,25 +1264,33 @@ def ddm_sdv(np.ndarray[float, ndim = 1] v,
                     m = 0
 
 
+            if nbins > 0:
+                counts_view[k, rt_bin(t_particle + t_view[k], max_t, nbins), y > 0] += 1
+                continue
+
             rts_view[n, k, 0] = t_particle + t_view[k] # Store rt
             choices_view[n, k, 0] = np.sign(y) # Store choice
 
 
-    return (rts, choices,  {'v': v,
-                            'a': a,
-                            'z': z,
-                            't': t,
-                            'sv': sv,
-                            's': s,
-                            **boundary_params,
-                            'delta_t': delta_t,
-                            'max_t': max_t,
-                            'n_samples': n_samples,
-                            'simulator': 'ddm_sdv',
-                            'boundary_fun_type': boundary_fun.__name__,
-                            'possible_choices': [-1, 1],
-                            'trajectory': traj,
-                            'boundary': boundary})
+    sim_info = {'v': v,
+                'a': a,
+                'z': z,
+                't': t,
+                'sv': sv,
+                's': s,
+                **boundary_params,
+                'delta_t': delta_t,
+                'max_t': max_t,
+                'n_samples': n_samples,
+                'simulator': 'ddm_sdv',
+                'boundary_fun_type': boundary_fun.__name__,
+                'possible_choices': [-1, 1],
+                'trajectory': traj,
+                'boundary': boundary}
+
+    if nbins > 0:
+        return (counts, sim_info)
+    return (rts, choices, sim_info)
 
 # -------------------------------------------------------------------------------------------------
 
@@ -1216,6 +1307,7 @@ def ornstein_uhlenbeck(np.ndarray[float, ndim = 1] v, # drift parameter
                        float max_t = 20, # maximal time in trial
                        int n_samples = 20000, # number of samples from process
                        int n_trials = 1,
+                       int nbins = 0, # if > 0, return (n_trials, nbins, n_choices) histogram counts instead of rts / choices
                        boundary_fun = None, # function of t (and potentially other parameters) that takes in (t, *args)
                        boundary_multiplicative = True,
                        boundary_params = {}
@@ -1234,11 +1326,15 @@ def ornstein_uhlenbeck(np.ndarray[float, ndim = 1] v, # drift parameter
     cdef float[:] t_view = t
 
     # Initializations
-    rts = np.zeros((n_samples, n_trials, 1), dtype = DTYPE) # rt storage
-    choices = np.zeros((n_samples, n_trials, 1), dtype = np.intc) # choice storage
+    # When binning, samples go straight into the histogram and are never stored
+    cdef int n_rows = 0 if nbins > 0 else n_samples
+    rts = np.zeros((n_rows, n_trials, 1), dtype = DTYPE) # rt storage
+    choices = np.zeros((n_rows, n_trials, 1), dtype = np.intc) # choice storage
+    counts = np.zeros((n_trials, max(nbins, 0), 2), dtype = np.int64)
 
     cdef float[:, :, :] rts_view = rts
     cdef int[:, :, :] choices_view = choices
+    cdef np.int64_t[:, :, :] counts_view = counts
 
     cdef float delta_t_sqrt = np.sqrt(delta_t) # correct scalar so we can use standard normal samples for the brownian motion
     cdef float sqrt_st = s * delta_t_sqrt
@@ -1289,24 +1385,32 @@ def ornstein_uhlenbeck(np.ndarray[float, ndim = 1] v, # drift parameter
                     gaussian_values = draw_gaussian(num_draws)
                     m = 0
 
+            if nbins > 0:
+                counts_view[k, rt_bin(t_particle + t_view[k], max_t, nbins), y > 0] += 1
+                continue
+
             rts_view[n, k, 0] = t_particle + t_view[k] 
             choices_view[n, k, 0] = sign(y)
 
-    return (rts, choices, {'v': v,
-                           'a': a,
-                           'z': z,
-                           'g': g,
-                           't': t,
-                           's': s,
-                           **boundary_params,
-                           'delta_t': delta_t,
-                           'max_t': max_t,
-                           'n_samples': n_samples,
-                           'simulator': 'ornstein_uhlenbeck',
-                           'boundary_fun_type': boundary_fun.__name__,
-                           'possible_choices': [-1, 1],
-                           'trajectory': traj,
-                           'boundary': boundary})
+    sim_info = {'v': v,
+                'a': a,
+                'z': z,
+                'g': g,
+                't': t,
+                's': s,
+                **boundary_params,
+                'delta_t': delta_t,
+                'max_t': max_t,
+                'n_samples': n_samples,
+                'simulator': 'ornstein_uhlenbeck',
+                'boundary_fun_type': boundary_fun.__name__,
+                'possible_choices': [-1, 1],
+                'trajectory': traj,
+                'boundary': boundary}
+
+    if nbins > 0:
+        return (counts, sim_info)
+    return (rts, choices, sim_info)
 # --------------------------------------------------------------------------------------------------
 
 # Simulate (rt, choice) tuples from: RACE MODEL WITH N SAMPLES ----------------------------------
@@ -1349,6 +1453,7 @@ def race_model(np.ndarray[float, ndim = 2] v,  # np.array expected, one column o
                float max_t = 20, # maximum rt allowed
                int n_samples = 2000, 
                int n_trials = 1,
+               int nbins = 0, # if > 0, return (n_trials, nbins, n_choices) histogram counts instead of rts / choices
                boundary_fun = None,
                boundary_multiplicative = True,
                boundary_params = {}):
@@ -1365,10 +1470,14 @@ def race_model(np.ndarray[float, ndim = 2] v,  # np.array expected, one column o
     cdef float[:, :] sqrt_st_view = sqrt_st
 
     cdef int n_particles = v.shape[1]
-    rts = np.zeros((n_samples, n_trials, 1), dtype = DTYPE)
+    # When binning, samples go straight into the histogram and are never stored
+    cdef int n_rows = 0 if nbins > 0 else n_samples
+    rts = np.zeros((n_rows, n_trials, 1), dtype = DTYPE)
     cdef float[:, :, :] rts_view = rts
-    choices = np.zeros((n_samples, n_trials, 1), dtype = np.intc)
+    choices = np.zeros((n_rows, n_trials, 1), dtype = np.intc)
     cdef int[:, :, :] choices_view = choices
+    counts = np.zeros((n_trials, max(nbins, 0), n_particles), dtype = np.int64)
+    cdef np.int64_t[:, :, :] counts_view = counts
     
     particles = np.zeros((n_particles), dtype = DTYPE)
     cdef float [:] particles_view = particles
@@ -1432,6 +1541,10 @@ def race_model(np.ndarray[float, ndim = 2] v,  # np.array expected, one column o
                         for j in range(n_particles):
                             traj_view[ix, j] = particles[j]
 
+            if nbins > 0:
+                counts_view[k, rt_bin(t_particle + t_view[k, 0], max_t, nbins), np.argmax(particles)] += 1
+                continue
+
             choices_view[n, k, 0] = np.argmax(particles)
             #rts_view[n, 0] = t + t[choices_view[n, 0]]
             rts_view[n , k, 0] = t_particle + t[k, 0] # for now no t per choice option
@@ -1446,22 +1559,26 @@ def race_model(np.ndarray[float, ndim = 2] v,  # np.array expected, one column o
             #t_dict['t_' + str(i)] = t[i] # for now no t by choice
 
 
-    return (rts, choices, {**v_dict,
-                        'a': a[:, 0], 
-                        **z_dict, # if z's are different
-                        'z': z[:, 0], # single z if z's all the same
-                        't': t[:, 0],
-                        # **t_dict, # for now no t by choice
-                        's': s,
-                        **boundary_params,
-                        'delta_t': delta_t,
-                        'max_t': max_t,
-                        'n_samples': n_samples,
-                        'simulator': 'race_model',
-                        'boundary_fun_type': boundary_fun.__name__,
-                        'possible_choices': list(np.arange(0, n_particles, 1)),
-                        'trajectory': traj,
-                        'boundary': boundary})
+    sim_info = {**v_dict,
+                'a': a[:, 0], 
+                **z_dict, # if z's are different
+                'z': z[:, 0], # single z if z's all the same
+                't': t[:, 0],
+                # **t_dict, # for now no t by choice
+                's': s,
+                **boundary_params,
+                'delta_t': delta_t,
+                'max_t': max_t,
+                'n_samples': n_samples,
+                'simulator': 'race_model',
+                'boundary_fun_type': boundary_fun.__name__,
+                'possible_choices': list(np.arange(0, n_particles, 1)),
+                'trajectory': traj,
+                'boundary': boundary}
+
+    if nbins > 0:
+        return (counts, sim_info)
+    return (rts, choices, sim_info)
     # -------------------------------------------------------------------------------------------------
 # @cythonboundscheck(False)
 # @cythonwraparound(False)
@@ -1478,6 +1595,7 @@ def lca(np.ndarray[float, ndim = 2] v, # drift parameters (np.array expect: one
         float max_t = 20, # maximal time
         int n_samples = 2000, # number of samples to produce
         int n_trials = 1,
+        int nbins = 0, # if > 0, return (n_trials, nbins, n_choices) histogram counts instead of rts / choices
         boundary_fun = None, # function of t (and potentially other parameters) that takes in (t, *args)
         boundary_multiplicative = True,
         boundary_params = {}):
@@ -1498,11 +1616,15 @@ def lca(np.ndarray[float, ndim = 2] v, # drift parameters (np.array expect: one
     traj[:, :] = -999 
     cdef float[:, :] traj_view = traj
 
-    rts = np.zeros((n_samples, n_trials, 1), dtype = DTYPE)
+    # When binning, samples go straight into the histogram and are never stored
+    cdef int n_rows = 0 if nbins > 0 else n_samples
+    rts = np.zeros((n_rows, n_trials, 1), dtype = DTYPE)
     cdef float[:, :, :] rts_view = rts
     
-    choices = np.zeros((n_samples, n_trials, 1), dtype = np.intc)
+    choices = np.zeros((n_rows, n_trials, 1), dtype = np.intc)
     cdef int[:, :, :] choices_view = choices
+    counts = np.zeros((n_trials, max(nbins, 0), n_particles), dtype = np.int64)
+    cdef np.int64_t[:, :, :] counts_view = counts
 
     particles = np.zeros(n_particles, dtype = DTYPE)
     cdef float[:] particles_view = particles
@@ -1577,6 +1699,10 @@ def lca(np.ndarray[float, ndim = 2] v, # drift parameters (np.array expect: one
                         for i in range(n_particles):
                             traj_view[ix, i] = particles[i]
         
+            if nbins > 0:
+                counts_view[k, rt_bin(t_particle + t_view[k, 0], max_t, nbins), np.argmax(particles)] += 1
+                continue
+
             choices_view[n, k, 0] = np.argmax(particles) # store choices for sample n
             rts_view[n, k, 0] = t_particle + t_view[k, 0] # t[choices_view[n, 0]] # store reaction time for sample n
         
@@ -1589,23 +1715,27 @@ def lca(np.ndarray[float, ndim = 2] v, # drift parameters (np.array expect: one
         v_dict['v' + str(i)] = v[:, i]
         z_dict['z_' + str(i)] = z[:, i]
 
-    return (rts, choices, {**v_dict,
-                           'a': a[:, 0],
-                           **z_dict, # --> if different z's
-                           'z': z[:, 0], # z --> if all z_s the same , 
-                           'g': g[:, 0],
-                           'b': b[:, 0],
-                           't': t[:, 0],
-                           's': s,
-                           **boundary_params,
-                           'delta_t': delta_t,
-                           'max_t': max_t,
-                           'n_samples': n_samples,
-                           'simulator' : 'lca',
-                           'boundary_fun_type': boundary_fun.__name__,
-                           'possible_choices': list(np.arange(0, n_particles, 1)),
-                           'trajectory': traj,
-                           'boundary': boundary})
+    sim_info = {**v_dict,
+                'a': a[:, 0],
+                **z_dict, # --> if different z's
+                'z': z[:, 0], # z --> if all z_s the same , 
+                'g': g[:, 0],
+                'b': b[:, 0],
+                't': t[:, 0],
+                's': s,
+                **boundary_params,
+                'delta_t': delta_t,
+                'max_t': max_t,
+                'n_samples': n_samples,
+                'simulator' : 'lca',
+                'boundary_fun_type': boundary_fun.__name__,
+                'possible_choices': list(np.arange(0, n_particles, 1)),
+                'trajectory': traj,
+                'boundary': boundary}
+
+    if nbins > 0:
+        return (counts, sim_info)
+    return (rts, choices, sim_info)
 
 # Simulate (rt, choice) tuples from: DDM WITH FLEXIBLE BOUNDARIES ------------------------------------
 # @cythonboundscheck(False)
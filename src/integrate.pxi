@@ -103,6 +103,7 @@ cdef double adaptiveSimpsonsAux(double x, double v, double sv, double a, double
     Sright = (h/12)*(f_mid + 4*fe + f_end)
     S2 = Sleft + Sright
     if (bottom <= 0 or fabs(S2 - S) <= 15*simps_err):
+        wfpt_simpson_leaf(1, bottom, fabs(S2 - S) <= 15*simps_err)
         return S2 + (S2 - S)/15
     return adaptiveSimpsonsAux(x, v, sv, a, z, t, pdf_err,
                                  lb_z, z_c, lb_t, t_c, ZT, simps_err/2,
@@ -135,6 +136,7 @@ cdef double adaptiveSimpsons_1D(double x, double v, double sv, double a, double
     f_end = pdf_sv(x - ub_t, v, sv, a, ub_z, pdf_err)/ZT
     f_mid = pdf_sv(x - c_t, v, sv, a, c_z, pdf_err)/ZT
     S = (h/6)*(f_beg + 4*f_mid + f_end)
+    wfpt_simpson_begin(1, maxRecursionDepth)
     cdef double res =  adaptiveSimpsonsAux(x, v, sv, a, z, t, pdf_err,
                                  lb_z, ub_z, lb_t, ub_t, ZT, simps_err,
                                  S, f_beg, f_end, f_mid, maxRecursionDepth)
@@ -168,6 +170,7 @@ cdef double adaptiveSimpsonsAux_2D(double x, double v, double sv,
     S2 = Sleft + Sright
 
     if (bottom <= 0 or fabs(S2 - S) <= 15*err_2d):
+        wfpt_simpson_leaf(2, bottom, fabs(S2 - S) <= 15*err_2d)
         return S2 + (S2 - S)/15;
 
     return adaptiveSimpsonsAux_2D(x, v, sv, a, z, t, pdf_err, err_1d,
@@ -200,6 +203,7 @@ cdef double adaptiveSimpsons_2D(double x, double v, double sv, double a, double
     f_mid = adaptiveSimpsons_1D(x, v, sv, a, z, (lb_t+ub_t)/2, pdf_err, lb_z, ub_z,
                               0, 0, err_1d, maxRecursionDepth_sz)/st
     S = (h/6)*(f_beg + 4*f_mid + f_end)
+    wfpt_simpson_begin(2, maxRecursionDepth_st)
     cdef double res =  adaptiveSimpsonsAux_2D(x, v, sv, a, z, t, pdf_err, err_1d,
                                  lb_z, ub_z, lb_t, ub_t, st, err_2d,
                                  S, f_beg, f_end, f_mid, maxRecursionDepth_sz, maxRecursionDepth_st)
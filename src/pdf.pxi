@@ -5,6 +5,8 @@
 
 cimport cython
 
+include "stats.pxi"
+
 #include "integrate.pxi"
 
 #from libc.math cimport tan, sin, cos, log, exp, sqrt, fmax, pow, ceil, floor, fabs, M_PI
@@ -52,12 +54,16 @@ cdef double ftt_01w(double tt, double w, double err) nogil:
         K=<int>(ceil(ks)) # round to smallest integer meeting error
         lower = <int>(-floor((K-1)/2.))
         upper = <int>(ceil((K-1)/2.))
+        wfpt_count(WFPT_FTT_SMALL_T, 1)
+        wfpt_count(WFPT_FTT_SMALL_T_TERMS, upper - lower + 1)
         for k from lower <= k <= upper: # loop over k
             p+=(w+2*k)*exp(-(pow((w+2*k),2))/2/tt) # increment sum
         p/=sqrt(2*M_PI*pow(tt,3)) # add con_stant term
 
     else: # if large t is better...
         K=<int>(ceil(kl)) # round to smallest integer meeting error
+        wfpt_count(WFPT_FTT_LARGE_T, 1)
+        wfpt_count(WFPT_FTT_LARGE_T_TERMS, K)
         for k from 1 <= k <= K:
             p+=k*exp(-(pow(k,2))*(M_PI**2)*tt/2)*sin(k*M_PI*w) # increment sum
         p*=M_PI # add con_stant term
@@ -107,9 +113,12 @@ cpdef double full_pdf(double x, double v, double sv, double a, double
                       simps_err=1e-3) nogil:
     """full pdf"""
 
+    wfpt_count(WFPT_FULL_PDF, 1)
+
     # Check if parpameters are valid
     if (z<0) or (z>1) or (a<0) or (t<0) or (st<0) or (sv<0) or (sz<0) or (sz>1) or \
        ((fabs(x)-(t-st/2.))<0) or (z+sz/2.>1) or (z-sz/2.<0) or (t-st/2.<0):
+        wfpt_count(WFPT_INVALID, 1)
         return 0
 
     # transform x,v,z if x is upper bound response
@@ -126,21 +135,28 @@ cpdef double full_pdf(double x, double v, double sv, double a, double
 
     if (sz==0):
         if (st==0): #sv=0,sz=0,st=0
+            wfpt_count(WFPT_REGIME_SV, 1)
             return pdf_sv(x - t, v, sv, a, z, err)
         else:      #sv=0,sz=0,st=$
+            wfpt_count(WFPT_REGIME_ST, 1)
             if use_adaptive>0:
+                wfpt_count(WFPT_ADAPTIVE, 1)
                 return adaptiveSimpsons_1D(x,  v, sv, a, z, t, err, z, z, t-st/2., t+st/2., simps_err, n_st)
             else:
                 return simpson_1D(x, v, sv, a, z, t, err, z, z, 0, t-st/2., t+st/2., n_st)
 
     else: #sz=$
         if (st==0): #sv=0,sz=$,st=0
+            wfpt_count(WFPT_REGIME_SZ, 1)
             if use_adaptive:
+                wfpt_count(WFPT_ADAPTIVE, 1)
                 return adaptiveSimpsons_1D(x, v, sv, a, z, t, err, z-sz/2., z+sz/2., t, t, simps_err, n_sz)
             else:
                 return simpson_1D(x, v, sv, a, z, t, err, z-sz/2., z+sz/2., n_sz, t, t , 0)
         else:      #sv=0,sz=$,st=$
+            wfpt_count(WFPT_REGIME_SZ_ST, 1)
             if use_adaptive:
+                wfpt_count(WFPT_ADAPTIVE, 1)
                 return adaptiveSimpsons_2D(x, v, sv, a, z, t, err, z-sz/2., z+sz/2., t-st/2., t+st/2., simps_err, n_sz, n_st)
             else:
                 return simpson_2D(x, v, sv, a, z, t, err, z-sz/2., z+sz/2., n_sz, t-st/2., t+st/2., n_st)
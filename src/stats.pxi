@@ -0,0 +1,112 @@
+#cython: embedsignature=True
+#cython: cdivision=True
+#cython: wraparound=False
+#cython: boundscheck=False
+
+# Hot-path counters of the density kernels (see wfpt.get_stats()).
+#
+# They are only compiled in if the macro HDDM_WFPT_STATS is defined, i.e.
+#     HDDM_WFPT_STATS=1 python setup.py build_ext --inplace
+# Otherwise all wfpt_* functions below are empty inline functions and the
+# compiler removes the calls together with their arguments. The counters are
+# relaxed atomics and the Simpson depth bookkeeping is thread local, so they
+# stay exact when the kernels run inside prange.
+
+cdef extern from *:
+    """
+    #include <atomic>
+
+    #ifdef HDDM_WFPT_STATS
+    #define WFPT_STATS 1
+    #else
+    #define WFPT_STATS 0
+    #endif
+
+    #define WFPT_DEPTH_BINS 32
+
+    enum {
+        WFPT_FULL_PDF,
+        WFPT_INVALID,
+        WFPT_REGIME_SV,
+        WFPT_REGIME_ST,
+        WFPT_REGIME_SZ,
+        WFPT_REGIME_SZ_ST,
+        WFPT_ADAPTIVE,
+        WFPT_FTT_SMALL_T,
+        WFPT_FTT_SMALL_T_TERMS,
+        WFPT_FTT_LARGE_T,
+        WFPT_FTT_LARGE_T_TERMS,
+        WFPT_SIMPSON_1D_LIMIT,
+        WFPT_SIMPSON_2D_LIMIT,
+        WFPT_EXIT_PARAMS,
+        WFPT_EXIT_DENSITY,
+        WFPT_SIMPSON_1D_DEPTH,
+        WFPT_SIMPSON_2D_DEPTH = WFPT_SIMPSON_1D_DEPTH + WFPT_DEPTH_BINS,
+        WFPT_N_STATS = WFPT_SIMPSON_2D_DEPTH + WFPT_DEPTH_BINS
+    };
+
+    #if WFPT_STATS
+    static std::atomic<long long> wfpt_stats[WFPT_N_STATS];
+    /* maximal recursion depth of the running adaptive Simpson integration */
+    static thread_local int wfpt_max_depth[2];
+
+    static inline void wfpt_count(int i, long long n) {
+        wfpt_stats[i].fetch_add(n, std::memory_order_relaxed);
+    }
+    static inline void wfpt_simpson_begin(int dim, int max_depth) {
+        wfpt_max_depth[dim - 1] = max_depth;
+    }
+    static inline void wfpt_simpson_leaf(int dim, int bottom, int converged) {
+        int depth = wfpt_max_depth[dim - 1] - bottom;
+        if (depth < 0) depth = 0;
+        if (depth >= WFPT_DEPTH_BINS) depth = WFPT_DEPTH_BINS - 1;
+        if (dim == 1) {
+            wfpt_count(WFPT_SIMPSON_1D_DEPTH + depth, 1);
+            if (!converged) wfpt_count(WFPT_SIMPSON_1D_LIMIT, 1);
+        } else {
+            wfpt_count(WFPT_SIMPSON_2D_DEPTH + depth, 1);
+            if (!converged) wfpt_count(WFPT_SIMPSON_2D_LIMIT, 1);
+        }
+    }
+    static long long wfpt_stats_get(int i) {
+        return wfpt_stats[i].load(std::memory_order_relaxed);
+    }
+    static void wfpt_stats_reset(void) {
+        for (int i = 0; i < WFPT_N_STATS; i++)
+            wfpt_stats[i].store(0, std::memory_order_relaxed);
+    }
+    #else
+    static inline void wfpt_count(int i, long long n) {}
+    static inline void wfpt_simpson_begin(int dim, int max_depth) {}
+    static inline void wfpt_simpson_leaf(int dim, int bottom, int converged) {}
+    static long long wfpt_stats_get(int i) { return 0; }
+    static void wfpt_stats_reset(void) {}
+    #endif
+    """
+    bint WFPT_STATS
+    int WFPT_DEPTH_BINS
+
+    enum:
+        WFPT_FULL_PDF
+        WFPT_INVALID
+        WFPT_REGIME_SV
+        WFPT_REGIME_ST
+        WFPT_REGIME_SZ
+        WFPT_REGIME_SZ_ST
+        WFPT_ADAPTIVE
+        WFPT_FTT_SMALL_T
+        WFPT_FTT_SMALL_T_TERMS
+        WFPT_FTT_LARGE_T
+        WFPT_FTT_LARGE_T_TERMS
+        WFPT_SIMPSON_1D_LIMIT
+        WFPT_SIMPSON_2D_LIMIT
+        WFPT_EXIT_PARAMS
+        WFPT_EXIT_DENSITY
+        WFPT_SIMPSON_1D_DEPTH
+        WFPT_SIMPSON_2D_DEPTH
+
+    void wfpt_count(int i, long long n) nogil
+    void wfpt_simpson_begin(int dim, int max_depth) nogil
+    void wfpt_simpson_leaf(int dim, int bottom, bint converged) nogil
+    long long wfpt_stats_get(int i) nogil
+    void wfpt_stats_reset() nogil
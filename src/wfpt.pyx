@@ -309,6 +309,72 @@ def pdf_array(np.ndarray[double, ndim=1] x, double v, double sv, double a, doubl
 cdef inline bint p_outlier_in_range(double p_outlier):
     return (p_outlier >= 0) & (p_outlier <= 1)
 
+# whether the hot-path counters were compiled in, see stats.pxi
+STATS_ENABLED = bool(WFPT_STATS)
+
+def _depth_histogram(int offset):
+    hist = np.array([wfpt_stats_get(offset + i) for i in range(WFPT_DEPTH_BINS)])
+    return np.trim_zeros(hist, 'b')
+
+def get_stats():
+    """Counters of the density kernels since the last reset_stats().
+
+    Only available if wfpt was compiled with the hot-path counters, i.e.
+    built with HDDM_WFPT_STATS=1 set in the environment.
+
+    :Returns:
+        dict with
+            full_pdf: number of calls, of calls with invalid parameters and
+                of calls per regime (sv: closed form, st / sz / sz_st:
+                numerical integration, adaptive: of which adaptive Simpson).
+            ftt_01w: number of calls taking the small-t and the large-t
+                series and the total number of series terms of each.
+            simpson_1d, simpson_2d: histogram of the recursion depth at
+                which the adaptive Simpson intervals terminated and the
+                number of intervals that hit the maximal depth unconverged.
+            early_exit: number of likelihood calls returning -inf because
+                of invalid parameters (p_outlier) and because of a zero
+                density trial.
+    """
+    if not WFPT_STATS:
+        raise RuntimeError(
+            "wfpt was compiled without the hot-path counters; rebuild it "
+            "with HDDM_WFPT_STATS=1 to use get_stats()."
+        )
+    return {
+        "full_pdf": {
+            "calls": wfpt_stats_get(WFPT_FULL_PDF),
+            "invalid": wfpt_stats_get(WFPT_INVALID),
+            "sv": wfpt_stats_get(WFPT_REGIME_SV),
+            "st": wfpt_stats_get(WFPT_REGIME_ST),
+            "sz": wfpt_stats_get(WFPT_REGIME_SZ),
+            "sz_st": wfpt_stats_get(WFPT_REGIME_SZ_ST),
+            "adaptive": wfpt_stats_get(WFPT_ADAPTIVE),
+        },
+        "ftt_01w": {
+            "small_t_calls": wfpt_stats_get(WFPT_FTT_SMALL_T),
+            "small_t_terms": wfpt_stats_get(WFPT_FTT_SMALL_T_TERMS),
+            "large_t_calls": wfpt_stats_get(WFPT_FTT_LARGE_T),
+            "large_t_terms": wfpt_stats_get(WFPT_FTT_LARGE_T_TERMS),
+        },
+        "simpson_1d": {
+            "depth": _depth_histogram(WFPT_SIMPSON_1D_DEPTH),
+            "depth_limit": wfpt_stats_get(WFPT_SIMPSON_1D_LIMIT),
+        },
+        "simpson_2d": {
+            "depth": _depth_histogram(WFPT_SIMPSON_2D_DEPTH),
+            "depth_limit": wfpt_stats_get(WFPT_SIMPSON_2D_LIMIT),
+        },
+        "early_exit": {
+            "params": wfpt_stats_get(WFPT_EXIT_PARAMS),
+            "density": wfpt_stats_get(WFPT_EXIT_DENSITY),
+        },
+    }
+
+def reset_stats():
+    """Set all counters of get_stats() to zero."""
+    wfpt_stats_reset()
+
 
 
 # def gain(double best_i, double secondbest_i, double x, double mu):
@@ -355,6 +421,7 @@ def wiener_like(np.ndarray[double, ndim=1] x, double v, double sv, double a, dou
     cdef double wp_outlier = w_outlier * p_outlier
 
     if not p_outlier_in_range(p_outlier):
+        wfpt_count(WFPT_EXIT_PARAMS, 1)
         return -np.inf
 
     for i in range(size):
@@ -363,6 +430,7 @@ def wiener_like(np.ndarray[double, ndim=1] x, double v, double sv, double a, dou
         # If one probability = 0, the log sum will be -Inf
         p = p * (1 - p_outlier) + wp_outlier
         if p == 0:
+            wfpt_count(WFPT_EXIT_DENSITY, 1)
             return -np.inf
 
         sum_logp += log(p)
@@ -376,13 +444,15 @@ def wiener_like_rlddm(np.ndarray[double, ndim=1] x,
                       double q, double alpha, double pos_alpha, double v, 
                       double sv, double a, double z, double sz, double t,
                       double st, double err, int n_st=10, int n_sz=10, bint use_adaptive=1, double simps_err=1e-8,
-                      double p_outlier=0, double w_outlier=0):
+                      double p_outlier=0, double w_outlier=0,
+                      np.ndarray[double, ndim=1] trial_logp=None):
     cdef Py_ssize_t size = x.shape[0]
     cdef Py_ssize_t i, j
     cdef Py_ssize_t s_size
     cdef int s
     cdef double p
     cdef double sum_logp = 0
+    cdef np.ndarray[long, ndim=1] trials
     cdef double wp_outlier = w_outlier * p_outlier
     cdef double alfa
     cdef double pos_alfa
@@ -392,7 +462,13 @@ def wiener_like_rlddm(np.ndarray[double, ndim=1] x,
     cdef np.ndarray[long, ndim=1] responses
     cdef np.ndarray[long, ndim=1] unique = np.unique(split_by)
 
+    if trial_logp is not None:
+        trial_logp[:] = 0
+
     if not p_outlier_in_range(p_outlier):
+        if trial_logp is not None:
+            trial_logp[:] = -np.inf
+        wfpt_count(WFPT_EXIT_PARAMS, 1)
         return -np.inf
 
     if pos_alpha==100.00:
@@ -403,6 +479,8 @@ def wiener_like_rlddm(np.ndarray[double, ndim=1] x,
     # unique represent # of conditions
     for j in range(unique.shape[0]):
         s = unique[j]
+        if trial_logp is not None:
+            trials = np.flatnonzero(split_by == s)
         # select trials for current condition, identified by the split_by-array
         feedbacks = feedback[split_by == s]
         responses = response[split_by == s]
@@ -429,8 +507,13 @@ def wiener_like_rlddm(np.ndarray[double, ndim=1] x,
             # If one probability = 0, the log sum will be -Inf
             p = p * (1 - p_outlier) + wp_outlier
             if p == 0:
+                if trial_logp is not None:
+                    trial_logp[trials[i]] = -np.inf
+                wfpt_count(WFPT_EXIT_DENSITY, 1)
                 return -np.inf
             sum_logp += log(p)
+            if trial_logp is not None:
+                trial_logp[trials[i]] += log(p)
 
             # get learning rate for current trial. if pos_alpha is not in
             # include it will be same as alpha so can still use this
@@ -496,7 +579,7 @@ def wiener_like_rlddm_2step(np.ndarray[double, ndim=1] x1, # 1st-stage RT
 
                       double err, int n_st=10, int n_sz=10, bint use_adaptive=1, double simps_err=1e-8,
                       double p_outlier=0, double w_outlier=0,
-                      ):
+                      np.ndarray[double, ndim=1] trial_logp=None):
 
 
     # cdef double a = 1
@@ -511,6 +594,7 @@ def wiener_like_rlddm_2step(np.ndarray[double, ndim=1] x1, # 1st-stage RT
     cdef int s
     cdef double p
     cdef double sum_logp = 0
+    cdef np.ndarray[long, ndim=1] trials
     cdef double wp_outlier = w_outlier * p_outlier
     cdef double alfa
     cdef double pos_alfa
@@ -568,7 +652,13 @@ def wiener_like_rlddm_2step(np.ndarray[double, ndim=1] x1, # 1st-stage RT
     cdef np.ndarray[double, ndim=2] Tm = np.array([[0.7, 0.3], [0.3, 0.7]]) # transition matrix
     cdef np.ndarray[long, ndim=2] state_combinations = np.array(list(itertools.combinations(np.arange(nstates),2)))
 
+    if trial_logp is not None:
+        trial_logp[:] = 0
+
     if not p_outlier_in_range(p_outlier):
+        if trial_logp is not None:
+            trial_logp[:] = -np.inf
+        wfpt_count(WFPT_EXIT_PARAMS, 1)
         return -np.inf
 
     if pos_alpha==100.00:
@@ -579,6 +669,8 @@ def wiener_like_rlddm_2step(np.ndarray[double, ndim=1] x1, # 1st-stage RT
     # unique represent # of conditions
     for j in range(unique.shape[0]):
         s = unique[j]
+        if trial_logp is not None:
+            trials = np.flatnonzero(split_by == s)
         # select trials for current condition, identified by the split_by-array
         feedbacks = feedback[split_by == s]
         responses1 = response1[split_by == s]
@@ -680,8 +772,13 @@ def wiener_like_rlddm_2step(np.ndarray[double, ndim=1] x1, # 1st-stage RT
                     # If one probability = 0, the log sum will be -Inf
                     p = p * (1 - p_outlier) + wp_outlier
                     if p == 0:
+                        if trial_logp is not None:
+                            trial_logp[trials[i]] = -np.inf
+                        wfpt_count(WFPT_EXIT_DENSITY, 1)
                         return -np.inf
                     sum_logp += log(p)
+                    if trial_logp is not None:
+                        trial_logp[trials[i]] += log(p)
 
 
                     # # # 2nd stage
@@ -711,8 +808,13 @@ def wiener_like_rlddm_2step(np.ndarray[double, ndim=1] x1, # 1st-stage RT
                         # If one probability = 0, the log sum will be -Inf
                         p = p * (1 - p_outlier) + wp_outlier
                         if p == 0:
+                            if trial_logp is not None:
+                                trial_logp[trials[i]] = -np.inf
+                            wfpt_count(WFPT_EXIT_DENSITY, 1)
                             return -np.inf
                         sum_logp += log(p)
+                        if trial_logp is not None:
+                            trial_logp[trials[i]] += log(p)
 
 
             # update Q values, regardless of pdf
@@ -782,7 +884,7 @@ def wiener_like_rl_2step(np.ndarray[double, ndim=1] x1, # 1st-stage RT
 
                       double err, int n_st=10, int n_sz=10, bint use_adaptive=1, double simps_err=1e-8,
                       double p_outlier=0, double w_outlier=0,
-                      ):
+                      np.ndarray[double, ndim=1] trial_logp=None):
 
 
 
@@ -794,6 +896,7 @@ def wiener_like_rl_2step(np.ndarray[double, ndim=1] x1, # 1st-stage RT
     cdef double drift
 
     cdef double sum_logp = 0
+    cdef np.ndarray[long, ndim=1] trials
     cdef double wp_outlier = w_outlier * p_outlier
     cdef double alfa
     cdef double pos_alfa
@@ -840,7 +943,13 @@ def wiener_like_rl_2step(np.ndarray[double, ndim=1] x1, # 1st-stage RT
     cdef np.ndarray[double, ndim=2] Tm = np.array([[0.7, 0.3], [0.3, 0.7]]) # transition matrix
     cdef np.ndarray[long, ndim=2] state_combinations = np.array(list(itertools.combinations(np.arange(nstates),2)))
 
+    if trial_logp is not None:
+        trial_logp[:] = 0
+
     if not p_outlier_in_range(p_outlier):
+        if trial_logp is not None:
+            trial_logp[:] = -np.inf
+        wfpt_count(WFPT_EXIT_PARAMS, 1)
         return -np.inf
 
     if pos_alpha==100.00:
@@ -854,6 +963,8 @@ def wiener_like_rl_2step(np.ndarray[double, ndim=1] x1, # 1st-stage RT
     # unique represent # of conditions
     for j in range(unique.shape[0]):
         s = unique[j]
+        if trial_logp is not None:
+            trials = np.flatnonzero(split_by == s)
         # select trials for current condition, identified by the split_by-array
         feedbacks = feedback[split_by == s]
         responses1 = response1[split_by == s]
@@ -915,8 +1026,13 @@ def wiener_like_rl_2step(np.ndarray[double, ndim=1] x1, # 1st-stage RT
                     # If one probability = 0, the log sum will be -Inf
                     p = p * (1 - p_outlier) + wp_outlier
                     if p == 0:
+                        if trial_logp is not None:
+                            trial_logp[trials[i]] = -np.inf
+                        wfpt_count(WFPT_EXIT_DENSITY, 1)
                         return -np.inf
                     sum_logp += log(p)
+                    if trial_logp is not None:
+                        trial_logp[trials[i]] += log(p)
 
                     # # # # 2nd stage
                     if two_stage == 1.00:
@@ -941,8 +1057,13 @@ def wiener_like_rl_2step(np.ndarray[double, ndim=1] x1, # 1st-stage RT
                         # If one probability = 0, the log sum will be -Inf
                         p = p * (1 - p_outlier) + wp_outlier
                         if p == 0:
+                            if trial_logp is not None:
+                                trial_logp[trials[i]] = -np.inf
+                            wfpt_count(WFPT_EXIT_DENSITY, 1)
                             return -np.inf
                         sum_logp += log(p)
+                        if trial_logp is not None:
+                            trial_logp[trials[i]] += log(p)
 
                 # update Q values, regardless of pdf
                 dtQ1 = qs_mb[s2s[i],responses2[i]] - qs_mf[s1s[i], responses1[i]] # delta stage 1
@@ -1017,7 +1138,7 @@ def wiener_like_rlddm_uncertainty(np.ndarray[double, ndim=1] x1, # 1st-stage RT
 
                       double err, int n_st=10, int n_sz=10, bint use_adaptive=1, double simps_err=1e-8,
                       double p_outlier=0, double w_outlier=0,
-                      ):
+                      np.ndarray[double, ndim=1] trial_logp=None):
 
 
     # cdef double a = 1
@@ -1032,6 +1153,7 @@ def wiener_like_rlddm_uncertainty(np.ndarray[double, ndim=1] x1, # 1st-stage RT
     cdef int s
     cdef double p
     cdef double sum_logp = 0
+    cdef np.ndarray[long, ndim=1] trials
     cdef double wp_outlier = w_outlier * p_outlier
     cdef double alfa
     cdef double pos_alfa
@@ -1151,7 +1273,13 @@ def wiener_like_rlddm_uncertainty(np.ndarray[double, ndim=1] x1, # 1st-stage RT
 
 
 
+    if trial_logp is not None:
+        trial_logp[:] = 0
+
     if not p_outlier_in_range(p_outlier):
+        if trial_logp is not None:
+            trial_logp[:] = -np.inf
+        wfpt_count(WFPT_EXIT_PARAMS, 1)
         return -np.inf
 
     if pos_alpha==100.00:
@@ -1162,6 +1290,8 @@ def wiener_like_rlddm_uncertainty(np.ndarray[double, ndim=1] x1, # 1st-stage RT
     # unique represent # of conditions
     for j in range(unique.shape[0]):
         s = unique[j]
+        if trial_logp is not None:
+            trials = np.flatnonzero(split_by == s)
 
 
 
@@ -1653,8 +1783,13 @@ def wiener_like_rlddm_uncertainty(np.ndarray[double, ndim=1] x1, # 1st-stage RT
                     # If one probability = 0, the log sum will be -Inf
                     p = p * (1 - p_outlier) + wp_outlier
                     if p == 0:
+                        if trial_logp is not None:
+                            trial_logp[trials[i]] = -np.inf
+                        wfpt_count(WFPT_EXIT_DENSITY, 1)
                         return -np.inf
                     sum_logp += log(p)
+                    if trial_logp is not None:
+                        trial_logp[trials[i]] += log(p)
 
 
                     # # # 2nd stage
@@ -1715,8 +1850,13 @@ def wiener_like_rlddm_uncertainty(np.ndarray[double, ndim=1] x1, # 1st-stage RT
                         # If one probability = 0, the log sum will be -Inf
                         p = p * (1 - p_outlier) + wp_outlier
                         if p == 0:
+                            if trial_logp is not None:
+                                trial_logp[trials[i]] = -np.inf
+                            wfpt_count(WFPT_EXIT_DENSITY, 1)
                             return -np.inf
                         sum_logp += log(p)
+                        if trial_logp is not None:
+                            trial_logp[trials[i]] += log(p)
             # update Q values, regardless of pdf
 
             # ndt_counter_set[s1s[i], 0] += 1
@@ -2154,7 +2294,8 @@ def wiener_like_rl(np.ndarray[long, ndim=1] response,
                    np.ndarray[long, ndim=1] split_by,
                    double q, double alpha, double pos_alpha, double v, double z,
                    double err=1e-4, int n_st=10, int n_sz=10, bint use_adaptive=1, double simps_err=1e-8,
-                   double p_outlier=0, double w_outlier=0):
+                   double p_outlier=0, double w_outlier=0,
+                   np.ndarray[double, ndim=1] trial_logp=None):
     cdef Py_ssize_t size = response.shape[0]
     cdef Py_ssize_t i, j
     cdef Py_ssize_t s_size
@@ -2162,6 +2303,7 @@ def wiener_like_rl(np.ndarray[long, ndim=1] response,
     cdef double drift
     cdef double p
     cdef double sum_logp = 0
+    cdef np.ndarray[long, ndim=1] trials
     cdef double wp_outlier = w_outlier * p_outlier
     cdef double alfa
     cdef double pos_alfa
@@ -2170,7 +2312,13 @@ def wiener_like_rl(np.ndarray[long, ndim=1] response,
     cdef np.ndarray[long, ndim=1] responses
     cdef np.ndarray[long, ndim=1] unique = np.unique(split_by)
 
+    if trial_logp is not None:
+        trial_logp[:] = 0
+
     if not p_outlier_in_range(p_outlier):
+        if trial_logp is not None:
+            trial_logp[:] = -np.inf
+        wfpt_count(WFPT_EXIT_PARAMS, 1)
         return -np.inf
 
     if pos_alpha==100.00:
@@ -2181,6 +2329,8 @@ def wiener_like_rl(np.ndarray[long, ndim=1] response,
     # unique represent # of conditions
     for j in range(unique.shape[0]):
         s = unique[j]
+        if trial_logp is not None:
+            trials = np.flatnonzero(split_by == s)
         # select trials for current condition, identified by the split_by-array
         feedbacks = feedback[split_by == s]
         responses = response[split_by == s]
@@ -2217,9 +2367,14 @@ def wiener_like_rl(np.ndarray[long, ndim=1] response,
             # If one probability = 0, the log sum will be -Inf
             p = p * (1 - p_outlier) + wp_outlier
             if p == 0:
+                if trial_logp is not None:
+                    trial_logp[trials[i]] = -np.inf
+                wfpt_count(WFPT_EXIT_DENSITY, 1)
                 return -np.inf
 
             sum_logp += log(p)
+            if trial_logp is not None:
+                trial_logp[trials[i]] += log(p)
 
             # get learning rate for current trial. if pos_alpha is not in
             # include it will be same as alpha so can still use this
@@ -2349,6 +2504,80 @@ def gen_rts_from_cdf(double v, double sv, double a, double z, double sz, double
     return rts
 
 
+def gen_rts_from_simulated_drift(np.ndarray[double, ndim=1] y_0,
+                                 np.ndarray[double, ndim=1] a,
+                                 np.ndarray[double, ndim=1] drift_rate,
+                                 np.ndarray[double, ndim=1] drift_rate_switch,
+                                 np.ndarray[double, ndim=1] delay,
+                                 long n_switch=-1, double dt=1e-4, double intra_sv=1.0,
+                                 bint return_paths=False):
+    """Simulate the random walk approximation of the drift process, one sample per element
+    of the (equally long) parameter arrays. After n_switch steps the walk continues with
+    drift_rate_switch (n_switch < 0 disables the switch).
+
+    Returns the signed RTs and, if return_paths is set, a list with the path of every sample.
+    """
+    cdef Py_ssize_t samples = y_0.shape[0]
+    cdef Py_ssize_t i, n, n_path
+    cdef Py_ssize_t m = 0
+    cdef Py_ssize_t n_draws = 8192
+    cdef double step_size = sqrt(dt) * intra_sv
+    cdef double prob_up, prob_up_switch, p, y, y_prev, bound, rt
+    cdef np.ndarray[double, ndim=1] rts = np.empty(samples, dtype=np.double)
+    cdef np.ndarray[double, ndim=1] u = np.random.rand(n_draws)
+    cdef np.ndarray[double, ndim=1] path
+
+    paths = [] if return_paths else None
+    if return_paths:
+        path = np.empty(n_draws, dtype=np.double)
+
+    for i in range(samples):
+        prob_up = 0.5 * (1 + sqrt(dt) / intra_sv * drift_rate[i])
+        prob_up_switch = 0.5 * (1 + sqrt(dt) / intra_sv * drift_rate_switch[i])
+        y = y_0[i]
+        y_prev = y
+        n = 0
+        p = prob_up
+
+        while True:
+            if m == n_draws:
+                u = np.random.rand(n_draws)
+                m = 0
+            if n == n_switch:
+                p = prob_up_switch
+
+            y_prev = y
+            if u[m] < p:
+                y += step_size
+            else:
+                y -= step_size
+            m += 1
+
+            if return_paths:
+                if n == path.shape[0]:
+                    path = np.resize(path, 2 * path.shape[0])
+                path[n] = y
+
+            if y < 0 or y > a[i]:
+                break
+            n += 1
+
+        # Interpolate the boundary crossing between the last two positions
+        bound = 0 if y < 0 else a[i]
+        rt = (n - (y - bound) / (y - y_prev)) * dt
+        if y < 0:
+            rts[i] = -(rt + delay[i])
+        else:
+            rts[i] = rt + delay[i]
+
+        if return_paths:
+            n_path = int(rt / dt)
+            paths.append(np.concatenate((np.ones(int(delay[i] / dt)) * y_0[i],
+                                         path[:n_path].copy())))
+
+    return rts, paths
+
+
 # JY added for simulation with factorial design
 
         # rts = hddm.wfpt.gen_rts_from_cdf_factorial(            
@@ -2435,6 +2664,7 @@ def wiener_like_contaminant(np.ndarray[double, ndim=1] x, np.ndarray[int, ndim=1
                          n_st, n_sz, use_adaptive, simps_err)
             if p == 0:
                 with gil:
+                    wfpt_count(WFPT_EXIT_DENSITY, 1)
                     return -np.inf
             sum_logp += log(p)
         # If one probability = 0, the log sum will be -Inf
@@ -2500,16 +2730,26 @@ def wiener_like_nn_mlp(np.ndarray[float, ndim = 1] rt,
                        np.ndarray[float, ndim = 1] params,
                        double p_outlier = 0,
                        double w_outlier = 0,
-                       network = None):
+                       network = None,
+                       np.ndarray[float, ndim = 2] data = None):
+    """Summed LAN log-likelihood of the trials in rt/response.
+
+    If data is given, it is the (size, n_params + 2) network input whose
+    last two columns already hold rt and response (see
+    hddm.utils.lan_input_buffer()); only the parameter columns are
+    overwritten in place.
+    """
 
     cdef Py_ssize_t size = rt.shape[0]
     cdef Py_ssize_t n_params = params.shape[0]
     cdef float log_p = 0
     cdef float ll_min = -16.11809
 
-    cdef np.ndarray[float, ndim = 2] data = np.zeros((size, n_params + 2), dtype = np.float32)
-    data[:, :n_params] = np.tile(params, (size, 1)).astype(np.float32)
-    data[:, n_params:] = np.stack([rt, response], axis = 1)
+    if data is None:
+        data = np.empty((size, n_params + 2), dtype = np.float32)
+        data[:, n_params] = rt
+        data[:, n_params + 1] = response
+    data[:, :n_params] = params
 
     # Call to network:
     if p_outlier == 0:
@@ -2525,7 +2765,8 @@ def wiener_like_nn_mlp_pdf(np.ndarray[float, ndim = 1] rt,
                             double p_outlier = 0, 
                             double w_outlier = 0,
                             bint logp = 0,
-                            network = None):
+                            network = None,
+                            np.ndarray[float, ndim = 2] data = None):
     
     cdef Py_ssize_t size = rt.shape[0]
     cdef Py_ssize_t n_params = params.shape[0]
@@ -2533,9 +2774,11 @@ def wiener_like_nn_mlp_pdf(np.ndarray[float, ndim = 1] rt,
     cdef np.ndarray[float, ndim = 1] log_p = np.zeros(size, dtype = np.float32)
     cdef float ll_min = -16.11809
 
-    cdef np.ndarray[float, ndim = 2] data = np.zeros((size, n_params + 2), dtype = np.float32)
-    data[:, :n_params] = np.tile(params, (size, 1)).astype(np.float32)
-    data[:, n_params:] = np.stack([rt, response], axis = 1)
+    if data is None:
+        data = np.empty((size, n_params + 2), dtype = np.float32)
+        data[:, n_params] = rt
+        data[:, n_params + 1] = response
+    data[:, :n_params] = params
 
     # Call to network:
     if p_outlier == 0: # ddm_model